@@ -0,0 +1,80 @@
+"""
+Rendering of a multi-megabyte file read as text, as bytes and mapped.
+
+    python benchmarks/bytes_input.py [size in MB]
+
+Each variant runs in a new process. Peak memory is measured with
+tracemalloc, so mapped pages of the file which belong to the OS page cache
+are not counted.
+"""
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sulguk import transform_html
+
+PARAGRAPH = (
+    "<p>Абзац {i} с <b>жирным</b>, <i>курсивом</i> и "
+    "<a href='https://example.com/{i}'>ссылкой</a>. " + "Some text. " * 20 +
+    "</p>\n"
+)
+
+
+def from_text(path: str):
+    with open(path, encoding="utf-8") as f:
+        return transform_html(f.read())
+
+
+def from_bytes(path: str):
+    with open(path, "rb") as f:
+        return transform_html(f.read())
+
+
+def from_mmap(path: str):
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ,
+    ) as data:
+        return transform_html(data)
+
+
+VARIANTS = {"text": from_text, "bytes": from_bytes, "mmap": from_mmap}
+
+
+def measure(name: str, path: str) -> None:
+    func = VARIANTS[name]
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<6} {elapsed:6.2f} s, peak {peak / 1024 / 1024:6.1f} MB")
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]:
+        measure(sys.argv[2], sys.argv[3])
+        return
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "doc.html")
+        with open(path, "w", encoding="utf-8") as f:
+            i = 0
+            while f.tell() < size * 1024 * 1024:
+                f.write(PARAGRAPH.format(i=i))
+                i += 1
+        print(f"Document: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        assert from_text(path) == from_bytes(path) == from_mmap(path)
+        for name in VARIANTS:
+            subprocess.run(
+                [sys.executable, __file__, "--run", name, path], check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
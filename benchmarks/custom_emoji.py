@@ -0,0 +1,77 @@
+"""
+Custom emoji substitution with dictionaries of different size.
+
+    python benchmarks/custom_emoji.py
+
+Compares rendering with `custom_emoji` against wrapping matches into
+`<tg-emoji>` with a regular expression before rendering.
+"""
+import random
+import re
+import time
+
+from sulguk import Renderer
+
+WORDS = ["text", "with", "some", "words", "and", "emoji", ":fire:", "🙂"]
+
+
+def make_dictionary(size: int) -> dict:
+    rnd = random.Random(size)
+    emoji = {"🙂": "1", ":fire:": "2"}
+    while len(emoji) < size:
+        name = "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz_", k=10))
+        emoji[f":{name}:"] = str(len(emoji))
+    return emoji
+
+
+def make_html(paragraphs: int) -> str:
+    rnd = random.Random(0)
+    return "".join(
+        "<p>" + " ".join(rnd.choices(WORDS, k=50)) + "</p>"
+        for _ in range(paragraphs)
+    )
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    html = make_html(200)
+    plain = Renderer()
+    base = best_of(lambda: plain.render(html))
+    print(
+        f"Document: {len(html) / 1024:.0f} KB, "
+        f"without emoji {base * 1000:.1f} ms",
+    )
+    for size in (10, 1000, 100_000):
+        emoji = make_dictionary(size)
+        renderer = Renderer(custom_emoji=emoji)
+        matcher = best_of(lambda renderer=renderer: renderer.render(html))
+        pattern = re.compile("|".join(
+            re.escape(key) for key in sorted(emoji, key=len, reverse=True)
+        ))
+
+        def replace(match, emoji=emoji):
+            return (
+                f'<tg-emoji emoji-id="{emoji[match[0]]}">'
+                f"{match[0]}</tg-emoji>"
+            )
+
+        def preprocess(pattern=pattern, replace=replace):
+            plain.render(pattern.sub(replace, html))
+
+        regex = best_of(preprocess, repeat=1)
+        print(
+            f"{size:>7} patterns: custom_emoji {matcher * 1000:7.1f} ms, "
+            f"regex preprocessing {regex * 1000:8.1f} ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
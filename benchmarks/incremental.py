@@ -0,0 +1,65 @@
+"""
+Re-rendering of a large post after editing a single paragraph.
+
+    python benchmarks/incremental.py
+"""
+import random
+import time
+
+from sulguk import Renderer
+
+PARAGRAPH = (
+    "<p>Paragraph {i} with <b>bold</b>, <i>italic</i> and "
+    "<a href='https://example.com/{i}'>a link</a>. " + "Some text. " * 20 +
+    "</p>\n"
+)
+LIST = "<ul>" + "<li>item <code>{i}</code></li>" * 5 + "</ul>\n"
+
+
+def make_post(count: int) -> list:
+    blocks = []
+    for i in range(count):
+        blocks.append(PARAGRAPH.format(i=i))
+        if i % 20 == 0:
+            blocks.append(LIST.format(i=i))
+    return blocks
+
+
+def best_of(func, repeat: int = 10) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    renderer = Renderer()
+    blocks = make_post(600)
+    html = "".join(blocks)
+    previous = renderer.render_incremental(html)
+
+    rnd = random.Random(0)
+    edited = list(blocks)
+    index = rnd.randrange(len(edited))
+    edited[index] = edited[index].replace("Some text.", "Edited text.", 1)
+    edited_html = "".join(edited)
+
+    full = best_of(lambda: renderer.render(edited_html))
+    first = best_of(lambda: renderer.render_incremental(edited_html))
+    incremental = best_of(
+        lambda: renderer.render_incremental(edited_html, previous),
+    )
+    assert renderer.render_incremental(edited_html, previous).text == (
+        renderer.render(edited_html).text
+    )
+    print(f"Document: {len(edited_html) / 1024:.0f} KB, {len(blocks)} blocks")
+    print(f"Full render:        {full * 1000:.1f} ms")
+    print(f"First incremental:  {first * 1000:.1f} ms")
+    print(f"Incremental render: {incremental * 1000:.1f} ms")
+    print(f"Speedup:            {full / incremental:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
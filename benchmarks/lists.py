@@ -0,0 +1,42 @@
+"""
+Rendering of large nested ordered lists in every numbering format.
+
+    python benchmarks/lists.py [items]
+
+Each of `items` outer items has one nested list with a single item, so the
+document has twice as many list markers. Render time should grow linearly
+with the number of items.
+"""
+import sys
+import time
+
+from sulguk import Renderer
+from sulguk.mapper import OL_FORMAT
+
+
+def make_html(items: int, type_: str) -> str:
+    item = f"<li>item<ol type='{type_}'><li>nested</li></ol></li>"
+    return f"<ol type='{type_}'>" + item * items + "</ol>"
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [10_000, 100_000]
+    renderer = Renderer()
+    for items in sizes:
+        for type_ in OL_FORMAT:
+            html = make_html(items, type_)
+            elapsed = best_of(lambda: renderer.render(html))  # noqa: B023
+            print(f"{items:7} items, type={type_}: {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+End-to-end benchmark of `sulguk send` and `sulguk edit`.
+
+Commands are run against a fake Bot API server started in the same process,
+with the given latency of each request. Nothing is sent outside the machine:
+
+    python benchmarks/post_manager.py -n 20 --latency 0.05 --comments 2
+
+Each run is a separate command, as if the CLI is started again: the session
+is opened and closed, chat information is taken from the chat cache unless
+`--no-chat-cache` is passed. With `--flood-every` requests rejected by flood
+control are repeated after the requested pause.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import List
+
+from sulguk.post_manager import cli
+from sulguk.post_manager.params import init_parser
+from sulguk.post_manager.session import create_bot
+
+# the fake server is a helper of the tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from tests.post_manager.fake_api import (
+    FAKE_TOKEN,
+    FakeBotApi,
+    RetryAfterMiddleware,
+    start_fake_api,
+)
+
+SAMPLE_HTML = """
+<h1>Release notes</h1>
+<p>This is a <b>demo</b> of <a href="https://github.com/tishka17/sulguk">
+Sulguk</a> with <i>some</i> <u>formatting</u>.</p>
+<ol start="10">
+    <li>some item</li>
+    <li>other <code>item</code></li>
+</ol>
+<blockquote>Quoted <s>text</s></blockquote>
+<pre class="language-python">print("hello")</pre>
+"""
+
+
+def report(name: str, latencies: List[float], requests: int) -> None:
+    elapsed = sum(latencies)
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=20)
+        p50, p95 = quantiles[9], quantiles[18]
+    else:
+        p50 = p95 = latencies[0]
+    sys.stdout.write(
+        f"{name}: {len(latencies)} runs in {elapsed:.2f} s, "
+        f"{len(latencies) / elapsed:.1f} runs/s, "
+        f"{requests / len(latencies):.1f} requests per run\n"
+        f"  latency p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms\n",
+    )
+
+
+async def measure(argv: List[str], runs: int) -> List[float]:
+    parser = init_parser()
+    latencies = []
+    for _ in range(runs):
+        args = parser.parse_args(argv)
+        start = time.perf_counter()
+        await cli.run_bot(args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def write_files(html: str, count: int, tmp: str) -> List[str]:
+    files = []
+    for i in range(count):
+        path = os.path.join(tmp, f"{i}.html")
+        with open(path, "w") as f:
+            f.write(html.replace("demo", f"demo {i}"))
+        files.append(path)
+    return files
+
+
+def create_retrying_bot(*args, **kwargs):
+    bot = create_bot(*args, **kwargs)
+    bot.session.middleware(RetryAfterMiddleware())
+    return bot
+
+
+async def run(args, tmp: str) -> None:
+    api = FakeBotApi(
+        latency=args.latency,
+        flood_every=args.flood_every,
+        retry_after=args.retry_after,
+        forward_delay=args.forward_delay,
+    )
+    api.add_channel("channel")
+    runner, url = await start_fake_api(api)
+    os.environ["BOT_TOKEN"] = FAKE_TOKEN
+    os.environ["BOT_API_URL"] = url
+    os.environ["XDG_CACHE_HOME"] = tmp
+
+    files = write_files(args.html, args.comments + 1, tmp)
+    cache_args = ["--no-chat-cache"] if args.no_chat_cache else []
+    if args.flood_every:
+        cli.create_bot = create_retrying_bot
+
+    try:
+        api.requests.clear()
+        latencies = await measure(
+            ["send", "@channel", *files, "--mode", args.mode, *cache_args],
+            args.runs,
+        )
+        report("send", latencies, sum(api.requests.values()))
+
+        api.requests.clear()
+        latencies = await measure(
+            ["edit", "https://t.me/channel/1", files[-1], *cache_args],
+            args.runs,
+        )
+        report("edit", latencies, sum(api.requests.values()))
+        if api.flood_waits:
+            sys.stdout.write(f"Flood waits: {api.flood_waits}\n")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = ArgumentParser(prog="Sulguk post manager benchmark")
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.05,
+        help="Seconds added to each Bot API request",
+    )
+    parser.add_argument(
+        "--comments", type=int, default=2,
+        help="Number of comments sent with each post",
+    )
+    parser.add_argument(
+        "-m", "--mode", choices=["poll", "getChat"], default="poll",
+    )
+    parser.add_argument(
+        "--forward-delay", type=float, default=0.05,
+        help="Seconds before a post is forwarded to the discussion group",
+    )
+    parser.add_argument(
+        "--flood-every", type=int, default=0,
+        help="Answer each N-th request with flood wait error",
+    )
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--no-chat-cache", action="store_true")
+    parser.add_argument("file", nargs="?", default=None)
+    args = parser.parse_args()
+
+    args.html = SAMPLE_HTML
+    if args.file:
+        with open(args.file) as f:
+            args.html = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Flat program against the entity tree it is compiled from.
+
+    python benchmarks/program.py
+
+Compares memory taken by each representation of the same document, size
+of their pickles and time to render them.
+"""
+import gc
+import pickle
+import time
+import tracemalloc
+from pathlib import Path
+
+import html5lib
+
+from sulguk import compile_html, render_program
+from sulguk.render import State
+from sulguk.walker import Walker
+
+FIXTURE = Path(__file__).parent.parent / "tests/fixtures/supported_tags.html"
+
+
+def make_html(copies: int) -> str:
+    html = FIXTURE.read_text()
+    body = html.split("<body>")[1].split("</body>")[0]
+    return "<html><body>" + body * copies + "</body></html>"
+
+
+def best_of(func, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    gc.collect()  # parser leaves reference cycles
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def make_tree(html: str):
+    doc = html5lib.parse(
+        html, treebuilder="etree", namespaceHTMLElements=False,
+    )
+    return Walker(consume=True).walk_element(doc)
+
+
+def render_tree(tree) -> str:
+    state = State()
+    tree.render(state)
+    return state.canvas.text
+
+
+def main():
+    html = make_html(10)
+    # caches of html5lib and sulguk are filled on the first run
+    make_tree(html)
+    compile_html(html)
+    tree, tree_memory = measure(lambda: make_tree(html))
+    program, program_memory = measure(lambda: compile_html(html))
+    assert render_tree(tree) == render_program(program).text
+
+    for name, obj, memory, render in (
+        ("entity tree", tree, tree_memory, render_tree),
+        ("program", program, program_memory, render_program),
+    ):
+        elapsed = best_of(lambda: render(obj))  # noqa: B023
+        print(
+            f"{name:11}: {memory / 1024:5.0f} KB in memory, "
+            f"{len(pickle.dumps(obj)) / 1024:4.0f} KB pickled, "
+            f"render {elapsed * 1000:5.1f} ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load test for `sulguk serve`.
+
+Starts the server with a temporary unix socket in the same process and sends
+requests to it with fixed concurrency. Nothing is sent outside the machine:
+
+    python benchmarks/server_load.py -n 2000 -c 32 -b 10
+
+Use `--socket` to test already running server.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from aiohttp import ClientSession, UnixConnector
+
+from sulguk.post_manager.server import init_worker, start_server
+
+SAMPLE_HTML = """
+<h1>Release notes</h1>
+<p>This is a <b>demo</b> of <a href="https://github.com/tishka17/sulguk">
+Sulguk</a> with <i>some</i> <u>formatting</u>.</p>
+<ol start="10">
+    <li>some item</li>
+    <li>other <code>item</code></li>
+</ol>
+<blockquote>Quoted <s>text</s></blockquote>
+<pre class="language-python">print("hello")</pre>
+"""
+
+
+async def run_load(
+    socket: str, html: str, requests: int, concurrency: int, batch: int,
+) -> List[float]:
+    payload = [{"html": html}] * batch
+    latencies = []
+    counter = iter(range(requests))
+
+    async with ClientSession(connector=UnixConnector(path=socket)) as session:
+        async def client():
+            for _ in counter:
+                start = time.perf_counter()
+                async with session.post(
+                    "http://localhost/render", json=payload,
+                ) as response:
+                    response.raise_for_status()
+                    await response.read()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def report(latencies: List[float], elapsed: float, batch: int) -> None:
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    sys.stdout.write(
+        f"Requests:   {len(latencies)} in {elapsed:.2f} s\n"
+        f"Throughput: {len(latencies) / elapsed:.1f} requests/s, "
+        f"{len(latencies) * batch / elapsed:.1f} messages/s\n"
+        f"Latency:    p50 {quantiles[49] * 1000:.1f} ms, "
+        f"p95 {quantiles[94] * 1000:.1f} ms, "
+        f"p99 {quantiles[98] * 1000:.1f} ms\n",
+    )
+
+
+async def run(args, html: str) -> None:
+    if args.socket:
+        start = time.perf_counter()
+        latencies = await run_load(
+            args.socket, html, args.requests, args.concurrency, args.batch,
+        )
+        report(latencies, time.perf_counter() - start, args.batch)
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(
+        workers, initializer=init_worker,
+    ) as executor:
+        socket = os.path.join(tmp, "sulguk.sock")
+        runner = await start_server(
+            executor, workers, max_pending=workers * 2, socket=socket,
+        )
+        try:
+            start = time.perf_counter()
+            latencies = await run_load(
+                socket, html, args.requests, args.concurrency, args.batch,
+            )
+            report(latencies, time.perf_counter() - start, args.batch)
+        finally:
+            await runner.cleanup()
+
+
+def main():
+    parser = ArgumentParser(prog="Sulguk server load test")
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-b", "--batch", type=int, default=1)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-s", "--socket", default=None)
+    parser.add_argument("file", nargs="?", default=None)
+    args = parser.parse_args()
+
+    html = SAMPLE_HTML
+    if args.file:
+        with open(args.file) as f:
+            html = f.read()
+    asyncio.run(run(args, html))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Shared render cache hits against fresh rendering.
+
+    python benchmarks/shared_cache.py
+
+Measures latency of a cache hit for documents of different size, then
+runs several worker processes rendering the same broadcast messages with
+and without a shared cache.
+"""
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sulguk import Renderer, SharedRenderCache
+
+BLOCK = """
+<h2>Section</h2>
+<p>Some <b>bold</b>, <i>italic</i> and <a href="https://example.com">linked</a>
+text with <code>code</code> and <span class="tg-spoiler">spoilers</span>.</p>
+<ol start="3"><li>first</li><li value="7">second</li></ol>
+"""
+WORKERS = 4
+MESSAGES = 20
+REPEAT = 10
+
+
+def median_of(func, repeat: int = 50) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def hit_latency(path: str) -> None:
+    renderer = Renderer()
+    cache = SharedRenderCache(path)
+    for blocks in (1, 10, 100):
+        html = BLOCK * blocks
+        cache.render(renderer, html)
+        render = median_of(lambda: renderer.render(html))  # noqa: B023
+        hit = median_of(lambda: cache.render(renderer, html))  # noqa: B023
+        print(
+            f"{len(html) / 1024:6.1f} KB: render {render * 1000:7.3f} ms, "
+            f"cache hit {hit * 1000:6.3f} ms ({render / hit:.0f}x faster)",
+        )
+    cache.close()
+
+
+def worker(path: str) -> float:
+    renderer = Renderer()
+    cache = SharedRenderCache(path) if path else None
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for i in range(MESSAGES):
+            html = f"<h1>Broadcast {i}</h1>" + BLOCK * 20
+            if cache:
+                cache.render(renderer, html)
+            else:
+                renderer.render(html)
+    return time.perf_counter() - start
+
+
+def workers(path: str) -> None:
+    for name, cache_path in (("no cache", ""), ("shared cache", path)):
+        with ProcessPoolExecutor(WORKERS) as executor:
+            start = time.perf_counter()
+            busy = sum(executor.map(worker, [cache_path] * WORKERS))
+            elapsed = time.perf_counter() - start
+        print(
+            f"{WORKERS} workers x {REPEAT * MESSAGES} messages, {name}: "
+            f"{elapsed:.2f} s, {busy:.2f} s in workers in total",
+        )
+
+
+def main():
+    print(f"CPUs: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        hit_latency(os.path.join(tmp, "latency.sqlite"))
+        workers(os.path.join(tmp, "workers.sqlite"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Headings and <mark> rendered with a single Style node.
+
+    python benchmarks/style.py
+
+The old path nests a decoration entity for each style (and Uppercase for
+<h1>), it is registered here as custom tags to compare with.
+"""
+import time
+
+import html5lib
+
+from sulguk.entities import (
+    Bold,
+    Group,
+    Italic,
+    Paragraph,
+    Underline,
+    Uppercase,
+)
+from sulguk.mapper import Mapper
+from sulguk.render import State
+from sulguk.walker import Walker
+
+NESTED = {
+    "h1": lambda inner: Bold(entities=[
+        Underline(entities=[Uppercase(entities=[inner])]),
+    ]),
+    "h2": lambda inner: Bold(entities=[Underline(entities=[inner])]),
+    "h3": lambda inner: Bold(entities=[inner]),
+    "h4": lambda inner: Italic(entities=[Underline(entities=[inner])]),
+    "h5": lambda inner: Italic(entities=[inner]),
+    "h6": lambda inner: Italic(entities=[inner]),
+}
+
+
+def nested_heading(tag: str):
+    def factory(attrs):
+        inner = Group()
+        entity = Group(block=True)
+        entity.add(Paragraph())
+        entity.add(NESTED[tag](inner))
+        return inner, entity
+
+    return factory
+
+
+def nested_mark(attrs):
+    inner = Group()
+    entity = Group()
+    entity.add(Italic(entities=[Bold(entities=[inner])]))
+    return inner, entity
+
+
+OLD_TAGS = {tag: nested_heading(tag) for tag in NESTED}
+OLD_TAGS["mark"] = nested_mark
+
+
+def make_html(count: int) -> str:
+    return "".join(
+        f"<h{i % 6 + 1}>Heading {i}</h{i % 6 + 1}>"
+        f"<p>Paragraph with <mark>marked</mark> text</p>"
+        for i in range(count)
+    )
+
+
+def best_of(func, repeat: int = 40) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def walk_and_render(doc, mapper: Mapper) -> State:
+    state = State()
+    Walker(mapper=mapper).walk_element(doc).render(state)
+    return state
+
+
+def main():
+    doc = html5lib.parse(
+        make_html(300), treebuilder="etree", namespaceHTMLElements=False,
+    )
+    old = Mapper(tags=OLD_TAGS)
+    new = Mapper()
+    old_state = walk_and_render(doc, old)
+    new_state = walk_and_render(doc, new)
+    assert old_state.canvas.text == new_state.canvas.text
+    assert old_state.entities == new_state.entities
+
+    nested = best_of(lambda: walk_and_render(doc, old))
+    style = best_of(lambda: walk_and_render(doc, new))
+    print("300 headings and 300 paragraphs with <mark>, walk + render:")
+    print(f"nested decorations: {nested * 1000:5.1f} ms")
+    print(f"Style:              {style * 1000:5.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Rendering of an already parsed lxml tree.
+
+    python benchmarks/transform_tree.py
+
+Compares `transform_tree` against serializing the tree back to HTML and
+passing it to `transform_html`.
+"""
+import time
+from pathlib import Path
+
+import html5lib
+from lxml import etree
+
+from sulguk import transform_html, transform_tree
+
+FIXTURE = Path(__file__).parent.parent / "tests/fixtures/supported_tags.html"
+
+
+def make_html(copies: int) -> str:
+    html = FIXTURE.read_text()
+    body = html.split("<body>")[1].split("</body>")[0]
+    return "<html><body>" + body * copies + "</body></html>"
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    html = make_html(50)
+    tree = html5lib.parse(
+        html, treebuilder="lxml", namespaceHTMLElements=False,
+    )
+    assert transform_tree(tree) == transform_html(html)
+
+    reparse = best_of(lambda: transform_html(
+        etree.tostring(tree, encoding="unicode"),
+    ))
+    direct = best_of(lambda: transform_tree(tree))
+    print(f"Document: {len(html) / 1024:.0f} KB")
+    print(f"tostring + transform_html: {reparse * 1000:7.1f} ms")
+    print(f"transform_tree:            {direct * 1000:7.1f} ms")
+    print(f"Speedup:                   {reparse / direct:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Parsing and walking with lxml and xml.etree tree builders.
+
+    python benchmarks/tree_builder.py
+
+The old path builds an lxml tree and keeps it until the entity tree is
+ready. The current one builds an xml.etree tree and clears each element as
+soon as it is converted. Each variant runs in its own process to measure
+its peak memory.
+"""
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from html5lib import HTMLParser, getTreeBuilder
+
+from sulguk.walker import Walker
+
+FIXTURE = Path(__file__).parent.parent / "tests/fixtures/supported_tags.html"
+VARIANTS = {
+    "lxml": ("lxml", False),
+    "etree": ("etree", True),
+}
+
+
+def make_html(copies: int) -> str:
+    html = FIXTURE.read_text()
+    body = html.split("<body>")[1].split("</body>")[0]
+    return "<html><body>" + body * copies + "</body></html>"
+
+
+def peak_rss() -> int:
+    # kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(variant: str) -> None:
+    builder, consume = VARIANTS[variant]
+    html = make_html(400)
+    before = peak_rss()
+    start = time.perf_counter()
+    parser = HTMLParser(getTreeBuilder(builder), namespaceHTMLElements=False)
+    doc = parser.parse(html)
+    if hasattr(doc, "getroot"):
+        doc = doc.getroot()
+    Walker(consume=consume).walk_element(doc)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{variant:5}: {len(html) / 1024 / 1024:.1f} MB, {elapsed:.2f} s, "
+        f"+{(peak_rss() - before) / 1024:.0f} MB peak RSS",
+    )
+
+
+def main():
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+        return
+    for variant in VARIANTS:
+        subprocess.run([sys.executable, __file__, variant], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Validation of a document against its full rendering.
+
+    python benchmarks/validate.py
+
+`validate_html` only tokenizes the document, while `transform_html` also
+builds the tree and renders it.
+"""
+import time
+
+from sulguk import Renderer, validate_html
+from sulguk.limits import NO_LIMITS
+
+BLOCK = """
+<h2>Section</h2>
+<p>Some <b>bold</b>, <i>italic</i> and <a href="https://example.com">linked</a>
+text with <code>code</code> and <span class="tg-spoiler">spoilers</span>.</p>
+<ol start="3"><li>first</li><li value="7">second</li></ol>
+<blockquote>Quote with <u>underline</u></blockquote>
+"""
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    renderer = Renderer()
+    for blocks in (1, 10, 100):
+        html = BLOCK * blocks
+        render = best_of(lambda: renderer.render(html))  # noqa: B023
+        validate = best_of(lambda: renderer.validate(html))  # noqa: B023
+        strict = best_of(
+            lambda: validate_html(html, strict=True, limits=NO_LIMITS),  # noqa: B023
+        )
+        print(
+            f"{len(html) / 1024:6.1f} KB: render {render * 1000:7.2f} ms, "
+            f"validate {validate * 1000:7.2f} ms "
+            f"({render / validate:.1f}x faster), "
+            f"strict {strict * 1000:7.2f} ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
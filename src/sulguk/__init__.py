@@ -1,11 +1,40 @@
 __all__ = [
     "SULGUK_PARSE_MODE",
+    "Catalog",
+    "IncrementalResult",
+    "LimitExceededError",
+    "Limits",
     "RenderResult",
+    "Renderer",
+    "SharedRenderCache",
+    "SlowRenderCapture",
+    "ValidationProblem",
+    "build_catalog",
+    "compile_html",
+    "render_program",
     "transform_html",
+    "transform_html_async",
+    "transform_tree",
+    "validate_html",
 ]
 
+from .capture import SlowRenderCapture
+from .catalog import Catalog, build_catalog
 from .data import SULGUK_PARSE_MODE
-from .wrapper import RenderResult, transform_html
+from .limits import LimitExceededError, Limits
+from .shared_cache import SharedRenderCache
+from .validation import ValidationProblem
+from .wrapper import (
+    IncrementalResult,
+    Renderer,
+    RenderResult,
+    compile_html,
+    render_program,
+    transform_html,
+    transform_html_async,
+    transform_tree,
+    validate_html,
+)
 
 try:
     from .aiogram_middleware import AiogramSulgukMiddleware  # noqa: F401
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Callable, Dict, Type, TypeVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
 
 from aiogram import Bot
 from aiogram.client.default import Default
@@ -23,16 +23,30 @@ from aiogram.types import (
 )
 
 from sulguk.data import SULGUK_PARSE_MODE
-from .wrapper import transform_html
+from .capture import SlowRenderCapture
+from .wrapper import Renderer, RenderResult
 
 logger = logging.getLogger(__name__)
 
 M = TypeVar("M", bound=TelegramMethod)
-Handler = Callable[[M, Bot], None]
+Handler = Callable[[M, Bot], Awaitable[None]]
 
 
 class AiogramSulgukMiddleware(BaseRequestMiddleware):
-    def __init__(self, base_url: str | None = None) -> None:
+    """
+    Converts HTML in requests with `SULGUK_PARSE_MODE` into entities.
+
+    With `cooperative=True` large messages are rendered in slices letting
+    other tasks run in the meantime (see `Renderer.render_async`).
+    Pass `capture` to save messages which are rendered too long.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        cooperative: bool = False,
+        capture: SlowRenderCapture | None = None,
+    ) -> None:
         self.handlers: Dict[Type[TelegramMethod], Handler] = {
             EditMessageMedia: self._process_edit_message_media,
             SendMediaGroup: self._process_send_media_group,
@@ -40,7 +54,8 @@ class AiogramSulgukMiddleware(BaseRequestMiddleware):
             AnswerInlineQuery: self._process_answer_inline_query,
             SendPoll: self._process_send_poll,
         }
-        self._base_url = base_url
+        self._cooperative = cooperative
+        self._renderer = Renderer(base_url=base_url, capture=capture)
 
     async def __call__(
             self,
@@ -49,67 +64,69 @@ class AiogramSulgukMiddleware(BaseRequestMiddleware):
             method: TelegramMethod[TelegramType],
     ) -> Response[TelegramType]:
         handler = self.handlers.get(type(method), self._process_generic)
-        handler(method, bot)
+        await handler(method, bot)
         return await make_request(bot, method)
 
-    def _process_inline_query_result(
+    async def _transform(self, raw_html: Optional[str]) -> RenderResult:
+        if self._cooperative:
+            return await self._renderer.render_async(raw_html)
+        return self._renderer.render(raw_html)
+
+    async def _process_inline_query_result(
             self, method: InlineQueryResult, bot: Bot,
     ) -> None:
         if isinstance(method, InlineQueryResultArticle):
             target = method.input_message_content
         else:
             target = method
-        self._transform_text_caption(target, bot)
+        await self._transform_text_caption(target, bot)
 
-    def _process_answer_inline_query(
+    async def _process_answer_inline_query(
             self, method: AnswerInlineQuery, bot: Bot,
     ) -> None:
         for result in method.results:
-            self._process_inline_query_result(result, bot)
+            await self._process_inline_query_result(result, bot)
 
-    def _process_answer_web_app_query(
+    async def _process_answer_web_app_query(
             self, method: AnswerWebAppQuery, bot: Bot,
     ) -> None:
-        self._process_inline_query_result(method.result, bot)
+        await self._process_inline_query_result(method.result, bot)
 
-    def _process_edit_message_media(
+    async def _process_edit_message_media(
             self, method: EditMessageMedia, bot: Bot,
     ) -> None:
-        self._transform_text_caption(method.media, bot)
+        await self._transform_text_caption(method.media, bot)
 
-    def _process_send_media_group(
+    async def _process_send_media_group(
             self, method: SendMediaGroup, bot: Bot,
     ) -> None:
         for media in method.media:
-            self._transform_text_caption(media, bot)
+            await self._transform_text_caption(media, bot)
 
-    def _process_send_poll(self, method: SendPoll, bot: Bot):
-        self._transform_poll(method, bot)
+    async def _process_send_poll(self, method: SendPoll, bot: Bot):
+        await self._transform_poll(method, bot)
 
-    def _process_generic(
+    async def _process_generic(
             self, method: Any, bot: Bot,
     ) -> None:
-        self._transform_text_caption(method, bot)
+        await self._transform_text_caption(method, bot)
 
-    def _transform_text_caption(
+    async def _transform_text_caption(
             self, method: Any, bot: Bot,
     ) -> None:
         if not self._is_parse_mode_supported(method, bot):
             return
 
         if hasattr(method, "caption"):
-            result = transform_html(method.caption, base_url=self._base_url)
+            result = await self._transform(method.caption)
             method.caption = result.text
             method.caption_entities = result.entities
         elif hasattr(method, "text"):
-            result = transform_html(method.text, base_url=self._base_url)
+            result = await self._transform(method.text)
             method.text = result.text
             method.entities = result.entities
         elif hasattr(method, "message_text"):
-            result = transform_html(
-                method.message_text,
-                base_url=self._base_url,
-            )
+            result = await self._transform(method.message_text)
             method.message_text = result.text
             method.entities = result.entities
         else:
@@ -120,15 +137,12 @@ class AiogramSulgukMiddleware(BaseRequestMiddleware):
 
         method.parse_mode = None
 
-    def _transform_poll(self, method: SendPoll, bot: Bot):
+    async def _transform_poll(self, method: SendPoll, bot: Bot):
         if not self._is_parse_mode_supported(
                 method, bot, "explanation_parse_mode"):
             return
 
-        explanation_result = transform_html(
-            method.explanation,
-            base_url=self._base_url,
-        )
+        explanation_result = await self._transform(method.explanation)
         method.explanation = explanation_result.text
         method.explanation_entities = explanation_result.entities
         method.explanation_parse_mode = None
@@ -137,10 +151,7 @@ class AiogramSulgukMiddleware(BaseRequestMiddleware):
                 method, bot, "question_parse_mode"):
             return
 
-        question_result = transform_html(
-            method.question,
-            base_url=self._base_url,
-        )
+        question_result = await self._transform(method.question)
         method.question = question_result.text
         method.question_entities = question_result.entities
         method.question_parse_mode = None
@@ -0,0 +1,161 @@
+import base64
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .source import HtmlSource
+from .version import sulguk_version
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_SUFFIX = ".json"
+
+
+@dataclass
+class RenderCapture:
+    """
+    Input of a slow render with the measurements taken while rendering.
+    """
+    html: HtmlSource
+    base_url: Optional[str]
+    strict: bool
+    merge: bool
+    fused: bool
+    timings: Dict[str, float]  # seconds spent in each stage
+    counts: Dict[str, int]
+    time: float = 0
+    version: str = ""
+    limits: Dict[str, Optional[int]] = field(default_factory=dict)
+    custom_emoji: Optional[Dict[str, str]] = None
+    # custom tag factories and url rewriter cannot be saved, only noted
+    custom_tags: List[str] = field(default_factory=list)
+    url_rewriter: bool = False
+    error: Optional[str] = None  # if rendering failed
+
+    def to_json(self) -> dict:
+        data = {
+            "time": self.time,
+            "version": self.version,
+            "base_url": self.base_url,
+            "strict": self.strict,
+            "merge": self.merge,
+            "fused": self.fused,
+            "timings": self.timings,
+            "counts": self.counts,
+            "limits": self.limits,
+            "custom_emoji": self.custom_emoji,
+            "custom_tags": self.custom_tags,
+            "url_rewriter": self.url_rewriter,
+            "error": self.error,
+        }
+        if isinstance(self.html, str):
+            data["html"] = self.html
+        else:
+            data["html_base64"] = base64.b64encode(self.html).decode("ascii")
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> "RenderCapture":
+        data = dict(data)
+        if "html_base64" in data:
+            data["html"] = base64.b64decode(data.pop("html_base64"))
+        return cls(**data)
+
+
+class SlowRenderCapture:
+    """
+    Storage of inputs which took more than `threshold` seconds to render.
+
+    Only `sample_rate` of slow renders are saved to bound the overhead.
+    Captures are written to `directory` as JSON files, the oldest ones are
+    removed when there are more than `max_files` or they take more than
+    `max_bytes`. Use `sulguk replay` to profile them.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        threshold: float = 0.1,
+        sample_rate: float = 1.0,
+        max_files: int = 100,
+        max_bytes: int = 10 * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ids = count()
+
+    def should_capture(self, elapsed: float) -> bool:
+        return elapsed >= self.threshold and (
+            self.sample_rate >= 1 or random.random() < self.sample_rate
+        )
+
+    def save(self, capture: RenderCapture) -> Optional[Path]:
+        """
+        Write capture to the directory. Errors are logged, not raised.
+        """
+        capture.time = time.time()
+        capture.version = sulguk_version()
+        # names are sorted by time, so the oldest files are removed first
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._ids)}"
+        path = self.directory / (name + CAPTURE_SUFFIX)
+        try:
+            data = json.dumps(capture.to_json(), ensure_ascii=False)
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._rotate()
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot save slow render capture: %s", e)
+            return None
+        logger.info(
+            "Render took %.3f s, input is saved to `%s`",
+            sum(capture.timings.values()), path,
+        )
+        return path
+
+    def _rotate(self) -> None:
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CAPTURE_SUFFIX) and entry.is_file():
+                files.append((entry.name, entry.stat().st_size))
+        files.sort()
+        left = len(files)
+        total = sum(size for _, size in files)
+        for name, size in files:
+            if left <= self.max_files and total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.directory / name)
+            except FileNotFoundError:
+                pass  # removed by another process
+            left -= 1
+            total -= size
+
+
+def iter_captures(paths: List[str]) -> Iterator[Tuple[Path, RenderCapture]]:
+    """
+    Load captures from files and directories, oldest first.
+    """
+    files: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.glob("*" + CAPTURE_SUFFIX)))
+        else:
+            files.append(path)
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            yield file, RenderCapture.from_json(json.load(f))
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .serialization import decode_result, encode_result
+from .version import RENDER_VERSION, sulguk_version
+from .wrapper import Renderer, RenderResult
+
+MAGIC = b"SULGUKC1"
+# magic, size of json index
+HEADER = struct.Struct("<8sQ")
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class CatalogEntry:
+    file: str  # relative to the source directory
+    mtime_ns: int
+    size: int
+    hash: str
+    offset: int
+    length: int
+
+
+def _source_files(directory: str, pattern: str) -> Iterator[Tuple[str, str]]:
+    root = Path(directory)
+    for path in sorted(root.glob(pattern)):
+        if path.is_file():
+            relative = path.relative_to(root)
+            yield relative.with_suffix("").as_posix(), relative.as_posix()
+
+
+def _write(
+    path: str,
+    directory: str,
+    base_url: Optional[str],
+    items: List[Tuple[str, CatalogEntry, bytes]],
+) -> None:
+    entries = {}
+    offset = 0
+    for name, entry, blob in items:
+        entry.offset = offset
+        entry.length = len(blob)
+        entries[name] = asdict(entry)
+        offset += len(blob)
+    index = json.dumps({
+        "version": sulguk_version(),
+        "render_version": RENDER_VERSION,
+        "directory": os.path.abspath(directory),
+        "base_url": base_url,
+        "entries": entries,
+    }).encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        for _, _, blob in items:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class Catalog:
+    """
+    Precompiled rendering results of HTML files from a directory.
+
+    Catalog file is mapped into memory and entries are decoded on first
+    access. Source files are checked on each access: if a file is changed
+    (or the catalog was built by another version of sulguk) the entry is
+    rendered again. Call `save` to store rebuilt entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        directory: Optional[str] = None,
+        check: bool = True,
+    ):
+        self.path = path
+        self.check = check
+        index = self._load()
+        self.base_url = index["base_url"]
+        self.directory = directory or index["directory"]
+        self.entries = {
+            name: CatalogEntry(**entry)
+            for name, entry in index["entries"].items()
+        }
+        self._results: Dict[str, RenderResult] = {}
+        self._rebuilt: Dict[str, bytes] = {}
+        # entries with new mtime or size, but the same contents
+        self._touched = False
+        self._renderer: Optional[Renderer] = None
+
+    def _load(self) -> dict:
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = None
+        if len(self._mmap) >= HEADER.size:
+            magic, index_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"`{self.path}` is not a sulguk catalog")
+        index = json.loads(self._mmap[HEADER.size:HEADER.size + index_size])
+        self._blobs_offset = HEADER.size + index_size
+        self.version = index["version"]
+        # catalogs written before it was stored are always outdated
+        self.render_version = index.get("render_version")
+        return index
+
+    def outdated(self) -> bool:
+        """
+        Check if the catalog was built by another version of sulguk.
+        """
+        return (
+            self.version != sulguk_version()
+            or self.render_version != RENDER_VERSION
+        )
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def _blob(self, name: str) -> bytes:
+        blob = self._rebuilt.get(name)
+        if blob is not None:
+            return blob
+        entry = self.entries[name]
+        start = self._blobs_offset + entry.offset
+        return self._mmap[start:start + entry.length]
+
+    def _rebuild_if_stale(self, name: str, entry: CatalogEntry) -> None:
+        source = os.path.join(self.directory, entry.file)
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            return  # keep serving what was built
+        version_changed = self.outdated() and name not in self._rebuilt
+        if (
+            not version_changed
+            and stat.st_mtime_ns == entry.mtime_ns
+            and stat.st_size == entry.size
+        ):
+            return
+        with open(source, "rb") as f:
+            data = f.read()
+        entry.mtime_ns = stat.st_mtime_ns
+        entry.size = stat.st_size
+        source_hash = _hash(data)
+        if not version_changed and source_hash == entry.hash:
+            self._touched = True  # not to hash it again after `save`
+            return
+        entry.hash = source_hash
+        if self._renderer is None:
+            self._renderer = Renderer(base_url=self.base_url)
+        result = self._renderer.render(data)
+        self._rebuilt[name] = encode_result(result)
+        self._results[name] = result
+
+    def __getitem__(self, name: str) -> RenderResult:
+        entry = self.entries[name]
+        if self.check:
+            self._rebuild_if_stale(name, entry)
+        result = self._results.get(name)
+        if result is None:
+            result = self._results[name] = decode_result(self._blob(name))
+        return result
+
+    def get(
+        self, name: str, default: Optional[RenderResult] = None,
+    ) -> Optional[RenderResult]:
+        if name not in self.entries:
+            return default
+        return self[name]
+
+    def save(self) -> None:
+        """
+        Write rebuilt and touched entries back to the catalog file.
+        """
+        if self.outdated():
+            for name, entry in self.entries.items():
+                self._rebuild_if_stale(name, entry)
+        elif not self._rebuilt and not self._touched:
+            return
+        _write(self.path, self.directory, self.base_url, [
+            (name, entry, self._blob(name))
+            for name, entry in self.entries.items()
+        ])
+        self._mmap.close()
+        self._load()
+        self._rebuilt.clear()
+        self._touched = False
+
+
+def build_catalog(
+    directory: str,
+    path: str,
+    base_url: Optional[str] = None,
+    pattern: str = "**/*.html",
+) -> Tuple[int, int]:
+    """
+    Render HTML files from directory into a catalog file.
+
+    Entries of existing catalog are reused for unchanged files.
+    Returns the number of rendered and reused files.
+    """
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = Catalog(path, directory, check=False)
+        except ValueError:
+            previous = None
+        else:
+            if previous.base_url != base_url or previous.outdated():
+                previous.close()
+                previous = None
+
+    renderer = Renderer(base_url=base_url)
+    items = []
+    rendered = reused = 0
+    try:
+        for name, file in _source_files(directory, pattern):
+            source = os.path.join(directory, file)
+            with open(source, "rb") as f:
+                stat = os.fstat(f.fileno())
+                data = f.read()
+            source_hash = _hash(data)
+            entry = CatalogEntry(
+                file=file,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                hash=source_hash,
+                offset=0,
+                length=0,
+            )
+            old_entry = previous and previous.entries.get(name)
+            if old_entry and old_entry.hash == source_hash:
+                blob = previous._blob(name)
+                reused += 1
+            else:
+                blob = encode_result(renderer.render(data))
+                rendered += 1
+            items.append((name, entry, blob))
+    finally:
+        if previous:
+            previous.close()
+    _write(path, directory, base_url, items)
+    return rendered, reused
@@ -19,6 +19,7 @@ __all__ = [
     "Spoiler",
     "Strikethrough",
     "Stub",
+    "Style",
     "Text",
     "Underline",
     "Uppercase",
@@ -37,6 +38,7 @@ from .decoration import (
     Quote,
     Spoiler,
     Strikethrough,
+    Style,
     Underline,
     Uppercase,
 )
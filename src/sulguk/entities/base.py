@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sulguk.data import MessageEntity
 from sulguk.render import State
 
 
 class Entity(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # an entity with its own `render`, but without `iter_render`
+        # cannot be rendered by parts, so it is rendered at once
+        if "render" in cls.__dict__ and "iter_render" not in cls.__dict__:
+            cls.iter_render = Entity.iter_render
+
     @abstractmethod
     def add(self, entity: "Entity"):
         raise NotImplementedError
@@ -15,6 +22,16 @@ class Entity(ABC):
     def render(self, state: State) -> None:
         raise NotImplementedError
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        """
+        The same as `render`, but yields after each rendered child.
+
+        Rendering can be continued later, so other work can be done between
+        steps. Entities without children are rendered at once.
+        """
+        self.render(state)
+        return iter(())
+
 
 @dataclass
 class Group(Entity):
@@ -32,6 +49,15 @@ class Group(Entity):
         if self.block:
             state.canvas.add_new_line_soft()
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        if self.block:
+            state.canvas.add_new_line_soft()
+        for entity in self.entities:
+            yield from entity.iter_render(state)
+            yield
+        if self.block:
+            state.canvas.add_new_line_soft()
+
 
 @dataclass
 class DecoratedEntity(Group):
@@ -44,4 +70,11 @@ class DecoratedEntity(Group):
         super().render(state)
         entity = self._get_entity(offset, state.canvas.size - offset)
         if entity:
-            state.entities.append(entity)
+            state.add_entity(entity)
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        offset = state.canvas.size
+        yield from super().iter_render(state)
+        entity = self._get_entity(offset, state.canvas.size - offset)
+        if entity:
+            state.add_entity(entity)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
 from sulguk.data import MessageEntity
 from sulguk.render import State, TextMode
@@ -52,6 +52,19 @@ class Spoiler(DecoratedEntity):
 class Code(DecoratedEntity):
     language: Optional[str] = None
 
+    def render(self, state: State) -> None:
+        # telegram does not allow entities inside code
+        custom_emoji = state.custom_emoji
+        state.custom_emoji = None
+        super().render(state)
+        state.custom_emoji = custom_emoji
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        custom_emoji = state.custom_emoji
+        state.custom_emoji = None
+        yield from super().iter_render(state)
+        state.custom_emoji = custom_emoji
+
     def _get_entity(self, offset: int, length: int) -> MessageEntity:
         return MessageEntity(
             type="code", offset=offset, length=length,
@@ -66,6 +79,54 @@ class Uppercase(Group):
         super().render(state)
         state.canvas.text_transformation = transform
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        transform = state.canvas.text_transformation
+        state.canvas.text_transformation = lambda s: s.upper()
+        yield from super().iter_render(state)
+        state.canvas.text_transformation = transform
+
+
+@dataclass
+class Style(Group):
+    """
+    Several decorations applied to the same text.
+
+    Same as nested entities of listed types, but renders as a single node.
+    Types are listed from outer to inner one.
+    """
+    types: Sequence[str] = ()
+    uppercase: bool = False
+
+    def render(self, state: State) -> None:
+        offset = state.canvas.size
+        if self.uppercase:
+            transform = state.canvas.text_transformation
+            state.canvas.text_transformation = str.upper
+            super().render(state)
+            state.canvas.text_transformation = transform
+        else:
+            super().render(state)
+        length = state.canvas.size - offset
+        for type_entity in reversed(self.types):
+            state.add_entity(MessageEntity(
+                type=type_entity, offset=offset, length=length,
+            ))
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        offset = state.canvas.size
+        if self.uppercase:
+            transform = state.canvas.text_transformation
+            state.canvas.text_transformation = str.upper
+            yield from super().iter_render(state)
+            state.canvas.text_transformation = transform
+        else:
+            yield from super().iter_render(state)
+        length = state.canvas.size - offset
+        for type_entity in reversed(self.types):
+            state.add_entity(MessageEntity(
+                type=type_entity, offset=offset, length=length,
+            ))
+
 
 @dataclass
 class Quote(Group):
@@ -74,6 +135,11 @@ class Quote(Group):
         super().render(state)
         state.canvas.add_text("”")
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        state.canvas.add_text("“")
+        yield from super().iter_render(state)
+        state.canvas.add_text("”")
+
 
 @dataclass
 class Blockquote(DecoratedEntity):
@@ -96,6 +162,11 @@ class Paragraph(Group):
         super().render(state)
         state.canvas.add_empty_line()
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        state.canvas.add_empty_line()
+        yield from super().iter_render(state)
+        state.canvas.add_empty_line()
+
 
 @dataclass
 class Pre(DecoratedEntity):
@@ -104,10 +175,24 @@ class Pre(DecoratedEntity):
 
     def render(self, state: State) -> None:
         text_mode = state.canvas.text_mode
+        custom_emoji = state.custom_emoji
         state.canvas.add_empty_line()
         state.canvas.text_mode = TextMode.PRE
+        state.custom_emoji = None
         super().render(state)
         state.canvas.text_mode = text_mode
+        state.custom_emoji = custom_emoji
+        state.canvas.add_empty_line()
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        text_mode = state.canvas.text_mode
+        custom_emoji = state.custom_emoji
+        state.canvas.add_empty_line()
+        state.canvas.text_mode = TextMode.PRE
+        state.custom_emoji = None
+        yield from super().iter_render(state)
+        state.canvas.text_mode = text_mode
+        state.custom_emoji = custom_emoji
         state.canvas.add_empty_line()
 
     def _get_language(self):
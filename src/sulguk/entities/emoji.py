@@ -1,6 +1,8 @@
 from dataclasses import dataclass
+from typing import Iterator
 
 from sulguk.data import MessageEntity
+from sulguk.render import State
 from .base import DecoratedEntity
 
 
@@ -8,6 +10,18 @@ from .base import DecoratedEntity
 class Emoji(DecoratedEntity):
     custom_emoji_id: str = ""
 
+    def render(self, state: State) -> None:
+        custom_emoji = state.custom_emoji
+        state.custom_emoji = None
+        super().render(state)
+        state.custom_emoji = custom_emoji
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        custom_emoji = state.custom_emoji
+        state.custom_emoji = None
+        yield from super().iter_render(state)
+        state.custom_emoji = custom_emoji
+
     def _get_entity(self, offset: int, length: int) -> MessageEntity:
         return MessageEntity(
             type="custom_emoji",
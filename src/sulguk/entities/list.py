@@ -1,8 +1,8 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sulguk.data import NumberFormat
-from sulguk.render import State, int_to_number
+from sulguk.render import State, list_marker
 from .base import Entity, Group
 
 
@@ -12,35 +12,49 @@ class ListGroup(Entity):
     numbered: bool = False
     reversed: bool = False
     format: NumberFormat = NumberFormat.DECIMAL
-    start: int = 1
+    start: Optional[int] = None
 
     def add(self, entity: Entity):
         self.entities.append(entity)
 
-    def render(self, state: State) -> None:
-        state.canvas.add_new_line_soft()
+    def _get_start(self) -> int:
+        if self.start is not None:
+            return self.start
         if self.reversed:
-            index = len(self.entities)
-            step = -1
+            return sum(isinstance(e, ListItem) for e in self.entities)
+        return 1
+
+    def _add_mark(self, state: State, entity: Entity, index: int) -> int:
+        # returns number of the item, it is used to number the next one
+        if not isinstance(entity, ListItem):
+            return index
+        if entity.value is not None:
+            index = entity.value
+        else:
+            index += -1 if self.reversed else 1
+        if self.numbered:
+            state.canvas.add_text(list_marker(index, self.format))
         else:
-            index = 0
-            step = 1
+            state.canvas.add_text("• ")
+        return index
+
+    def render(self, state: State) -> None:
+        state.canvas.add_new_line_soft()
+        index = self._get_start() + (1 if self.reversed else -1)
         for entity in self.entities:
-            if isinstance(entity, ListItem):
-                if entity.value is not None:
-                    index = entity.value
-                else:
-                    index += step
-
-                if self.numbered:
-                    index_value = int_to_number(index, self.format)
-                    mark = f"{index_value}. "
-                else:
-                    mark = "• "
-                state.canvas.add_text(mark)
+            index = self._add_mark(state, entity, index)
             entity.render(state)
             state.canvas.add_new_line_soft()
 
+    def iter_render(self, state: State) -> Iterator[None]:
+        state.canvas.add_new_line_soft()
+        index = self._get_start() + (1 if self.reversed else -1)
+        for entity in self.entities:
+            index = self._add_mark(state, entity, index)
+            yield from entity.iter_render(state)
+            state.canvas.add_new_line_soft()
+            yield
+
 
 @dataclass
 class ListItem(Group):
@@ -51,3 +65,9 @@ class ListItem(Group):
         state.canvas.indent += 1
         super().render(state)
         state.canvas.indent = indent
+
+    def iter_render(self, state: State) -> Iterator[None]:
+        indent = state.canvas.indent
+        state.canvas.indent += 1
+        yield from super().iter_render(state)
+        state.canvas.indent = indent
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 from sulguk.render import State
 from .base import Entity
+from .emoji import Emoji
 
 
 @dataclass
@@ -9,7 +10,19 @@ class Text(Entity):
     text: str
 
     def render(self, state: State) -> None:
-        state.canvas.add_text(self.text)
+        if state.custom_emoji is None:
+            state.canvas.add_text(self.text)
+            return
+        last = 0
+        for start, end, emoji_id in state.custom_emoji.find(self.text):
+            if start > last:
+                state.canvas.add_text(self.text[last:start])
+            emoji = Emoji(custom_emoji_id=emoji_id)
+            emoji.add(Text(text=self.text[start:end]))
+            emoji.render(state)
+            last = end
+        if last < len(self.text):
+            state.canvas.add_text(self.text[last:])
 
     def add(self, entity: Entity):
         raise ValueError("Text does not supports children")
@@ -0,0 +1,251 @@
+"""
+Incremental rendering of edited documents.
+
+Document is split into chunks before top-level block elements. Each chunk is
+parsed separately, so the result is the same as for the whole document only
+when the chunk leaves the parser in the same state as it started: all
+elements are closed (except `<p>` which is closed by the next block anyway),
+no formatting is left to be reopened and the input did not end inside a tag,
+comment or script. Otherwise the chunk is joined with the next one.
+
+Rendered text of a chunk depends only on its HTML and on the state of canvas
+before it, so it is cached by them and reused with shifted entities.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from html5lib import HTMLParser
+
+from .data import MessageEntity
+from .entities import Group
+from .parsing import release_parser
+from .render import Canvas, EmojiMatcher, State
+from .render.canvas import State as CanvasState
+
+# tags which close an open `<p>`, so a chunk can end inside a paragraph
+BLOCK_START = re.compile(
+    r"<(?:address|article|aside|blockquote|center|details|dialog|dir|div"
+    r"|dl|fieldset|figcaption|figure|footer|header|hgroup|main|menu|nav"
+    r"|ol|p|section|summary|ul|h[1-6]|pre|listing|hr)[\s/>]",
+    re.IGNORECASE,
+)
+# content after `</body>` is parsed differently in fragments, and
+# `<frameset>` replaces the body depending on all content before it
+WHOLE_DOCUMENT = re.compile(r"</(?:body|html)|<frameset", re.IGNORECASE)
+# failed attempts to close a chunk before it is extended to the end
+MAX_EXTENSIONS = 8
+
+ChunkKey = Tuple[bool, str, str]  # is first, compat mode, html
+
+
+class FragmentParser(HTMLParser):
+    """
+    Parser of chunks after the first one.
+
+    Uses the compatibility mode of the document, which is detected
+    from doctype in the first chunk.
+    """
+
+    compat_mode = "no quirks"
+
+    def reset(self):
+        super().reset()
+        self.compatMode = self.compat_mode
+
+
+@dataclass
+class Segment:
+    text: str
+    entities: List[MessageEntity]
+    size: int
+    # the segment removes a trailing space of text before it
+    trims_space: bool
+    state: CanvasState
+
+
+@dataclass
+class Chunk:
+    clean: bool
+    compat_mode: str
+    segments: Dict[CanvasState, Segment] = field(default_factory=dict)
+
+
+class SegmentCanvas(Canvas):
+    """
+    Canvas continuing text rendered before with a given state.
+
+    Previous text is replaced with a single character, so the changes to it
+    can be detected.
+    """
+
+    def __init__(self, state: CanvasState):
+        super().__init__()
+        self.state = state
+        self.trimmed = False
+        self.prefix = 0
+        if state is not CanvasState.START:
+            self._add_text_raw(" " if state is CanvasState.SPACE else "\n")
+            self.prefix = 1
+
+    def _trim_last_space(self):
+        if self.state == CanvasState.SPACE and self.prefix and (
+            len(self._chunks) == 1 and not self.trimmed
+        ):
+            self.trimmed = True
+        super()._trim_last_space()
+
+
+def split_chunks(raw_html: str) -> List[int]:
+    if WHOLE_DOCUMENT.search(raw_html):
+        return [0, len(raw_html)]
+    bounds = [0]
+    for match in BLOCK_START.finditer(raw_html, 1):
+        bounds.append(match.start())
+    bounds.append(len(raw_html))
+    return bounds
+
+
+def is_clean(parser: HTMLParser, html: str, first: bool) -> bool:
+    # some markup like bogus comments is finished by EOF without errors
+    if html.rfind("<") > html.rfind(">"):
+        return False
+    if parser.tree.activeFormattingElements:
+        return False
+    if parser.phase is not parser.phases["inBody"]:
+        return False
+    if any("eof" in error[1].lower() for error in parser.errors):
+        return False
+    names = [element.name for element in parser.tree.openElements]
+    if names[-1] == "p":
+        names.pop()
+    return names == (["html", "body"] if first else ["html"])
+
+
+def parse_chunk(
+    parser: HTMLParser,
+    fragment_parser: FragmentParser,
+    html: str,
+    first: bool,
+    compat_mode: str,
+) -> Tuple[Any, Chunk]:
+    # parsers are reused, so they are released after checking their state
+    if first:
+        try:
+            tree = parser.parse(html)
+            chunk = Chunk(
+                clean=is_clean(parser, html, True),
+                compat_mode=parser.compatMode,
+            )
+        finally:
+            release_parser(parser)
+    else:
+        fragment_parser.compat_mode = compat_mode
+        try:
+            tree = fragment_parser.parseFragment(html, "body")
+            chunk = Chunk(
+                clean=is_clean(fragment_parser, html, False),
+                compat_mode=compat_mode,
+            )
+        finally:
+            release_parser(fragment_parser)
+    return tree, chunk
+
+
+def render_segment(
+    root: Group,
+    state: CanvasState,
+    custom_emoji: Optional[EmojiMatcher] = None,
+) -> Segment:
+    canvas = SegmentCanvas(state)
+    render_state = State(canvas=canvas, custom_emoji=custom_emoji)
+    root.render(render_state)
+    shift = canvas.prefix
+    text = canvas.text
+    if not canvas.trimmed:
+        text = text[shift:]
+    for entity in render_state.entities:
+        entity["offset"] -= shift
+    return Segment(
+        text=text,
+        entities=render_state.entities,
+        size=canvas.size - shift,
+        trims_space=canvas.trimmed,
+        state=canvas.state,
+    )
+
+
+def render_chunks(
+    raw_html: str,
+    cache: Dict[ChunkKey, Chunk],
+    parser: HTMLParser,
+    fragment_parser: FragmentParser,
+    walk: Callable[[Any, bool], Group],
+    split: bool = True,
+    custom_emoji: Optional[EmojiMatcher] = None,
+) -> Tuple[str, List[MessageEntity], int, Dict[ChunkKey, Chunk]]:
+    """
+    Render document reusing chunks from `cache`.
+
+    `walk` converts a parsed document (or a fragment if the second argument
+    is false) into entities. Returns text, entities, size of text and chunks
+    to be used for the next version of the document.
+    """
+    bounds = split_chunks(raw_html) if split else [0, len(raw_html)]
+    new_cache: Dict[ChunkKey, Chunk] = {}
+    texts: List[str] = []
+    entities: List[MessageEntity] = []
+    size = 0
+    canvas_state = CanvasState.START
+    compat_mode = "no quirks"
+
+    start = 0
+    end = 1
+    while end < len(bounds):
+        first = start == 0
+        extensions = 0
+        while True:
+            last = end == len(bounds) - 1
+            html = raw_html[bounds[start]:bounds[end]]
+            key = (first, "" if first else compat_mode, html)
+            chunk = new_cache.get(key) or cache.get(key)
+            tree = None
+            if chunk is None:
+                tree, chunk = parse_chunk(
+                    parser, fragment_parser, html, first, compat_mode,
+                )
+            new_cache[key] = chunk
+            if chunk.clean or last:
+                break
+            extensions += 1
+            end = end + 1 if extensions < MAX_EXTENSIONS else len(bounds) - 1
+
+        segment = chunk.segments.get(canvas_state)
+        if segment is None:
+            if tree is None:
+                tree, _ = parse_chunk(
+                    parser, fragment_parser, html, first, compat_mode,
+                )
+            segment = chunk.segments[canvas_state] = render_segment(
+                walk(tree, first), canvas_state, custom_emoji,
+            )
+
+        if segment.trims_space:
+            last_text = texts.pop()[:-1]
+            if last_text:
+                texts.append(last_text)
+        for entity in segment.entities:
+            entity = entity.copy()
+            entity["offset"] += size
+            entities.append(entity)
+        size += segment.size
+        if segment.text:
+            texts.append(segment.text)
+        canvas_state = segment.state
+        if first:
+            compat_mode = chunk.compat_mode
+
+        start = end
+        end += 1
+    return "".join(texts), entities, size, new_cache
+
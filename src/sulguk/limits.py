@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+
+class LimitExceededError(ValueError):
+    def __init__(self, limit: str, maximum: int):
+        super().__init__(f"Limit exceeded: {limit} > {maximum}")
+        self.limit = limit
+        self.maximum = maximum
+
+
+@dataclass(frozen=True)
+class Limits:
+    """
+    Limits for rendering untrusted HTML. `None` means no limit.
+
+    Limits are checked while the document is processed, so rendering stops
+    as soon as any of them is exceeded.
+    """
+    max_input_bytes: Optional[int] = None
+    max_elements: Optional[int] = None
+    max_depth: Optional[int] = None
+    max_length: Optional[int] = None  # in UTF-16 code units, like telegram
+    max_entities: Optional[int] = None
+
+
+NO_LIMITS = Limits()
+# text message in telegram
+MESSAGE_LIMITS = Limits(max_length=4096, max_entities=100)
+
+
+def check_input_size(
+    raw_html: Union[str, bytes, bytearray, memoryview], limits: Limits,
+) -> None:
+    maximum = limits.max_input_bytes
+    if maximum is None:
+        return
+    if not isinstance(raw_html, str):
+        with memoryview(raw_html) as view:
+            if view.nbytes > maximum:
+                raise LimitExceededError("max_input_bytes", maximum)
+        return
+    # utf-8 takes from 1 to 4 bytes per character,
+    # so encoding is needed only for some lengths
+    if len(raw_html) > maximum:
+        raise LimitExceededError("max_input_bytes", maximum)
+    if len(raw_html) * 4 <= maximum:
+        return
+    if len(raw_html.encode("utf-8", "surrogatepass")) > maximum:
+        raise LimitExceededError("max_input_bytes", maximum)
+
+
+def check_output(size: int, entities: int, limits: Limits) -> None:
+    if limits.max_length is not None and size > limits.max_length:
+        raise LimitExceededError("max_length", limits.max_length)
+    if limits.max_entities is not None and entities > limits.max_entities:
+        raise LimitExceededError("max_entities", limits.max_entities)
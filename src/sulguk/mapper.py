@@ -1,6 +1,14 @@
 import urllib.parse
-from functools import cached_property, partial
-from typing import Any, Callable, List, Optional, ParamSpec, Tuple
+from functools import cached_property, lru_cache, partial
+from typing import (
+    Any,
+    Callable,
+    List,
+    Mapping,
+    Optional,
+    ParamSpec,
+    Tuple,
+)
 
 from .entities import (
     Blockquote,
@@ -22,9 +30,9 @@ from .entities import (
     Spoiler,
     Strikethrough,
     Stub,
+    Style,
     Text,
     Underline,
-    Uppercase,
     ZeroWidthSpace,
 )
 from .render.numbers import NumberFormat
@@ -33,6 +41,13 @@ P = ParamSpec("P")
 
 Attrs = List[Tuple[str, str]]
 EntityPair = Tuple[Optional[Entity], Optional[Entity]]
+# Returns inner entity to add children to (if differs) and entity itself
+TagFactory = Callable[[Attrs], EntityPair]
+# Returns new absolute URL or None to drop the link
+UrlRewriter = Callable[[str], Optional[str]]
+
+# number of resolved URLs to remember
+URL_CACHE_SIZE = 1024
 
 OL_FORMAT = {
     "1": NumberFormat.DECIMAL,
@@ -44,10 +59,41 @@ OL_FORMAT = {
 
 LANG_CLASS_PREFIX = "language-"
 
+HEADER_STYLES = {
+    "h1": ("bold", "underline"),
+    "h2": ("bold", "underline"),
+    "h3": ("bold",),
+    "h4": ("italic", "underline"),
+    "h5": ("italic",),
+    "h6": ("italic",),
+}
+
+# tags which are always rendered as a single entity
+ENTITY_TAGS = {
+    "b", "strong", "i", "em", "cite", "var", "tt", "s", "strike", "del",
+    "u", "ins", "code", "kbd", "samp", "pre", "blockquote", "details",
+    "tg-spoiler",
+}
+
 
 class Mapper:
-    def __init__(self, base_url: str | None = None):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        tags: Mapping[str, TagFactory] | None = None,
+        url_rewriter: UrlRewriter | None = None,
+    ):
         self._base_url = base_url
+        self._tags = tags
+        self._url_rewriter = url_rewriter
+        # results of `url_rewriter` by absolute URL
+        self._rewritten: dict[str, str | None] = {}
+
+    def prepare(self) -> None:
+        """
+        Build the tag table, so the mapper can be shared between threads.
+        """
+        self._map  # noqa: B018
 
     def match(self, tag: str, attrs: Attrs) -> EntityPair:
         factory = self._map.get(tag)
@@ -56,8 +102,69 @@ class Mapper:
         inner, entity = factory(attrs)
         return inner, entity
 
+    def is_supported(self, tag: str) -> bool:
+        return tag in self._map
+
+    def check_attrs(self, tag: str, attrs: Attrs) -> List[str]:
+        """
+        Find attribute values which `match` cannot convert.
+        """
+        if self._tags and tag in self._tags:
+            return []  # custom factories check attributes themselves
+        if tag == "ol":
+            problems = _check_number(tag, "start", attrs, int)
+            type_ = self._find_attr("type", attrs)
+            if type_ and type_ not in OL_FORMAT:
+                problems.append(
+                    f"Unsupported `type` of <ol>: {type_!r}, "
+                    f"expected one of {', '.join(OL_FORMAT)}",
+                )
+            return problems
+        if tag == "li":
+            return _check_number(tag, "value", attrs, int)
+        if tag in ("progress", "meter"):
+            names = ("value", "min", "max") if tag == "meter" else (
+                "value", "max",
+            )
+            return [
+                problem
+                for name in names
+                for problem in _check_number(tag, name, attrs, float)
+            ]
+        return []
+
+    def count_entities(self, tag: str, attrs: Attrs) -> int:
+        """
+        Number of message entities which `match` result renders.
+
+        URLs are not resolved, so links dropped by `url_rewriter` are
+        counted too. Tags of custom factories are not counted.
+        """
+        if self._tags and tag in self._tags:
+            return 0
+        if tag in ENTITY_TAGS:
+            return 1
+        if tag in HEADER_STYLES:
+            return len(HEADER_STYLES[tag])
+        if tag == "mark":
+            return 2
+        if tag == "a":
+            return 1 if self._find_attr("href", attrs) else 0
+        if tag == "img":
+            return 1 if self._find_attr("src", attrs) else 0
+        if tag == "input":
+            type_ = self._find_attr("type", attrs)
+            if type_ in ("checkbox", "radio"):
+                return 0
+            return 1 if self._find_attr("value", attrs) else 0
+        if tag == "span":
+            return 1 if "tg-spoiler" in self._get_classes(attrs) else 0
+        if tag == "tg-emoji":
+            return 1 if self._find_attr("emoji-id", attrs) else 0
+        return 0
+
     @cached_property
-    def _map(self) -> dict[str, Callable[[Attrs], EntityPair]]:
+    def _map(self) -> dict[str, TagFactory]:
         _map = {
             # single tags
             "br": self._adapt_factory(NewLine),
@@ -113,6 +220,8 @@ class Mapper:
         for tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
             _map[tag] = partial(self._get_h, tag=tag)
 
+        if self._tags:
+            _map.update(self._tags)
         return _map
 
     def _adapt_factory(
@@ -120,7 +229,7 @@ class Mapper:
         factory: Callable[P, Optional[Entity]],
         *args: P.args,
         **kwargs: P.kwargs,
-    ) -> Callable[[Attrs], EntityPair]:
+    ) -> TagFactory:
         def wrapper(attrs):
             inner = None
             entity = factory(*args, **kwargs)
@@ -131,9 +240,20 @@ class Mapper:
     def _fix_url(self, url: str | None) -> str | None:
         if url is None:
             return None
-        if self._base_url is None:
+        if self._base_url is None and self._url_rewriter is None:
+            return url
+        if self._base_url is not None:
+            url = _urljoin(self._base_url, url)
+        if self._url_rewriter is None:
             return url
-        return urllib.parse.urljoin(self._base_url, url)
+        try:
+            return self._rewritten[url]
+        except KeyError:
+            pass
+        if len(self._rewritten) >= URL_CACHE_SIZE:
+            self._rewritten.clear()
+        rewritten = self._rewritten[url] = self._url_rewriter(url)
+        return rewritten
 
     def _find_attr(self, name: str, attrs: Attrs, default: Any = ""):
         return next((value for key, value in attrs if key == name), default)
@@ -144,8 +264,9 @@ class Mapper:
     def _get_a(self, attrs: Attrs) -> EntityPair:
         inner = None
         url = self._find_attr("href", attrs)
+        url = self._fix_url(url) if url else None
         if url:
-            return inner, Link(url=self._fix_url(url))
+            return inner, Link(url=url)
         return inner, Group()
 
     def _get_img(self, attrs: Attrs) -> EntityPair:
@@ -156,9 +277,10 @@ class Mapper:
             return inner, None
 
         text_entity = Text(text="🖼️" + text)
+        url = self._fix_url(url) if url else None
         if not url:
             return inner, text_entity
-        link = Link(url=self._fix_url(url))
+        link = Link(url=url)
         link.add(text_entity)
         return inner, link
 
@@ -189,7 +311,7 @@ class Mapper:
         inner = None
         start = self._find_attr("start", attrs)
         if not start:
-            start = 1
+            start = None
         else:
             start = int(start)
 
@@ -250,33 +372,14 @@ class Mapper:
         )
 
     def _get_mark(self, attrs: Attrs) -> EntityPair:
-        inner = Group()
-        entity = Group()
-        entity.add(Italic(entities=[Bold(entities=[inner])]))
-        return inner, entity
+        inner = None
+        return inner, Style(types=("italic", "bold"))
 
     def _get_h(self, attrs: Attrs, tag: str) -> EntityPair:
-        inner = Group()
+        inner = Style(types=HEADER_STYLES[tag], uppercase=tag == "h1")
         entity = Group(block=True)
         entity.add(Paragraph())
-        if tag == "h1":
-            entity.add(
-                Bold(
-                    entities=[
-                        Underline(entities=[Uppercase(entities=[inner])]),
-                    ],
-                ),
-            )
-        elif tag == "h2":
-            entity.add(Bold(entities=[Underline(entities=[inner])]))
-        elif tag == "h3":
-            entity.add(Bold(entities=[inner]))
-        elif tag == "h4":
-            entity.add(Italic(entities=[Underline(entities=[inner])]))
-        elif tag == "h5":
-            entity.add(Italic(entities=[inner]))
-        if tag == "h6":
-            entity.add(Italic(entities=[inner]))
+        entity.add(inner)
         return inner, entity
 
     def _get_progress(self, attrs: Attrs) -> EntityPair:
@@ -305,5 +408,27 @@ class Mapper:
             return inner, Group()
 
 
+# documents usually repeat the same links many times, and mappers of
+# different renderers usually share base_url
+_urljoin = lru_cache(maxsize=URL_CACHE_SIZE)(urllib.parse.urljoin)
+
+
 def _add_map_keys(map, keys, default):
     map.update(dict.fromkeys(keys, default))
+
+
+def _check_number(
+    tag: str, name: str, attrs: Attrs, type_: Callable[[str], Any],
+) -> List[str]:
+    for key, value in attrs:
+        if key != name:
+            continue
+        # empty values are ignored by lists, but not by progress bars
+        if not value and type_ is int:
+            return []
+        try:
+            type_(value)
+        except ValueError:
+            return [f"Invalid `{name}` of <{tag}>: {value!r} is not a number"]
+        return []
+    return []
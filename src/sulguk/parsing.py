@@ -0,0 +1,97 @@
+from typing import Any, Generator, Iterator
+
+from html5lib import HTMLParser, getTreeBuilder
+
+# tokens parsed by `iter_parse` between yields
+SLICE_TOKENS = 100
+
+
+def _tokenizer_class() -> type:
+    # the tokenizer is not a public API of html5lib, so if its module is
+    # moved, it is taken from a parser
+    parser = HTMLParser(getTreeBuilder("etree"))
+    parser.parse("")
+    return type(parser.tokenizer)
+
+
+try:
+    from html5lib._tokenizer import HTMLTokenizer
+except ImportError:
+    HTMLTokenizer = _tokenizer_class()
+
+
+def release_parser(parser: HTMLParser) -> None:
+    """
+    Drop the document and the input kept by a parser after parsing.
+
+    html5lib keeps both until the next document is parsed, so a parser
+    reused between documents would hold the last one in memory.
+
+    Nodes of html5lib tree reference their parents, so they are unlinked
+    first. Otherwise they are freed only by the garbage collector and keep
+    parsed elements alive while the document is walked.
+    """
+    nodes = [parser.tree.document]
+    while nodes:
+        children = nodes.pop().childNodes
+        nodes.extend(children)
+        children.clear()
+    parser.reset()
+    parser.tokenizer = None
+
+
+class _PauseError(Exception):
+    """
+    Raised by the tokenizer to leave the parser main loop.
+    """
+
+
+class PausingTokenizer(HTMLTokenizer):
+    """
+    Tokenizer which stops the parser main loop after each `slice_tokens`.
+
+    The loop is left between tokens, so calling it again continues parsing
+    where it stopped.
+    """
+
+    def __init__(self, stream: Any, parser: HTMLParser, slice_tokens: int):
+        super().__init__(stream, parser=parser)
+        self.slice_tokens = slice_tokens
+        self._tokens = None
+
+    def __iter__(self) -> Iterator[dict]:
+        if self._tokens is None:
+            self._tokens = super().__iter__()
+        count = 0
+        for token in self._tokens:
+            yield token
+            count += 1
+            if count == self.slice_tokens:
+                raise _PauseError
+
+
+def iter_parse(
+    parser: HTMLParser,
+    html: str,
+    slice_tokens: int = SLICE_TOKENS,
+) -> Generator[None, None, Any]:
+    """
+    Parse a document yielding after each `slice_tokens` tokens.
+
+    Returns the same as `parser.parse`. The parser must not be used for
+    other documents until parsing is finished.
+    """
+    # the same as `HTMLParser.parse` does. A string is never parsed again
+    # with another encoding, so the main loop is run once, by parts
+    parser.innerHTMLMode = False
+    parser.container = "div"
+    parser.scripting = False
+    parser.tokenizer = PausingTokenizer(html, parser, slice_tokens)
+    parser.reset()
+    while True:
+        try:
+            parser.mainLoop()
+        except _PauseError:
+            yield
+        else:
+            return parser.tree.getDocument()
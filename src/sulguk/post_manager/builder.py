@@ -0,0 +1,26 @@
+import logging
+import time
+
+from sulguk import build_catalog
+from .exceptions import ManagerError
+from .params import BuildArgs
+
+logger = logging.getLogger(__name__)
+
+
+def build(args: BuildArgs) -> None:
+    start = time.perf_counter()
+    try:
+        rendered, reused = build_catalog(
+            directory=args.directory,
+            path=args.output,
+            base_url=args.base_url,
+            pattern=args.pattern,
+        )
+    except (OSError, ValueError) as e:
+        logger.error("Cannot build catalog: %s", e)
+        raise ManagerError from e
+    logger.info(
+        "Catalog `%s` is built in %.2f s: %s files rendered, %s reused",
+        args.output, time.perf_counter() - start, rendered, reused,
+    )
@@ -1,19 +1,143 @@
+import json
+import os
+import time
 from logging import getLogger
-from typing import Union
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, TypeVar, Union
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import ChatFullInfo
 
 from .exceptions import ChatNotFoundError
 
 logger = getLogger(__name__)
 
+ChatId = Union[str, int]
+T = TypeVar("T")
 
-async def get_chat(bot: Bot, chat_id: Union[str, int]):
+CHAT_CACHE_TTL = 24 * 60 * 60
+# changes with every post, so it is never taken from cache
+VOLATILE_FIELDS = {"pinned_message"}
+
+
+def default_cache_path() -> Path:
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "sulguk" / "chats.json"
+
+
+class ChatCache:
+    """
+    Chat information stored on disk between runs.
+
+    Entries are keyed by bot id and chat id (or username) as passed to
+    `get_chat`, and expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        ttl: float = CHAT_CACHE_TTL,
+    ):
+        self.path = Path(path) if path else default_cache_path()
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning("Chat cache `%s` is broken, ignoring", self.path)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, bot_id: int, chat_id: ChatId) -> Optional[ChatFullInfo]:
+        entry = self._entries.get(f"{bot_id}:{chat_id}")
+        if entry is None or time.time() - entry["time"] > self.ttl:
+            return None
+        try:
+            return ChatFullInfo.model_validate(entry["chat"])
+        except ValueError:  # stored by other version of aiogram
+            return None
+
+    def set(self, bot_id: int, chat_id: ChatId, chat: ChatFullInfo) -> None:
+        self._entries[f"{bot_id}:{chat_id}"] = {
+            "time": time.time(),
+            "chat": chat.model_dump(
+                mode="json", exclude=VOLATILE_FIELDS, exclude_none=True,
+            ),
+        }
+        self._save()
+
+    def invalidate(
+        self, bot_id: int, chat_id: Optional[ChatId] = None,
+    ) -> None:
+        """
+        Remove information about a chat or all chats of the bot.
+        """
+        if chat_id is not None:
+            removed = self._entries.pop(f"{bot_id}:{chat_id}", None)
+        else:
+            prefix = f"{bot_id}:"
+            removed = [key for key in self._entries if key.startswith(prefix)]
+            for key in removed:
+                del self._entries[key]
+        if removed:
+            self._save()
+
+
+async def get_chat(
+    bot: Bot, chat_id: ChatId, cache: Optional[ChatCache] = None,
+):
+    """
+    Load chat information. It is stored in `cache` if one is passed.
+
+    Pinned message is not cached, so use it only with `cache=None`.
+    """
     try:
-        return await bot.get_chat(chat_id)
+        chat = await bot.get_chat(chat_id)
     except TelegramBadRequest as e:
         if "chat not found" in e.message:
             logger.error("Chat %s not found", chat_id)
+            if cache:
+                cache.invalidate(bot.id, chat_id)
             raise ChatNotFoundError from e
         raise
+    if cache:
+        cache.set(bot.id, chat_id, chat)
+    return chat
+
+
+async def with_chat(
+    bot: Bot,
+    chat_id: ChatId,
+    cache: Optional[ChatCache],
+    action: Callable[[ChatFullInfo], Awaitable[T]],
+) -> T:
+    """
+    Call `action` with the chat loaded from cache or from telegram.
+
+    If the cached chat is not found by telegram anymore, it is loaded again
+    and the action is retried.
+    """
+    chat = cache.get(bot.id, chat_id) if cache else None
+    if chat is not None:
+        try:
+            return await action(chat)
+        except TelegramBadRequest as e:
+            if "chat not found" not in e.message:
+                raise
+            logger.info("Cached chat %s is outdated, reloading", chat_id)
+            cache.invalidate(bot.id, chat_id)
+    chat = await get_chat(bot, chat_id, cache)
+    return await action(chat)
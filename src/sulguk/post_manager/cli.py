@@ -2,12 +2,15 @@ import asyncio
 import logging
 import os
 
-from aiogram import Bot
-
+from .builder import build
+from .chat_info import ChatCache
+from .converter import convert
 from .editor import edit
 from .exceptions import ManagerError
-from .params import parse_args
+from .params import EditArgs, SendArgs, parse_args
+from .replay import replay
 from .sender import send
+from .session import create_bot
 
 
 async def main():
@@ -16,15 +19,36 @@ async def main():
         format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
     )
     logging.getLogger("aiogram").setLevel(logging.WARNING)
-    bot = Bot(token=os.getenv("BOT_TOKEN"))
     args = parse_args()
     try:
-        if args.command == "edit":
-            await edit(bot, args)
+        if args.command == "serve":
+            # the server is not needed by other commands
+            from .server import serve
+            await serve(args)
+        elif args.command == "convert":
+            convert(args)
+        elif args.command == "build":
+            build(args)
+        elif args.command == "replay":
+            replay(args)
         else:
-            await send(bot, args)
+            await run_bot(args)
     except ManagerError:
         logging.error("There were errors during execution. See above")
+
+
+async def run_bot(args: SendArgs | EditArgs):
+    bot = create_bot(os.getenv("BOT_TOKEN"), os.getenv("BOT_API_URL"))
+    cache = None
+    if not args.no_chat_cache:
+        cache = ChatCache(ttl=args.chat_cache_ttl)
+        if args.refresh_chat_cache:
+            cache.invalidate(bot.id)
+    try:
+        if args.command == "edit":
+            await edit(bot, args, cache)
+        else:
+            await send(bot, args, cache)
     finally:
         await bot.session.close()
 
@@ -0,0 +1,137 @@
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from sulguk import Renderer
+from .exceptions import ManagerError
+from .params import ConvertArgs
+
+logger = logging.getLogger(__name__)
+
+_renderer: Optional[Renderer] = None
+
+
+def _init_worker(base_url: Optional[str]) -> None:
+    global _renderer
+    _renderer = Renderer(base_url=base_url)
+
+
+def _convert_chunk(filenames: List[str]) -> List[Dict[str, Any]]:
+    results = []
+    for filename in filenames:
+        try:
+            with open(filename, "rb") as f:
+                result = _renderer.render(f.read())
+        except Exception as e:  # noqa: BLE001 one file must not fail others
+            results.append({"file": filename, "error": str(e)})
+        else:
+            results.append({
+                "file": filename,
+                "text": result.text,
+                "entities": result.entities,
+            })
+    return results
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@dataclass
+class ConvertStats:
+    files: int = 0
+    errors: int = 0
+    elapsed: float = 0
+
+
+def convert_files(
+    filenames: Iterable[str],
+    output: TextIO,
+    base_url: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+) -> ConvertStats:
+    """
+    Render files in a pool of processes and write results as JSON lines.
+
+    Results are written in the order of `filenames` as soon as they are
+    ready. Only a few chunks per worker are rendered at once, so neither
+    file names nor results are collected in memory.
+    """
+    workers = workers or os.cpu_count() or 1
+    window_size = workers * 2
+    stats = ConvertStats()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(base_url,),
+    ) as executor:
+        window: Deque[Future] = deque()
+
+        def write_first() -> None:
+            for result in window.popleft().result():
+                stats.files += 1
+                if "error" in result:
+                    stats.errors += 1
+                    logger.error(
+                        "Cannot convert `%s`: %s",
+                        result["file"], result["error"],
+                    )
+                output.write(json.dumps(result, ensure_ascii=False))
+                output.write("\n")
+
+        for chunk in _chunks(filenames, chunk_size):
+            if len(window) >= window_size:
+                write_first()
+            window.append(executor.submit(_convert_chunk, chunk))
+        while window:
+            write_first()
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def expand_files(
+    patterns: Iterable[str], files_from: Optional[str],
+) -> Iterator[str]:
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            yield from sorted(glob.iglob(pattern, recursive=True))
+        else:
+            yield pattern
+    if files_from:
+        f = sys.stdin if files_from == "-" else open(files_from)
+        with f:
+            for line in f:
+                if line := line.strip():
+                    yield line
+
+
+def convert(args: ConvertArgs) -> None:
+    filenames = expand_files(args.file, args.files_from)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            stats = convert_files(
+                filenames, output, args.base_url, args.workers,
+            )
+    else:
+        stats = convert_files(
+            filenames, sys.stdout, args.base_url, args.workers,
+        )
+    logger.info(
+        "Converted %s files in %.2f s: %.1f files/s",
+        stats.files,
+        stats.elapsed,
+        stats.files / stats.elapsed if stats.elapsed else 0,
+    )
+    if stats.errors:
+        logger.error("%s files were not converted", stats.errors)
+        raise ManagerError
@@ -1,15 +1,55 @@
+import asyncio
 import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
 
 from sulguk import RenderResult, transform_html
 from .exceptions import ManagerError
 
 logger = logging.getLogger(__name__)
 
+# smaller files are cheaper to read than to map
+MMAP_THRESHOLD = 1024 * 1024
+# fewer files are rendered in a thread, as starting processes takes longer
+PARALLEL_FILES = 4
+
 
 def load_file(filename, base_url: str | None) -> RenderResult:
     try:
-        with open(filename) as f:
-            return transform_html(f.read(), base_url=base_url)
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+                return transform_html(f.read(), base_url=base_url)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return transform_html(data, base_url=base_url)
     except FileNotFoundError as e:
         logger.error("File `%s` not found", filename)
         raise ManagerError from e
+
+
+def load_files(
+    filenames: Sequence[str], base_url: str | None,
+) -> List[RenderResult]:
+    return [load_file(filename, base_url) for filename in filenames]
+
+
+async def render_files(
+    filenames: Sequence[str], base_url: str | None,
+) -> List[RenderResult]:
+    """
+    Render files without blocking the event loop.
+
+    A few files are rendered in a thread, many of them in parallel processes.
+    """
+    loop = asyncio.get_running_loop()
+    workers = min(len(filenames), os.cpu_count() or 1)
+    if len(filenames) < PARALLEL_FILES or workers < 2:
+        return await loop.run_in_executor(
+            None, load_files, filenames, base_url,
+        )
+    with ProcessPoolExecutor(workers) as executor:
+        return await asyncio.gather(*(
+            loop.run_in_executor(executor, load_file, filename, base_url)
+            for filename in filenames
+        ))
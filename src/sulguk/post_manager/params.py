@@ -1,10 +1,17 @@
 from argparse import ArgumentParser
 from typing import List, Literal, Union
 
+from .chat_info import CHAT_CACHE_TTL
 from .links import Link, parse_link
 
 
-class SendArgs:
+class ChatCacheArgs:
+    no_chat_cache: bool
+    refresh_chat_cache: bool
+    chat_cache_ttl: float
+
+
+class SendArgs(ChatCacheArgs):
     command: Literal["send"]
     mode: Literal["poll", "getChat"]
     destination: Link
@@ -12,13 +19,66 @@ class SendArgs:
     base_url: str | None
 
 
-class EditArgs:
+class EditArgs(ChatCacheArgs):
     command: Literal["edit"]
     destination: Link
     file: str
     base_url: str | None
 
 
+class ServeArgs:
+    command: Literal["serve"]
+    socket: str | None
+    host: str
+    port: int
+    workers: int | None
+    max_pending: int | None
+    max_requests: int | None
+    cache: str | None
+    cache_size: int
+
+
+class BuildArgs:
+    command: Literal["build"]
+    directory: str
+    output: str
+    base_url: str | None
+    pattern: str
+
+
+class ConvertArgs:
+    command: Literal["convert"]
+    file: List[str]
+    files_from: str | None
+    output: str | None
+    base_url: str | None
+    workers: int | None
+
+
+class ReplayArgs:
+    command: Literal["replay"]
+    capture: List[str]
+    sort: str
+    limit: int
+    repeat: int
+    output: str | None
+
+
+def add_chat_cache_args(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-chat-cache", action="store_true",
+        help="Always load chat information from telegram",
+    )
+    parser.add_argument(
+        "--refresh-chat-cache", action="store_true",
+        help="Drop cached information about chats of the bot",
+    )
+    parser.add_argument(
+        "--chat-cache-ttl", type=float, default=CHAT_CACHE_TTL,
+        help="Seconds to keep chat information. Defaults to one day",
+    )
+
+
 def init_parser():
     root = ArgumentParser(prog='Sulguk message manager')
     subparsers = root.add_subparsers(dest="command")
@@ -36,6 +96,7 @@ def init_parser():
     sender.add_argument(
         "--base-url", default=None,
     )
+    add_chat_cache_args(sender)
     editor = subparsers.add_parser("edit")
     editor.add_argument(
         "--base-url", default=None,
@@ -46,9 +107,108 @@ def init_parser():
     editor.add_argument(
         "file",
     )
+    add_chat_cache_args(editor)
+    server = subparsers.add_parser("serve")
+    server.add_argument(
+        "-s", "--socket", default=None,
+        help="Unix socket path. Used instead of host and port",
+    )
+    server.add_argument(
+        "--host", default="127.0.0.1",
+    )
+    server.add_argument(
+        "-p", "--port", type=int, default=8080,
+    )
+    server.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Number of worker processes. Defaults to number of CPUs",
+    )
+    server.add_argument(
+        "--max-pending", type=int, default=None,
+        help="Number of chunks rendered at once. Defaults to 2 per worker",
+    )
+    server.add_argument(
+        "--max-requests", type=int, default=None,
+        help="Number of requests accepted at once, others get 503. "
+             "Defaults to 4 times max pending",
+    )
+    server.add_argument(
+        "--cache", default=None,
+        help="Sqlite file to share rendered messages between workers "
+             "and servers on the host",
+    )
+    server.add_argument(
+        "--cache-size", type=int, default=64,
+        help="Maximum size of the cache in megabytes",
+    )
+    converter = subparsers.add_parser("convert")
+    converter.add_argument(
+        "file", nargs="*",
+        help="Files or glob patterns, like `posts/**/*.html`",
+    )
+    converter.add_argument(
+        "--files-from", default=None,
+        help="File with a list of files, one per line. Use `-` for stdin",
+    )
+    converter.add_argument(
+        "-o", "--output", default=None,
+        help="JSONL file to write results. Defaults to stdout",
+    )
+    converter.add_argument(
+        "--base-url", default=None,
+    )
+    converter.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Number of worker processes. Defaults to number of CPUs",
+    )
+    builder = subparsers.add_parser("build")
+    builder.add_argument(
+        "directory",
+    )
+    builder.add_argument(
+        "-o", "--output", required=True,
+        help="Catalog file to create or update",
+    )
+    builder.add_argument(
+        "--base-url", default=None,
+    )
+    builder.add_argument(
+        "--pattern", default="**/*.html",
+        help="Glob pattern of files in the directory",
+    )
+    replay = subparsers.add_parser(
+        "replay",
+        description=(
+            "Profile captured slow renders. Settings of renderers are "
+            "restored except custom tags and url_rewriter, which cannot "
+            "be saved"
+        ),
+    )
+    replay.add_argument(
+        "capture", nargs="+",
+        help="Captured slow renders or directories with them",
+    )
+    replay.add_argument(
+        "--sort", default="cumulative",
+        help="Sort order of profile statistics",
+    )
+    replay.add_argument(
+        "--limit", type=int, default=30,
+        help="Number of functions shown for each capture",
+    )
+    replay.add_argument(
+        "-n", "--repeat", type=int, default=1,
+        help="Number of times each capture is rendered",
+    )
+    replay.add_argument(
+        "-o", "--output", default=None,
+        help="File to dump profile of all captures for other tools",
+    )
     return root
 
 
-def parse_args() -> Union[SendArgs, EditArgs]:
+def parse_args() -> Union[
+    SendArgs, EditArgs, ServeArgs, ConvertArgs, BuildArgs, ReplayArgs,
+]:
     parser = init_parser()
     return parser.parse_args()
@@ -0,0 +1,86 @@
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+from sulguk import Limits, Renderer
+from sulguk.capture import RenderCapture, iter_captures
+from .exceptions import ManagerError
+from .params import ReplayArgs
+
+logger = logging.getLogger(__name__)
+
+
+def _format_timings(timings: Dict[str, float]) -> str:
+    return ", ".join(
+        f"{stage} {seconds * 1000:.1f} ms"
+        for stage, seconds in timings.items()
+    )
+
+
+def _renderer(path: Path, capture: RenderCapture) -> Renderer:
+    if capture.custom_tags or capture.url_rewriter:
+        logger.warning(
+            "%s: custom tags and url_rewriter are not restored, "
+            "replay can differ from the captured render", path,
+        )
+    return Renderer(
+        base_url=capture.base_url,
+        strict=capture.strict,
+        merge=capture.merge,
+        fused=capture.fused,
+        limits=Limits(**capture.limits),
+        custom_emoji=capture.custom_emoji,
+    )
+
+
+def _render(renderer: Renderer, capture: RenderCapture) -> None:
+    try:
+        renderer.render(capture.html)
+    except (ValueError, KeyError):
+        if capture.error is None:
+            raise
+        # failed as captured
+
+
+def replay(args: ReplayArgs) -> None:
+    total = None
+    replayed = 0
+    try:
+        for path, capture in iter_captures(args.capture):
+            renderer = _renderer(path, capture)
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                profile.runcall(_render, renderer, capture)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            logger.info(
+                "%s: captured %.3f s (%s), replayed with profiler %.3f s, %s",
+                path, sum(capture.timings.values()),
+                _format_timings(capture.timings), elapsed,
+                json.dumps(capture.counts),
+            )
+            if capture.error:
+                logger.info("%s: failed with %s", path, capture.error)
+            stats = pstats.Stats(profile, stream=sys.stdout)
+            stats.sort_stats(args.sort).print_stats(args.limit)
+            if total is None:
+                total = pstats.Stats(profile)
+            else:
+                total.add(profile)
+            replayed += 1
+    except (OSError, ValueError, TypeError) as e:
+        logger.error("Cannot replay capture: %s", e)
+        raise ManagerError from e
+    if total is None:
+        logger.error("No captures found")
+        raise ManagerError
+    if args.output:
+        total.dump_stats(args.output)
+        logger.info(
+            "Profile of %s captures is saved to `%s`", replayed, args.output,
+        )
@@ -1,13 +1,13 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 from aiogram import Bot, Dispatcher, F
 from aiogram.types import Chat, LinkPreviewOptions, Message
 
-from .chat_info import get_chat
+from .chat_info import ChatCache, get_chat, with_chat
 from .exceptions import LinkedMessageNotFoundError
-from .file import load_file
+from .file import render_files
 from .links import make_link, unparse_link
 from .params import SendArgs
 
@@ -64,17 +64,38 @@ get_linked_message = {
 }
 
 
-async def send(bot: Bot, args: SendArgs):
-    chat = await get_chat(bot, args.destination.group_id)
-    data = load_file(args.file[0], args.base_url)
-    message = await bot.send_message(
-        chat_id=chat.id,
-        text=data.text,
-        entities=data.entities,
-        link_preview_options=LinkPreviewOptions(
-            is_disabled=True,
-        ),
-    )
+def _discard(task: asyncio.Future) -> None:
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()  # already reported by the caller
+
+
+async def send(
+        bot: Bot, args: SendArgs, cache: Optional[ChatCache] = None,
+):
+    # render all files while the chat is loaded, so an error in any of
+    # them is found before the post is published
+    rendering = asyncio.ensure_future(render_files(args.file, args.base_url))
+
+    async def send_post(chat: Chat) -> Tuple[Chat, Message]:
+        data = (await rendering)[0]
+        message = await bot.send_message(
+            chat_id=chat.id,
+            text=data.text,
+            entities=data.entities,
+            link_preview_options=LinkPreviewOptions(
+                is_disabled=True,
+            ),
+        )
+        return chat, message
+
+    try:
+        chat, message = await with_chat(
+            bot, args.destination.group_id, cache, send_post,
+        )
+    finally:
+        _discard(rendering)
     message_link = make_link(chat, message)
     logger.info("Message sent: %s", unparse_link(message_link))
     if len(args.file) < 2:
@@ -83,8 +104,7 @@ async def send(bot: Bot, args: SendArgs):
     if not linked_message:
         logger.error("Cannot load linked message to leave a comment")
         raise LinkedMessageNotFoundError("No linked message found")
-    for file in args.file[1:]:
-        data = load_file(file, args.base_url)
+    for data in rendering.result()[1:]:
         comment = await bot.send_message(
             chat_id=chat.linked_chat_id,
             reply_to_message_id=linked_message.message_id,
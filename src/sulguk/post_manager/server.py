@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from sulguk import Renderer, SharedRenderCache
+from sulguk.shared_cache import MAX_BYTES
+from .params import ServeArgs
+
+logger = logging.getLogger(__name__)
+
+MAX_RENDERERS = 128
+# seconds clients are asked to wait when the server is busy
+RETRY_AFTER = 1
+
+# renderers of a worker process, by base_url and merge
+_renderers: Dict[Tuple[Optional[str], bool], Renderer] = {}
+_cache: Optional[SharedRenderCache] = None
+
+
+def _get_renderer(base_url: Optional[str], merge: bool) -> Renderer:
+    key = (base_url, merge)
+    renderer = _renderers.get(key)
+    if renderer is None:
+        if len(_renderers) >= MAX_RENDERERS:
+            _renderers.clear()
+        renderer = _renderers[key] = Renderer(base_url=base_url, merge=merge)
+    return renderer
+
+
+def init_worker(
+    cache_path: Optional[str] = None, cache_size: int = MAX_BYTES,
+) -> None:
+    global _cache
+    if cache_path:
+        _cache = SharedRenderCache(cache_path, max_bytes=cache_size)
+    # import everything and create parser before the first request
+    _get_renderer(None, False).render("<b>warm up</b>")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def render_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    for item in items:
+        try:
+            renderer = _get_renderer(
+                item.get("base_url"), bool(item.get("merge", False)),
+            )
+            if _cache is not None:
+                result = _cache.render(renderer, item["html"])
+            else:
+                result = renderer.render(item["html"])
+        except Exception as e:  # noqa: BLE001 one item must not fail others
+            results.append({"error": f"{type(e).__name__}: {e}"})
+        else:
+            results.append({"text": result.text, "entities": result.entities})
+    return results
+
+
+def _bad_request(error: str) -> web.Response:
+    return web.json_response({"error": error}, status=400)
+
+
+class RenderServer:
+    """
+    HTTP server rendering HTML in a pool of worker processes.
+
+    `POST /render` accepts an object `{"html": ..., "base_url": ...,
+    "merge": ...}` or a list of them, and returns
+    `{"text": ..., "entities": ...}` or a list in the same order.
+    Items of a list are split between workers. Not more than `max_pending`
+    chunks are rendered at once, others wait. Not more than `max_requests`
+    requests are accepted at once: others get `503` before their body is
+    read, so a busy server does not fill its memory with waiting requests.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        workers: int,
+        max_pending: int,
+        max_requests: Optional[int] = None,
+    ):
+        self.executor = executor
+        self.workers = workers
+        self.pending = asyncio.Semaphore(max_pending)
+        self.max_requests = max_requests or max_pending * 4
+        self.requests = 0
+
+    async def _render_chunk(
+        self, items: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        async with self.pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, render_batch, items,
+            )
+
+    async def render(
+        self, items: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        if not items:
+            return []
+        size = -(-len(items) // self.workers)
+        chunks = await asyncio.gather(*(
+            self._render_chunk(items[i:i + size])
+            for i in range(0, len(items), size)
+        ))
+        return [result for chunk in chunks for result in chunk]
+
+    async def handle_render(self, request: web.Request) -> web.Response:
+        if self.requests >= self.max_requests:
+            return web.json_response(
+                {"error": "Server is busy"},
+                status=503,
+                headers={"Retry-After": str(RETRY_AFTER)},
+            )
+        self.requests += 1
+        try:
+            return await self._handle_render(request)
+        finally:
+            self.requests -= 1
+
+    async def _handle_render(self, request: web.Request) -> web.Response:
+        try:
+            data = await request.json()
+        except ValueError:
+            return _bad_request("Request is not a valid JSON")
+        batch = isinstance(data, list)
+        items = data if batch else [data]
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(
+                item.get("html"), str,
+            ):
+                return _bad_request(
+                    "Each item must be an object with `html` string",
+                )
+        results = await self.render(items)
+        if batch:
+            return web.json_response(results)
+        elif "error" in results[0]:
+            return web.json_response(results[0], status=422)
+        return web.json_response(results[0])
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/render", self.handle_render)
+        return app
+
+
+async def start_workers(executor: Executor, workers: int) -> None:
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(*(
+        loop.run_in_executor(executor, _ping) for _ in range(workers)
+    ))
+    logger.info("Started %s workers", len(set(pids)))
+
+
+async def start_server(
+    executor: Executor,
+    workers: int,
+    max_pending: int,
+    socket: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_requests: Optional[int] = None,
+) -> web.AppRunner:
+    await start_workers(executor, workers)
+    runner = web.AppRunner(
+        RenderServer(executor, workers, max_pending, max_requests).app(),
+        access_log=None,
+    )
+    await runner.setup()
+    if socket:
+        site = web.UnixSite(runner, socket)
+    else:
+        site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info("Listening on %s", site.name)
+    return runner
+
+
+async def serve(args: ServeArgs) -> None:
+    workers = args.workers or os.cpu_count() or 1
+    max_pending = args.max_pending or workers * 2
+    with ProcessPoolExecutor(
+        workers,
+        initializer=init_worker,
+        initargs=(args.cache, args.cache_size * 1024 * 1024),
+    ) as executor:
+        runner = await start_server(
+            executor=executor,
+            workers=workers,
+            max_pending=max_pending,
+            socket=args.socket,
+            host=args.host,
+            port=args.port,
+            max_requests=args.max_requests,
+        )
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
@@ -0,0 +1,16 @@
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+
+def create_bot(token: str, api_url: Optional[str] = None) -> Bot:
+    """
+    Create a bot using Bot API server at `api_url` if it is set.
+    """
+    if api_url:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(api_url))
+    else:
+        session = AiohttpSession()
+    return Bot(token=token, session=session)
@@ -1,11 +1,19 @@
 __all__ = [
     "Canvas",
+    "EmojiMatcher",
     "MessageEntity",
+    "Program",
+    "RecordingState",
     "State",
     "TextMode",
     "int_to_number",
+    "list_marker",
+    "merge_entities",
 ]
 
 from .canvas import Canvas, TextMode
-from .numbers import int_to_number
+from .emoji import EmojiMatcher
+from .merge import merge_entities
+from .numbers import int_to_number, list_marker
+from .program import Program, RecordingState
 from .state import MessageEntity, State
@@ -1,5 +1,8 @@
 import re
 from enum import Enum, auto
+from typing import List, Optional
+
+from sulguk.limits import LimitExceededError
 
 
 class State(Enum):
@@ -34,23 +37,38 @@ def fix_text_pre(text: str, trim_start: bool) -> str:
 
 
 class Canvas:
-    def __init__(self):
-        self.text = ""
+    def __init__(self, max_size: Optional[int] = None):
+        # text is collected in chunks to avoid copying it on each addition
+        self._chunks: List[str] = []
         self.size = 0
         self.indent = 0
         self.state = State.START
         self.text_mode = TextMode.NORMAL
         self.text_transformation = None
+        self.max_size = max_size
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
 
     def _trim_last_space(self):
         if not self.state == State.SPACE:
             return
-        self.text = self.text[:-1]
+        last = self._chunks.pop()[:-1]
+        if last:
+            self._chunks.append(last)
         self.size -= 1
 
     def _add_text_raw(self, text: str):
-        self.text += text
-        self.size += len(text.encode("utf-16-le")) // 2
+        self._chunks.append(text)
+        if text.isascii():
+            self.size += len(text)
+        else:
+            self.size += len(text.encode("utf-16-le")) // 2
+        if self.max_size is not None and self.size > self.max_size:
+            raise LimitExceededError("max_length", self.max_size)
 
     def _add_indent(self):
         if self.state not in (State.START, State.NEW_LINE, State.EMPTY_LINE):
@@ -60,7 +78,7 @@ class Canvas:
         self._add_text_raw("\xa0" * self.indent)
 
     def add_space(self):
-        if not self.text:
+        if not self._chunks:
             return
         if self.state != State.IN_TEXT:
             return
@@ -0,0 +1,121 @@
+import re
+from collections import deque
+from typing import Dict, List, Mapping, Tuple
+
+# start, end and custom emoji id
+EmojiMatch = Tuple[int, int, str]
+
+
+class EmojiMatcher:
+    """
+    Finder of emoji and shortcodes to be replaced with custom emoji.
+
+    Patterns are compiled into Aho-Corasick automaton, so the text is
+    scanned once regardless of the number of patterns. Matches do not
+    overlap: the leftmost one is taken, and the longest of those starting
+    at the same position (e.g. emoji with a skin tone modifier rather than
+    without it).
+    """
+
+    def __init__(self, custom_emoji: Mapping[str, str]):
+        # state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth = [0]
+        self._ids = [""]
+        for pattern, emoji_id in custom_emoji.items():
+            if not pattern:
+                raise ValueError("Empty string cannot be replaced with emoji")
+            self._add(pattern, emoji_id)
+        self._fail = [0] * len(self._goto)
+        # nearest state in failure chain which ends a pattern
+        self._output = [0] * len(self._goto)
+        self._build_links()
+        # text is skipped quickly until any pattern can start
+        first_chars = "".join(map(re.escape, sorted(self._goto[0])))
+        self._first = re.compile(f"[{first_chars}]" if first_chars else "(?!)")
+
+    def _add(self, pattern: str, emoji_id: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._depth.append(self._depth[state] + 1)
+                self._ids.append("")
+            state = next_state
+        self._ids[state] = emoji_id
+
+    def _build_links(self) -> None:
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                link = goto[link].get(char, 0)
+                fail[child] = link
+                output[child] = link if self._ids[link] else output[link]
+
+    def find(self, text: str) -> List[EmojiMatch]:
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        depth = self._depth
+        ids = self._ids
+
+        matches: List[EmojiMatch] = []
+        # longest match for each start which is not chosen or dropped yet
+        pending: Dict[int, Tuple[int, int]] = {}
+        matched_end = 0
+        state = 0
+        i = 0
+        size = len(text)
+        while i < size:
+            if not state:
+                found = self._first.search(text, i)
+                if found is None:
+                    break
+                i = found.start()
+            char = text[i]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            i += 1
+
+            match_state = state if ids[state] else output[state]
+            while match_state:
+                start = i - depth[match_state]
+                if start >= matched_end:
+                    # the same start found later means a longer match
+                    pending[start] = (i, match_state)
+                match_state = output[match_state]
+            # matches found later cannot start before the current state
+            window_start = i - depth[state]
+            while pending:
+                start = min(pending)
+                if start >= window_start:
+                    break
+                matched_end = self._take(pending, start, matches)
+
+        while pending:
+            self._take(pending, min(pending), matches)
+        return matches
+
+    def _take(
+        self,
+        pending: Dict[int, Tuple[int, int]],
+        start: int,
+        matches: List[EmojiMatch],
+    ) -> int:
+        end, state = pending.pop(start)
+        matches.append((start, end, self._ids[state]))
+        for other in [other for other in pending if other < end]:
+            del pending[other]
+        return end
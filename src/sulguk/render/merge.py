@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Tuple
+
+from sulguk.data import MessageEntity
+
+# Two adjacent entities of these types are visually the same as one
+# covering both ranges. Others (blockquotes, custom emoji) must stay split.
+JOINABLE_TYPES = frozenset((
+    "bold",
+    "italic",
+    "underline",
+    "strikethrough",
+    "spoiler",
+    "code",
+    "text_link",
+))
+
+
+def _attrs_key(entity: MessageEntity) -> Tuple[Any, ...]:
+    return tuple(sorted(
+        (key, repr(value))
+        for key, value in entity.items()
+        if key not in ("offset", "length")
+    ))
+
+
+def merge_entities(entities: List[MessageEntity]) -> List[MessageEntity]:
+    """
+    Merge same entities which are nested, overlapping or adjacent.
+
+    Entities are treated as same if they have the same type and attributes.
+    Result is sorted by offset, longer entities go first.
+    """
+    groups: Dict[Tuple[Any, ...], List[MessageEntity]] = {}
+    for entity in entities:
+        groups.setdefault(_attrs_key(entity), []).append(entity)
+
+    result = []
+    for group in groups.values():
+        group.sort(key=lambda e: e["offset"])
+        joinable = group[0]["type"] in JOINABLE_TYPES
+        current = MessageEntity(group[0])
+        end = current["offset"] + current["length"]
+        for entity in group[1:]:
+            offset = entity["offset"]
+            if offset < end or (joinable and offset == end):
+                end = max(end, offset + entity["length"])
+                continue
+            current["length"] = end - current["offset"]
+            result.append(current)
+            current = MessageEntity(entity)
+            end = offset + entity["length"]
+        current["length"] = end - current["offset"]
+        result.append(current)
+
+    result.sort(key=lambda e: (e["offset"], -e["length"]))
+    return result
@@ -1,53 +1,62 @@
-from string import ascii_uppercase
+from string import ascii_lowercase, ascii_uppercase
 
 from sulguk.data import NumberFormat
 
-roman = {
-    1000: "M",
-    900: "CM",
-    500: "D",
-    400: "CD",
-    100: "C",
-    90: "XC",
-    50: "L",
-    40: "XL",
-    10: "X",
-    9: "IX",
-    5: "V",
-    4: "IV",
-    1: "I",
-}
-
-
-def _roman_num(num):
-    for r in roman.keys():
-        x, y = divmod(num, r)
-        yield roman[r] * x
-        num -= r * x
-        if num <= 0:
-            break
+# roman digits for units, tens and hundreds
+ROMAN_UPPER = (
+    ("", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX"),
+    ("", "X", "XX", "XXX", "XL", "L", "LX", "LXX", "LXXX", "XC"),
+    ("", "C", "CC", "CCC", "CD", "D", "DC", "DCC", "DCCC", "CM"),
+)
+ROMAN_LOWER = tuple(
+    tuple(digit.lower() for digit in digits) for digits in ROMAN_UPPER
+)
+
+
+def _to_roman(value: int, digits, thousand: str) -> str:
+    if value <= 0:
+        return str(value)
+    thousands, value = divmod(value, 1000)
+    hundreds, value = divmod(value, 100)
+    tens, units = divmod(value, 10)
+    return "".join((
+        thousand * thousands,
+        digits[2][hundreds],
+        digits[1][tens],
+        digits[0][units],
+    ))
+
+
+def _to_letters(value: int, alphabet: str) -> str:
+    if value <= 0:
+        return str(value)
+    letters = []
+    while value > 0:
+        value, letter = divmod(value - 1, len(alphabet))
+        letters.append(alphabet[letter])
+    return "".join(reversed(letters))
 
 
 def to_roman(value: int) -> str:
-    return "".join(_roman_num(value))
+    return _to_roman(value, ROMAN_UPPER, "M")
 
 
 def to_letters(value: int) -> str:
-    result = ""
-    while value > 0:
-        value, y = divmod(value, len(ascii_uppercase))
-        result += ascii_uppercase[y - 1]
-    return result[::-1]
+    return _to_letters(value, ascii_uppercase)
 
 
 def int_to_number(value: int, format: NumberFormat) -> str:
     if format is NumberFormat.DECIMAL:
         return str(value)
     elif format is NumberFormat.LETTERS_UPPER:
-        return to_letters(value)
+        return _to_letters(value, ascii_uppercase)
     elif format is NumberFormat.LETTERS_LOWER:
-        return to_letters(value).lower()
+        return _to_letters(value, ascii_lowercase)
     elif format is NumberFormat.ROMAN_UPPER:
-        return to_roman(value)
+        return _to_roman(value, ROMAN_UPPER, "M")
     elif format is NumberFormat.ROMAN_LOWER:
-        return to_roman(value).lower()
+        return _to_roman(value, ROMAN_LOWER, "m")
+
+
+def list_marker(value: int, format: NumberFormat) -> str:
+    return int_to_number(value, format) + ". "
@@ -0,0 +1,167 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from sulguk.data import MessageEntity
+from .canvas import TextMode
+from .emoji import EmojiMatcher
+from .state import State
+
+TEXT_MODES = list(TextMode)
+
+
+# operations with their arguments
+OP_TEXT = 0  # string index
+OP_SPACE = 1
+OP_NEW_LINE_SOFT = 2
+OP_NEW_LINE = 3
+OP_EMPTY_LINE = 4
+OP_INDENT = 5  # indent
+OP_TEXT_MODE = 6  # index in TEXT_MODES
+OP_MARK = 7  # remember current size
+OP_ENTITY = 8  # template index, start mark, end mark
+
+
+@dataclass
+class Program:
+    """
+    Flat representation of rendering process.
+
+    Contains calls to the canvas with their arguments and entities to be
+    created. It is compact, can be pickled and rendered again without
+    building the entity tree.
+    """
+    code: array = field(default_factory=lambda: array("I"))
+    strings: List[str] = field(default_factory=list)
+    templates: List[MessageEntity] = field(default_factory=list)
+
+    def render(self, state: State) -> None:
+        canvas = state.canvas
+        code = self.code
+        strings = self.strings
+        templates = self.templates
+        marks = []
+        size = len(code)
+        i = 0
+        while i < size:
+            op = code[i]
+            if op == OP_TEXT:
+                canvas.add_text(strings[code[i + 1]])
+                i += 2
+            elif op == OP_MARK:
+                marks.append(canvas.size)
+                i += 1
+            elif op == OP_ENTITY:
+                entity = templates[code[i + 1]].copy()
+                offset = marks[code[i + 2]]
+                entity["offset"] = offset
+                entity["length"] = marks[code[i + 3]] - offset
+                state.add_entity(entity)
+                i += 4
+            elif op == OP_NEW_LINE_SOFT:
+                canvas.add_new_line_soft()
+                i += 1
+            elif op == OP_INDENT:
+                canvas.indent = code[i + 1]
+                i += 2
+            elif op == OP_EMPTY_LINE:
+                canvas.add_empty_line()
+                i += 1
+            elif op == OP_NEW_LINE:
+                canvas.add_new_line()
+                i += 1
+            elif op == OP_SPACE:
+                canvas.add_space()
+                i += 1
+            elif op == OP_TEXT_MODE:
+                canvas.text_mode = TEXT_MODES[code[i + 1]]
+                i += 2
+            else:
+                raise ValueError(f"Unknown operation {op}")
+
+
+class RecordingCanvas:
+    """
+    Canvas which records calls into a program instead of rendering text.
+
+    Reading `size` returns an id of a mark, so offsets and lengths of
+    entities created during recording refer to marks, not to text.
+    """
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.text_transformation: Optional[Callable[[str], str]] = None
+        self._indent = 0
+        self._text_mode = TextMode.NORMAL
+        self._marks = 0
+        self._strings: Dict[str, int] = {}
+
+    def _add_string(self, text: str) -> int:
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self.program.strings)
+            self.program.strings.append(text)
+        return index
+
+    @property
+    def size(self) -> int:
+        self.program.code.append(OP_MARK)
+        self._marks += 1
+        return self._marks - 1
+
+    @property
+    def indent(self) -> int:
+        return self._indent
+
+    @indent.setter
+    def indent(self, value: int) -> None:
+        self._indent = value
+        self.program.code.extend((OP_INDENT, value))
+
+    @property
+    def text_mode(self) -> TextMode:
+        return self._text_mode
+
+    @text_mode.setter
+    def text_mode(self, value: TextMode) -> None:
+        self._text_mode = value
+        self.program.code.extend((OP_TEXT_MODE, TEXT_MODES.index(value)))
+
+    def add_space(self):
+        self.program.code.append(OP_SPACE)
+
+    def add_new_line_soft(self):
+        self.program.code.append(OP_NEW_LINE_SOFT)
+
+    def add_new_line(self):
+        self.program.code.append(OP_NEW_LINE)
+
+    def add_empty_line(self):
+        self.program.code.append(OP_EMPTY_LINE)
+
+    def add_text(self, text):
+        if self.text_transformation:
+            text = self.text_transformation(text)
+        self.program.code.extend((OP_TEXT, self._add_string(text)))
+
+
+class RecordingState(State):
+    def __init__(self, custom_emoji: Optional[EmojiMatcher] = None):
+        self.program = Program()
+        super().__init__(
+            canvas=RecordingCanvas(self.program), custom_emoji=custom_emoji,
+        )
+        self._templates: Dict[str, int] = {}
+
+    def add_entity(self, entity: MessageEntity) -> None:
+        start = entity["offset"]
+        end = start + entity["length"]
+        key = repr([
+            item for item in entity.items()
+            if item[0] not in ("offset", "length")
+        ])
+        index = self._templates.get(key)
+        if index is None:
+            index = self._templates[key] = len(self.program.templates)
+            self.program.templates.append(entity)
+        self.program.code.extend((OP_ENTITY, index, start, end))
@@ -1,11 +1,24 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 from sulguk.data import MessageEntity
+from sulguk.limits import LimitExceededError
 from .canvas import Canvas
+from .emoji import EmojiMatcher
 
 
 @dataclass
 class State:
     canvas: Canvas = field(default_factory=Canvas)
     entities: List[MessageEntity] = field(default_factory=list)
+    max_entities: Optional[int] = None
+    # replaces matched text with custom emoji, unless inside code
+    custom_emoji: Optional[EmojiMatcher] = None
+
+    def add_entity(self, entity: MessageEntity) -> None:
+        if (
+            self.max_entities is not None
+            and len(self.entities) >= self.max_entities
+        ):
+            raise LimitExceededError("max_entities", self.max_entities)
+        self.entities.append(entity)
@@ -0,0 +1,18 @@
+import json
+
+from .wrapper import RenderResult
+
+
+def encode_result(result: RenderResult) -> bytes:
+    """
+    Compact JSON of rendering result, as stored by catalogs and caches.
+    """
+    return json.dumps(
+        {"text": result.text, "entities": result.entities},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def decode_result(data: bytes) -> RenderResult:
+    return RenderResult(**json.loads(data))
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from .serialization import decode_result, encode_result
+from .source import HtmlSource, is_blank
+from .wrapper import Renderer, RenderResult
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = 64 * 1024 * 1024
+# access time is updated not more often, so hits are mostly read-only
+TOUCH_INTERVAL = 60
+# part of `max_bytes` left after eviction, so it is not run on each write
+EVICT_TO = 0.9
+EVICT_BATCH = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES ('size', 0);
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+    UPDATE stats SET value = value + length(NEW.value) WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+    UPDATE stats SET value = value - length(OLD.value) WHERE name = 'size';
+END;
+"""
+
+
+class SharedRenderCache:
+    """
+    Rendering results stored in a sqlite file shared by processes.
+
+    Results are addressed by a hash of HTML and renderer settings (see
+    `Renderer.fingerprint`), so renderers with the same settings in all
+    processes of the host share them. When results take more than
+    `max_bytes`, the least recently used ones are removed. Cache is best
+    effort: if the database is locked for more than `timeout` seconds or
+    broken, it is skipped.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = MAX_BYTES,
+        timeout: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        # connections cannot be shared between threads and forked processes
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: Optional[Tuple[int, sqlite3.Connection]]
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and conn[0] == os.getpid():
+            return conn[1]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.executescript(SCHEMA)
+        self._local.conn = (os.getpid(), connection)
+        return connection
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and conn[0] == os.getpid():
+            conn[1].close()
+        self._local.conn = None
+
+    def render(
+        self, renderer: Renderer, raw_html: Optional[HtmlSource],
+    ) -> RenderResult:
+        """
+        Get result of `renderer.render` from cache or render and store it.
+        """
+        fingerprint = renderer.fingerprint
+        if fingerprint is None:
+            raise ValueError(
+                "Renderer with custom tags, custom emoji or url_rewriter "
+                "cannot use shared cache",
+            )
+        if is_blank(raw_html):
+            return renderer.render(raw_html)
+        key = self.key(raw_html, fingerprint)
+        result = self.get(key)
+        if result is None:
+            result = renderer.render(raw_html)
+            self.set(key, result)
+        return result
+
+    def key(self, raw_html: HtmlSource, fingerprint: bytes) -> bytes:
+        digest = hashlib.blake2b(fingerprint, digest_size=16)
+        if isinstance(raw_html, str):
+            digest.update(b"s")  # the same text as str and bytes differs
+            digest.update(raw_html.encode("utf-8", "surrogatepass"))
+        else:
+            digest.update(b"b")
+            digest.update(raw_html)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[RenderResult]:
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, accessed FROM results WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, accessed = row
+            now = time.time()
+            if now - accessed > TOUCH_INTERVAL:
+                with conn:
+                    conn.execute(
+                        "UPDATE results SET accessed = ? WHERE key = ?",
+                        (now, key),
+                    )
+        except sqlite3.Error as e:
+            logger.warning("Shared render cache is not available: %s", e)
+            return None
+        return decode_result(value)
+
+    def set(self, key: bytes, result: RenderResult) -> None:
+        value = encode_result(result)
+        try:
+            conn = self._connect()
+            with conn:
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO results VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                ).rowcount
+                if inserted and self.size(conn) > self.max_bytes:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning("Shared render cache is not available: %s", e)
+
+    def size(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Total size of stored results in bytes.
+        """
+        conn = conn or self._connect()
+        return conn.execute(
+            "SELECT value FROM stats WHERE name = 'size'",
+        ).fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        target = self.max_bytes * EVICT_TO
+        while self.size(conn) > target:
+            conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed LIMIT ?)",
+                (EVICT_BATCH,),
+            )
@@ -0,0 +1,50 @@
+from typing import Optional, Union
+
+# `mmap.mmap` and other objects supporting buffer protocol are accepted too
+HtmlSource = Union[str, bytes, bytearray, memoryview]
+
+
+class BufferReader:
+    """
+    File-like reader of a bytes-like object.
+
+    html5lib detects encoding of a file and decodes it by small chunks, so
+    the whole document is never copied neither into `bytes` nor into `str`.
+    Call `close` to release the buffer, e.g. before closing `mmap`.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = len(self._view)
+        if size is not None and size >= 0:
+            end = min(self._pos + size, end)
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += len(self._view)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+
+
+def is_blank(raw_html: Optional[HtmlSource]) -> bool:
+    if raw_html is None:
+        return True
+    if isinstance(raw_html, str):
+        return raw_html.strip() == ""
+    # whitespace in bytes is left for the parser, not to copy the buffer
+    with memoryview(raw_html) as view:
+        return view.nbytes == 0
@@ -0,0 +1,225 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from html5lib import HTMLParser, getTreeBuilder
+from html5lib.constants import E, tokenTypes
+
+from .limits import LimitExceededError, Limits, check_input_size
+from .mapper import Mapper
+from .parsing import HTMLTokenizer
+from .render.canvas import fix_text_normal
+from .source import BufferReader, HtmlSource, is_blank
+
+START_TAG = tokenTypes["StartTag"]
+END_TAG = tokenTypes["EndTag"]
+CHARACTERS = tokenTypes["Characters"]
+SPACE_CHARACTERS = tokenTypes["SpaceCharacters"]
+
+# tags which contents is not rendered
+HIDDEN_TAGS = {"head", "script", "style", "template", "title"}
+# tags which contents is not markup, like html5lib parser switches them
+RCDATA_TAGS = {"title", "textarea"}
+RAWTEXT_TAGS = {"style", "xmp", "iframe", "noembed", "noframes"}
+# tags renamed by html5lib tree builder
+TAG_ALIASES = {"image": "img"}
+# tags dropped by html5lib tree builder outside of tables (and `frameset`
+# after any content), so they are reported only if they are in the tree
+MISPLACED_TAGS = {
+    "caption", "col", "colgroup", "frame", "frameset", "tbody", "td",
+    "tfoot", "th", "thead", "tr",
+}
+
+
+@dataclass
+class ValidationProblem:
+    kind: str  # unsupported_tag, invalid_attribute, parse_error or a limit
+    message: str
+    # position in the source starting from 1, if the problem has one:
+    # start of a tag or where html5lib found a parse error
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+
+def _open(raw_html: HtmlSource) -> Tuple[Any, Dict[str, Any]]:
+    if isinstance(raw_html, str):
+        return raw_html, {}
+    reader = BufferReader(raw_html)
+    return reader, {"default_encoding": "utf-8", "useChardet": False}
+
+
+def _parse(raw_html: HtmlSource) -> Tuple[Any, List[ValidationProblem]]:
+    parser = HTMLParser(
+        getTreeBuilder("etree"), namespaceHTMLElements=False,
+    )
+    stream, kwargs = _open(raw_html)
+    try:
+        tree = parser.parse(stream, **kwargs)
+    finally:
+        if stream is not raw_html:
+            stream.close()
+    errors = [
+        ValidationProblem(
+            kind="parse_error",
+            message=E.get(code, code) % datavars,
+            line=line,
+            column=column + 1,
+        )
+        for (line, column), code, datavars in parser.errors
+    ]
+    return tree, errors
+
+
+class _Tokens:
+    """
+    Tokens of a document with positions where they start.
+    """
+
+    def __init__(self, raw_html: HtmlSource):
+        self._stream, kwargs = _open(raw_html)
+        self._raw_html = raw_html
+        self.tokenizer = HTMLTokenizer(self._stream, **kwargs)
+        self._start = ("", 0, 0, 0)
+
+    def __iter__(self) -> Iterator[dict]:
+        tokenizer = self.tokenizer
+        tokens = iter(tokenizer)
+        try:
+            while True:
+                # tokens are emitted in batches, the first one is started
+                # where the previous batch was finished
+                if not getattr(tokenizer, "tokenQueue", None):
+                    stream = tokenizer.stream
+                    self._start = (
+                        stream.chunk,
+                        stream.chunkOffset,
+                        stream.prevNumLines,
+                        stream.prevNumCols,
+                    )
+                try:
+                    token = next(tokens)
+                except StopIteration:
+                    return
+                yield token
+        finally:
+            if self._stream is not self._raw_html:
+                self._stream.close()
+
+    def problem(self, kind: str, message: str) -> ValidationProblem:
+        """
+        Create a problem at the start of the current token.
+        """
+        # the same as `stream.position()`, which is too slow to be called
+        # for each token, as it counts lines from the start of the chunk
+        chunk, offset, lines, columns = self._start
+        last_line_end = chunk.rfind("\n", 0, offset)
+        if last_line_end == -1:
+            column = columns + offset
+        else:
+            column = offset - last_line_end - 1
+        return ValidationProblem(
+            kind=kind,
+            message=message,
+            line=lines + chunk.count("\n", 0, offset) + 1,
+            column=column + 1,
+        )
+
+    def switch_content(self, tag: str) -> None:
+        tokenizer = self.tokenizer
+        if tag in RCDATA_TAGS:
+            tokenizer.state = tokenizer.rcdataState
+        elif tag in RAWTEXT_TAGS:
+            tokenizer.state = tokenizer.rawtextState
+        elif tag == "script":
+            tokenizer.state = tokenizer.scriptDataState
+        elif tag == "plaintext":
+            tokenizer.state = tokenizer.plaintextState
+
+
+def validate(
+    raw_html: Optional[HtmlSource],
+    mapper: Mapper,
+    strict: bool,
+    limits: Limits,
+) -> List[ValidationProblem]:
+    """
+    Find problems which make rendering fail or exceed the limits.
+
+    The document is only tokenized: the tree is not built and nothing is
+    rendered. Length of the text is estimated without list numbers and
+    line breaks, number of entities - without custom emoji and entities
+    of custom tags. In strict mode the document is also parsed to find
+    errors of tree construction (like misnested tags). It is parsed as well
+    if it has table parts or frames, which are dropped outside of tables.
+    """
+    if is_blank(raw_html):
+        return []
+    try:
+        check_input_size(raw_html, limits)
+    except LimitExceededError as e:
+        return [ValidationProblem(kind=e.limit, message=str(e))]
+
+    problems: List[ValidationProblem] = []
+    misplaced: List[Tuple[str, ValidationProblem]] = []
+    tokens = _Tokens(raw_html)
+    hidden = 0
+    length = 0
+    entities = 0
+    trim_start = True
+    for token in tokens:
+        type_ = token["type"]
+        if type_ == START_TAG:
+            tag = TAG_ALIASES.get(token["name"], token["name"])
+            tokens.switch_content(tag)
+            if not mapper.is_supported(tag):
+                message = f"Unsupported tag: {tag}"
+                problem = tokens.problem("unsupported_tag", message)
+                if tag in MISPLACED_TAGS:
+                    misplaced.append((tag, problem))
+                else:
+                    problems.append(problem)
+                continue
+            if tag in HIDDEN_TAGS and not token["selfClosing"]:
+                hidden += 1
+            attrs = list(token["data"].items())
+            for message in mapper.check_attrs(tag, attrs):
+                problems.append(tokens.problem("invalid_attribute", message))
+            if not hidden:
+                entities += mapper.count_entities(tag, attrs)
+        elif type_ == END_TAG:
+            if token["name"] in HIDDEN_TAGS and hidden:
+                hidden -= 1
+        elif type_ in (CHARACTERS, SPACE_CHARACTERS):
+            if hidden:
+                continue
+            text = fix_text_normal(token["data"], trim_start)
+            if text:
+                trim_start = text.endswith(" ")
+                length += len(text.encode("utf-16-le")) // 2
+
+    if strict or misplaced:
+        tree, errors = _parse(raw_html)
+        if misplaced:
+            kept = {elem.tag for elem in tree.iter()}
+            problems.extend(
+                problem for tag, problem in misplaced if tag in kept
+            )
+        if strict:
+            problems.extend(errors)
+        problems.sort(key=lambda problem: (problem.line, problem.column))
+    if limits.max_length is not None and length > limits.max_length:
+        problems.append(ValidationProblem(
+            kind="max_length",
+            message=(
+                f"Text is about {length} characters long, "
+                f"more than {limits.max_length}"
+            ),
+        ))
+    if limits.max_entities is not None and entities > limits.max_entities:
+        problems.append(ValidationProblem(
+            kind="max_entities",
+            message=(
+                f"Text has about {entities} entities, "
+                f"more than {limits.max_entities}"
+            ),
+        ))
+    return problems
@@ -0,0 +1,14 @@
+from functools import lru_cache
+from importlib import metadata
+
+# version of rendering results, increased when the same input is rendered
+# differently, so caches of a development checkout are not reused
+RENDER_VERSION = 1
+
+
+@lru_cache(maxsize=1)
+def sulguk_version() -> str:
+    try:
+        return metadata.version("sulguk")
+    except metadata.PackageNotFoundError:
+        return "unknown"
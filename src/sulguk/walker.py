@@ -1,38 +1,243 @@
-from typing import Any
+from typing import Any, Generator, Iterable, Iterator, List, Union
 
 from lxml.etree import Element, ElementTree
 
-from .entities import Entity, Group, Text
+from .entities import Entity, Group, ListGroup, Pre, Text
+from .limits import NO_LIMITS, LimitExceededError, Limits
 from .mapper import Attrs, Mapper
 
+Fragment = Iterable[Union[str, Element]]
+
 
 class Walker:
-    def __init__(self, base_url: str | None = None):
-        self.mapper = Mapper(base_url)
+    def __init__(
+        self,
+        base_url: str | None = None,
+        consume: bool = False,
+        mapper: Mapper | None = None,
+        limits: Limits = NO_LIMITS,
+    ):
+        if mapper is None:
+            mapper = Mapper(base_url)
+        self.mapper = mapper
+        # release source nodes as soon as they are converted,
+        # so the document is not kept in memory twice
+        self.consume = consume
+        self.limits = limits
+        self.elements = 0
 
     def walk(self, tree: ElementTree) -> Group:
-        root = tree.getroot()
+        return self.walk_element(tree.getroot())
+
+    def walk_element(self, elem: Element) -> Group:
+        entity_root = Group()
+        self._visit_element(elem, entity_root, 1)
+        return entity_root
+
+    def iter_walk_element(
+        self, elem: Element,
+    ) -> Generator[None, None, Group]:
+        """
+        The same as `walk_element`, but yields after each converted element.
+        """
+        entity_root = Group()
+        entity = yield from self._iter_convert(elem, 1)
+        if entity is not None:
+            entity_root.add(entity)
+        return entity_root
+
+    def walk_children(self, elem: Element, depth: int = 0) -> Group:
+        entity_root = Group()
+        self._add_children(elem, entity_root, depth)
+        return entity_root
+
+    def walk_fragment(self, fragment: Fragment) -> Group:
         entity_root = Group()
-        self._visit_element(root, entity_root)
+        for item in fragment:
+            if isinstance(item, str):
+                entity_root.add(Text(text=item))
+            elif isinstance(item.tag, str):
+                self._visit_element(item, entity_root, 1)
+                if item.tail:
+                    entity_root.add(Text(text=item.tail))
         return entity_root
 
-    def _visit_element(self, elem: Element, parent_entity: Entity) -> None:
+    def _visit_element(
+        self, elem: Element, parent_entity: Entity, depth: int,
+    ) -> None:
+        entity = self._convert(elem, depth)
+        if entity is not None:
+            parent_entity.add(entity)
+
+    def _check_limits(self, depth: int) -> None:
+        self.elements += 1
+        max_elements = self.limits.max_elements
+        if max_elements is not None and self.elements > max_elements:
+            raise LimitExceededError("max_elements", max_elements)
+        max_depth = self.limits.max_depth
+        if max_depth is not None and depth > max_depth:
+            raise LimitExceededError("max_depth", max_depth)
+
+    def _convert(self, elem: Element, depth: int) -> Entity | None:
+        self._check_limits(depth)
         attrs = _attrs_to_list(elem.attrib)
         inner, entity = self.mapper.match(str(elem.tag), attrs)
 
         if entity is None:
-            return
+            return None
 
-        parent_entity.add(entity)
+        target = inner if inner is not None else entity
+        self._add_children(elem, target, depth)
+        return entity
+
+    def _iter_convert(
+        self, elem: Element, depth: int,
+    ) -> Generator[None, None, Entity | None]:
+        # the same as `_convert` with `_add_children`, but yields after
+        # each converted element
+        self._check_limits(depth)
+        attrs = _attrs_to_list(elem.attrib)
+        inner, entity = self.mapper.match(str(elem.tag), attrs)
+
+        if entity is None:
+            return None
 
         target = inner if inner is not None else entity
         if elem.text:
             target.add(Text(text=elem.text))
 
-        for child in elem.iterchildren(tag=Element):
-            self._visit_element(child, target)
+        children = list(elem)
+        if self.consume:
+            elem.clear()
+        for child in children:
+            if not isinstance(child.tag, str):
+                continue
+            tail = child.tail
+            child_entity = yield from self._iter_convert(child, depth + 1)
+            if child_entity is not None:
+                target.add(child_entity)
+            if tail:
+                target.add(Text(text=tail))
+        yield
+        return entity
+
+    def _add_children(
+        self, elem: Element, target: Entity, depth: int,
+    ) -> None:
+        if elem.text:
+            target.add(Text(text=elem.text))
+
+        children = list(elem)
+        if self.consume:
+            elem.clear()
+        for child in children:
+            # comments and processing instructions, both in lxml and etree
+            if not isinstance(child.tag, str):
+                continue
+            tail = child.tail
+            self._visit_element(child, target, depth + 1)
+            if tail:
+                target.add(Text(text=tail))
+
+
+class FusedWalker(Walker):
+    """
+    Walker which converts children of an element only when they are rendered.
+
+    The entity tree is never built as a whole: each element is converted
+    right before rendering and dropped after it. Entities which need to see
+    all their children before rendering them (`Pre` detecting language
+    of nested code, reversed `ListGroup` without start counting items)
+    get them converted in advance. Children of other entities are converted
+    while iterated; if an entity takes their length, indexes or adds to
+    them, they are all converted and kept like in a regular tree.
+    Descendants of entities which are not groups (like `Progress`) may be
+    never rendered, so they are converted in advance as well, to fail on
+    unsupported tags like a regular walker.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # depth of entities which descendants are converted in advance
+        self._eager = 0
+
+    def _add_children(
+        self, elem: Element, target: Entity, depth: int,
+    ) -> None:
+        if not elem.text and not len(elem):
+            return
+        if not isinstance(target, (Group, ListGroup)):
+            self._eager += 1
+            try:
+                super()._add_children(elem, target, depth)
+            finally:
+                self._eager -= 1
+            return
+        if self._eager or _needs_children(target):
+            super()._add_children(elem, target, depth)
+            return
+        target.entities = _LazyChildren(
+            self, elem, target.entities, depth + 1,
+        )
+
+
+class _LazyChildren:
+    """
+    Children of an element converted while iterated.
+    """
+
+    def __init__(
+        self,
+        walker: Walker,
+        elem: Element,
+        initial: List[Entity],
+        depth: int,
+    ):
+        self.walker = walker
+        self.elem = elem
+        self.initial = initial
+        self.depth = depth
+        self._items: List[Entity] | None = None
+
+    def _materialize(self) -> List[Entity]:
+        if self._items is None:
+            self._items = list(self._convert())
+        return self._items
+
+    def __iter__(self) -> Iterator[Entity]:
+        if self._items is not None:
+            return iter(self._items)
+        return self._convert()
+
+    def __len__(self) -> int:
+        return len(self._materialize())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._materialize()[index]
+
+    def append(self, entity: Entity) -> None:
+        self._materialize().append(entity)
+
+    def _convert(self) -> Iterator[Entity]:
+        yield from self.initial
+        if self.elem.text:
+            yield Text(text=self.elem.text)
+        for child in self.elem:
+            if not isinstance(child.tag, str):
+                continue
+            entity = self.walker._convert(child, self.depth)
+            if entity is not None:
+                yield entity
             if child.tail:
-                target.add(Text(text=child.tail))
+                yield Text(text=child.tail)
+
+
+def _needs_children(entity: Entity) -> bool:
+    if isinstance(entity, Pre):
+        return not entity.language
+    if isinstance(entity, ListGroup):
+        return entity.reversed and entity.start is None
+    return False
 
 
 def _attrs_to_list(attrib: Any) -> Attrs:
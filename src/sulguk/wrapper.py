@@ -1,11 +1,54 @@
-from dataclasses import dataclass
-from typing import List, Optional
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from html5lib import HTMLParser, getTreeBuilder
 
+from .capture import RenderCapture, SlowRenderCapture
 from .data import MessageEntity
-from .render.state import State
-from .walker import Walker
+from .entities import Group, Text
+from .incremental import Chunk, ChunkKey, FragmentParser, render_chunks
+from .limits import (
+    MESSAGE_LIMITS,
+    NO_LIMITS,
+    Limits,
+    check_input_size,
+    check_output,
+)
+from .mapper import Mapper, TagFactory, UrlRewriter
+from .parsing import iter_parse, release_parser
+from .render import (
+    Canvas,
+    EmojiMatcher,
+    Program,
+    RecordingState,
+    State,
+    merge_entities,
+)
+from .source import BufferReader, HtmlSource, is_blank
+from .validation import ValidationProblem, validate
+from .version import RENDER_VERSION, sulguk_version
+from .walker import FusedWalker, Walker
+
+# how long `render_async` can block the event loop between switches
+SLICE_TIME = 0.005
+
+
+ParserT = TypeVar("ParserT", bound=HTMLParser)
+ResultT = TypeVar("ResultT")
 
 
 @dataclass
@@ -14,21 +57,498 @@ class RenderResult:
     entities: List[MessageEntity]
 
 
+@dataclass
+class IncrementalResult(RenderResult):
+    """
+    Result of rendering which can be used to render an edited document.
+    """
+    chunks: Dict[ChunkKey, Chunk] = field(default_factory=dict, repr=False)
+
+
+class Renderer:
+    """
+    Converter of HTML with fixed settings.
+
+    Tag table is prepared once, so reuse it to render many messages.
+    Renderer has no mutable shared state: `render` and other methods are
+    safe to be called concurrently from different threads.
+
+    Pass `limits` to render untrusted HTML: `LimitExceededError` is raised
+    as soon as any of them is exceeded.
+
+    HTML can be passed as `bytes`, `memoryview` or `mmap`, then encoding is
+    detected from BOM or `<meta charset>` (UTF-8 by default) and the input
+    is decoded while parsing.
+
+    `custom_emoji` maps emoji or any other strings to ids of custom emoji
+    which replace them in text (except code).
+
+    `url_rewriter` is called with absolute URLs of links and images and
+    returns a new URL or `None` to drop the link. Results are cached, so it
+    must return the same value for the same URL.
+
+    With `capture` inputs which take too long to render are saved with
+    timings of each stage to be profiled later with `sulguk replay`.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        strict: bool = False,
+        merge: bool = False,
+        fused: bool = False,
+        tags: Optional[Mapping[str, TagFactory]] = None,
+        limits: Optional[Limits] = None,
+        custom_emoji: Optional[Mapping[str, str]] = None,
+        url_rewriter: Optional[UrlRewriter] = None,
+        capture: Optional[SlowRenderCapture] = None,
+    ):
+        self.base_url = base_url
+        self.strict = strict
+        self.merge = merge
+        self.fused = fused
+        self.limits = limits or NO_LIMITS
+        self.capture = capture
+        self._mapper = Mapper(base_url, tags=tags, url_rewriter=url_rewriter)
+        self._mapper.prepare()
+        self._custom_emoji = None
+        if custom_emoji:
+            self._custom_emoji = EmojiMatcher(custom_emoji)
+        self._comparable = not (tags or custom_emoji or url_rewriter)
+        # settings saved with captures
+        self._capture_settings: Dict[str, Any] = {
+            "limits": asdict(self.limits),
+            "custom_emoji": dict(custom_emoji) if custom_emoji else None,
+            "custom_tags": sorted(tags or ()),
+            "url_rewriter": url_rewriter is not None,
+        }
+        # html5lib parser keeps parsing state, so it is created per thread
+        # and released after each document
+        self._local = threading.local()
+
+    @property
+    def fingerprint(self) -> Optional[bytes]:
+        """
+        Settings which change results of rendering, with sulguk version and
+        `RENDER_VERSION`.
+
+        It is `None` if settings cannot be compared between processes:
+        custom tags, custom emoji or `url_rewriter` are set.
+        """
+        if not self._comparable:
+            return None
+        return repr((
+            RENDER_VERSION, sulguk_version(), self.base_url, self.strict,
+            self.merge, self.limits,
+        )).encode()
+
+    def _walker(self, consume: bool = True) -> Walker:
+        # walker counts elements, so a new one is needed for each document
+        return Walker(consume=consume, mapper=self._mapper, limits=self.limits)
+
+    def _document_walker(self) -> Walker:
+        if self.fused:
+            return FusedWalker(mapper=self._mapper, limits=self.limits)
+        return self._walker()
+
+    def _create_parser(self, parser_class: Type[ParserT]) -> ParserT:
+        return parser_class(
+            getTreeBuilder("etree"),
+            strict=self.strict,
+            namespaceHTMLElements=False,
+        )
+
+    def _parser(self) -> HTMLParser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = self._create_parser(HTMLParser)
+        return parser
+
+    def _fragment_parser(self) -> FragmentParser:
+        parser = getattr(self._local, "fragment_parser", None)
+        if parser is None:
+            parser = self._local.fragment_parser = self._create_parser(
+                FragmentParser,
+            )
+        return parser
+
+    def _parse(self, raw_html: HtmlSource) -> Any:
+        check_input_size(raw_html, self.limits)
+        parser = self._parser()
+        reader = None
+        try:
+            if isinstance(raw_html, str):
+                return parser.parse(raw_html)
+            reader = BufferReader(raw_html)
+            return parser.parse(
+                reader, default_encoding="utf-8", useChardet=False,
+            )
+        finally:
+            release_parser(parser)
+            if reader is not None:
+                reader.close()
+
+    def _chunk_walker(self) -> Callable[[Any, bool], Group]:
+        # the same walker for all chunks to count elements of the document
+        walker = self._walker()
+
+        def walk(tree: Any, document: bool) -> Group:
+            if document:
+                return walker.walk_element(tree)
+            return walker.walk_children(tree, depth=2)
+
+        return walk
+
+    def _state(self) -> State:
+        return State(
+            canvas=Canvas(max_size=self.limits.max_length),
+            max_entities=self.limits.max_entities,
+            custom_emoji=self._custom_emoji,
+        )
+
+    def _render(self, root: Union[Group, Program, Text]) -> RenderResult:
+        state = self._state()
+        root.render(state)
+        entities = state.entities
+        if self.merge:
+            entities = merge_entities(entities)
+        return RenderResult(text=state.canvas.text, entities=entities)
+
+    def _render_plain(self, raw_html: str) -> RenderResult:
+        check_input_size(raw_html, self.limits)
+        # the same as html5lib does with text without markup: whitespace
+        # before body is skipped and NUL characters are dropped
+        text = raw_html.lstrip(" \t\n\r\x0c").replace("\x00", "")
+        if self._custom_emoji is not None:
+            return self._render(Text(text=text))
+        canvas = Canvas(max_size=self.limits.max_length)
+        canvas.add_text(text)
+        return RenderResult(text=canvas.text, entities=[])
+
+    def render(self, raw_html: Optional[HtmlSource]) -> RenderResult:
+        if is_blank(raw_html):
+            return RenderResult(text="", entities=[])
+        plain = (
+            not self.strict
+            and isinstance(raw_html, str)
+            and "<" not in raw_html
+            and "&" not in raw_html
+        )
+        if self.capture is not None:
+            return self._render_captured(raw_html, plain)
+        if plain:
+            return self._render_plain(raw_html)
+        doc = self._parse(raw_html)
+        return self._render(self._document_walker().walk_element(doc))
+
+    def _render_captured(
+        self, raw_html: HtmlSource, plain: bool,
+    ) -> RenderResult:
+        timings: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        result = None
+        error = None
+        start = stage_start = time.perf_counter()
+        stage = "plain" if plain else "parse"
+        try:
+            if plain:
+                result = self._render_plain(raw_html)
+            else:
+                doc = self._parse(raw_html)
+                now = time.perf_counter()
+                timings[stage] = now - stage_start
+                stage, stage_start = "walk", now
+                walker = self._document_walker()
+                try:
+                    root = walker.walk_element(doc)
+                finally:
+                    counts["elements"] = walker.elements
+                now = time.perf_counter()
+                timings[stage] = now - stage_start
+                stage, stage_start = "render", now
+                result = self._render(root)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            timings[stage] = end - stage_start
+            # failed renders are captured too, they are worth replaying
+            if self.capture.should_capture(end - start):
+                self._save_capture(raw_html, result, timings, counts, error)
+        return result
+
+    def _save_capture(
+        self,
+        raw_html: HtmlSource,
+        result: Optional[RenderResult],
+        timings: Dict[str, float],
+        counts: Dict[str, int],
+        error: Optional[str] = None,
+    ) -> None:
+        if isinstance(raw_html, str):
+            counts["input_chars"] = len(raw_html)
+        else:
+            raw_html = bytes(raw_html)
+            counts["input_bytes"] = len(raw_html)
+        if result is not None:
+            counts["text_length"] = len(result.text)
+            counts["entities"] = len(result.entities)
+        self.capture.save(RenderCapture(
+            html=raw_html,
+            base_url=self.base_url,
+            strict=self.strict,
+            merge=self.merge,
+            fused=self.fused,
+            timings=timings,
+            counts=counts,
+            error=error,
+            **self._capture_settings,
+        ))
+
+    def render_incremental(
+        self,
+        raw_html: Optional[str],
+        previous: Optional[IncrementalResult] = None,
+    ) -> IncrementalResult:
+        """
+        Render a new version of a document rendered before.
+
+        Only top-level blocks which are changed since `previous` are parsed
+        and rendered again, the result is the same as of `render`.
+        Element count and depth limits are checked only for them.
+        """
+        if raw_html is None or raw_html.strip() == "":
+            return IncrementalResult(text="", entities=[])
+        check_input_size(raw_html, self.limits)
+        text, entities, size, chunks = render_chunks(
+            raw_html=raw_html,
+            cache=previous.chunks if previous else {},
+            parser=self._parser(),
+            fragment_parser=self._fragment_parser(),
+            walk=self._chunk_walker(),
+            split=not self.strict,
+            custom_emoji=self._custom_emoji,
+        )
+        check_output(size, len(entities), self.limits)
+        if self.merge:
+            entities = merge_entities(entities)
+        return IncrementalResult(text=text, entities=entities, chunks=chunks)
+
+    async def render_async(
+        self,
+        raw_html: Optional[str],
+        slice_time: float = SLICE_TIME,
+    ) -> RenderResult:
+        """
+        Render HTML without blocking the event loop for a long time.
+
+        Document is parsed, walked and rendered by small steps (a hundred of
+        tokens, an element or an entity), the control is passed to the event
+        loop each `slice_time` seconds. The result is the same as of
+        `render`.
+        """
+        if is_blank(raw_html):
+            return RenderResult(text="", entities=[])
+        if not self.strict and "<" not in raw_html and "&" not in raw_html:
+            if self.capture is not None:
+                return self._render_captured(raw_html, plain=True)
+            return self._render_plain(raw_html)
+
+        # time spent in each stage without waiting for other tasks
+        timings: Dict[str, float] = {}
+        counts: Dict[str, int] = {"slices": 1}
+        walker = self._walker()
+        result = None
+        error = None
+        stage = "parse"
+        slice_start = step_start = time.perf_counter()
+        try:
+            steps = self._iter_render(raw_html, walker)
+            while True:
+                try:
+                    next_stage = next(steps)
+                except StopIteration as e:
+                    result = e.value
+                    break
+                now = time.perf_counter()
+                timings[stage] = timings.get(stage, 0) + now - step_start
+                stage = next_stage
+                if now - slice_start >= slice_time:
+                    await asyncio.sleep(0)
+                    counts["slices"] += 1
+                    now = slice_start = time.perf_counter()
+                step_start = now
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            now = time.perf_counter()
+            timings[stage] = timings.get(stage, 0) + now - step_start
+            counts["elements"] = walker.elements
+            if self.capture is not None and self.capture.should_capture(
+                sum(timings.values()),
+            ):
+                self._save_capture(raw_html, result, timings, counts, error)
+        return result
+
+    def _iter_render(
+        self, raw_html: str, walker: Walker,
+    ) -> Generator[str, None, RenderResult]:
+        # yields name of the current stage after each step
+        check_input_size(raw_html, self.limits)
+        # the parser is busy between steps, so it cannot be shared
+        parser = self._create_parser(HTMLParser)
+        try:
+            doc = yield from _stage("parse", iter_parse(parser, raw_html))
+        finally:
+            release_parser(parser)
+        root = yield from _stage("walk", walker.iter_walk_element(doc))
+        state = self._state()
+        yield from _stage("render", root.iter_render(state))
+        entities = state.entities
+        if self.merge:
+            entities = merge_entities(entities)
+        return RenderResult(text=state.canvas.text, entities=entities)
+
+    def render_tree(self, tree: Any) -> RenderResult:
+        """
+        Render already parsed document without serializing it back to HTML.
+
+        Accepts `lxml` or `xml.etree` trees and elements as well as
+        fragments: sequences of elements and strings (like
+        `lxml.html.fragments_fromstring` returns). Tail of a single element
+        is ignored, while tails of elements in a fragment are rendered.
+        """
+        walker = self._walker(consume=False)
+        if hasattr(tree, "getroot"):
+            root = walker.walk(tree)
+        elif hasattr(tree, "tag"):
+            root = walker.walk_element(tree)
+        else:
+            root = walker.walk_fragment(tree)
+        return self._render(root)
+
+    def compile(self, raw_html: Optional[HtmlSource]) -> Program:
+        """
+        Convert HTML into a flat program which can be rendered many times.
+
+        Program is much smaller than the entity tree and can be pickled.
+        """
+        if is_blank(raw_html):
+            return Program()
+
+        doc = self._parse(raw_html)
+        root = self._walker().walk_element(doc)
+        state = RecordingState(custom_emoji=self._custom_emoji)
+        root.render(state)
+        return state.program
+
+    def render_program(self, program: Program) -> RenderResult:
+        return self._render(program)
+
+    def validate(
+        self, raw_html: Optional[HtmlSource],
+    ) -> List[ValidationProblem]:
+        """
+        Find all problems which make `render` fail, with their positions.
+
+        It is much cheaper than rendering: the document is only tokenized
+        (and parsed if it has table parts or frames). Unsupported tags,
+        attributes which cannot be converted (like `<ol type="x">`), too
+        long text and too many entities are reported.
+        """
+        return validate(raw_html, self._mapper, self.strict, self.limits)
+
+
+def _stage(
+    name: str, steps: Generator[Any, None, ResultT],
+) -> Generator[str, None, ResultT]:
+    # yields name of the stage instead of each step
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+        yield name
+
+
 def transform_html(
-    raw_html: Optional[str],
+    raw_html: Optional[HtmlSource],
     base_url: Optional[str] = None,
     strict: bool = False,
+    merge: bool = False,
+    fused: bool = False,
+    tags: Optional[Mapping[str, TagFactory]] = None,
+    limits: Optional[Limits] = None,
+    custom_emoji: Optional[Mapping[str, str]] = None,
+    url_rewriter: Optional[UrlRewriter] = None,
+    capture: Optional[SlowRenderCapture] = None,
 ) -> RenderResult:
-    if raw_html is None or raw_html.strip() == "":
-        return RenderResult(text="", entities=[])
+    renderer = Renderer(
+        base_url=base_url,
+        strict=strict,
+        merge=merge,
+        fused=fused,
+        tags=tags,
+        limits=limits,
+        custom_emoji=custom_emoji,
+        url_rewriter=url_rewriter,
+        capture=capture,
+    )
+    return renderer.render(raw_html)
+
 
-    parser = HTMLParser(
-        getTreeBuilder("lxml"),
+async def transform_html_async(
+    raw_html: Optional[str],
+    base_url: Optional[str] = None,
+    strict: bool = False,
+    merge: bool = False,
+    tags: Optional[Mapping[str, TagFactory]] = None,
+    limits: Optional[Limits] = None,
+    custom_emoji: Optional[Mapping[str, str]] = None,
+    url_rewriter: Optional[UrlRewriter] = None,
+    slice_time: float = SLICE_TIME,
+    capture: Optional[SlowRenderCapture] = None,
+) -> RenderResult:
+    renderer = Renderer(
+        base_url=base_url,
         strict=strict,
-        namespaceHTMLElements=False,
+        merge=merge,
+        tags=tags,
+        limits=limits,
+        custom_emoji=custom_emoji,
+        url_rewriter=url_rewriter,
+        capture=capture,
     )
-    doc = parser.parse(raw_html)
-    root = Walker(base_url).walk(doc)
-    state = State()
-    root.render(state)
-    return RenderResult(text=state.canvas.text, entities=state.entities)
+    return await renderer.render_async(raw_html, slice_time=slice_time)
+
+
+def transform_tree(
+    tree: Any,
+    base_url: Optional[str] = None,
+    merge: bool = False,
+) -> RenderResult:
+    return Renderer(base_url=base_url, merge=merge).render_tree(tree)
+
+
+def compile_html(
+    raw_html: Optional[HtmlSource],
+    base_url: Optional[str] = None,
+    strict: bool = False,
+) -> Program:
+    return Renderer(base_url=base_url, strict=strict).compile(raw_html)
+
+
+def render_program(program: Program, merge: bool = False) -> RenderResult:
+    return Renderer(merge=merge).render_program(program)
+
+
+def validate_html(
+    raw_html: Optional[HtmlSource],
+    strict: bool = False,
+    tags: Optional[Mapping[str, TagFactory]] = None,
+    limits: Limits = MESSAGE_LIMITS,
+) -> List[ValidationProblem]:
+    renderer = Renderer(strict=strict, tags=tags, limits=limits)
+    return renderer.validate(raw_html)
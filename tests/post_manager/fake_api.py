@@ -0,0 +1,358 @@
+"""
+In-process stand-in for telegram Bot API.
+
+Implements methods used by the post manager: getMe, getChat, sendMessage,
+editMessageText and getUpdates. Channels can have a discussion group:
+each post is forwarded there automatically and pinned, like telegram does.
+Latency and flood-wait errors are configurable, so the post manager can be
+tested and benchmarked without network (see `benchmarks/post_manager.py`):
+
+    api = FakeBotApi(latency=0.05)
+    channel = api.add_channel("channel")
+    runner, url = await start_fake_api(api)
+    bot = create_bot(FAKE_TOKEN, api_url=url)
+
+Clients which should survive flood waits add `RetryAfterMiddleware` to
+the bot session.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+FAKE_TOKEN = "42:FAKE-TOKEN"
+MAX_RETRIES = 3
+BOT_ID = 42
+ACCEPTED_GIFT_TYPES = (
+    "unlimited_gifts",
+    "limited_gifts",
+    "unique_gifts",
+    "premium_subscription",
+    "gifts_from_channels",
+)
+
+
+class ApiError(Exception):
+    def __init__(
+        self,
+        description: str,
+        code: int = 400,
+        parameters: Optional[dict] = None,
+    ):
+        super().__init__(description)
+        self.description = description
+        self.code = code
+        self.parameters = parameters
+
+
+@dataclass
+class FakeChat:
+    id: int
+    type: str
+    title: str
+    username: Optional[str] = None
+    linked_chat_id: Optional[int] = None
+    messages: Dict[int, dict] = field(default_factory=dict)
+    pinned_message: Optional[dict] = None
+    message_ids: Any = field(default_factory=lambda: itertools.count(1))
+
+    def short_info(self) -> dict:
+        info = {"id": self.id, "type": self.type, "title": self.title}
+        if self.username:
+            info["username"] = self.username
+        return info
+
+    def full_info(self) -> dict:
+        info = self.short_info()
+        info.update(
+            accent_color_id=0,
+            max_reaction_count=11,
+            accepted_gift_types=dict.fromkeys(ACCEPTED_GIFT_TYPES, False),
+        )
+        if self.linked_chat_id:
+            info["linked_chat_id"] = self.linked_chat_id
+        if self.pinned_message:
+            info["pinned_message"] = self.pinned_message
+        return info
+
+
+class FakeBotApi:
+    """
+    Bot API state and aiohttp handlers.
+
+    `latency` is added to each request. Each `flood_every`-th request is
+    answered with flood wait error for `retry_after` seconds. Posts are
+    forwarded to discussion groups after `forward_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        flood_every: int = 0,
+        retry_after: int = 1,
+        forward_delay: float = 0.05,
+    ):
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.forward_delay = forward_delay
+        self.chats: Dict[int, FakeChat] = {}
+        self.usernames: Dict[str, int] = {}
+        self.requests: Dict[str, int] = {}
+        self.flood_waits = 0
+        self._request_count = 0
+        self._chat_ids = itertools.count(1000000001)
+        self._updates: List[dict] = []
+        self._update_ids = itertools.count(1)
+        self._new_update = asyncio.Event()
+        self._tasks: set = set()
+        self._closed = False
+
+    def add_channel(
+        self, username: str, discussion: bool = True,
+    ) -> FakeChat:
+        channel = self._add_chat("channel", username, username)
+        if discussion:
+            group = self._add_chat("supergroup", f"{username} chat")
+            channel.linked_chat_id = group.id
+            group.linked_chat_id = channel.id
+        return channel
+
+    def _add_chat(
+        self, type_: str, title: str, username: Optional[str] = None,
+    ) -> FakeChat:
+        chat = FakeChat(
+            id=-next(self._chat_ids),
+            type=type_,
+            title=title,
+            username=username,
+        )
+        self.chats[chat.id] = chat
+        if username:
+            self.usernames["@" + username] = chat.id
+        return chat
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.on_shutdown.append(self._shutdown)
+        return app
+
+    async def _shutdown(self, app: web.Application) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._closed = True  # release long polling
+        self._new_update.set()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        self.requests[method] = self.requests.get(method, 0) + 1
+        self._request_count += 1
+        params = dict(await request.post())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            if (
+                self.flood_every
+                and self._request_count % self.flood_every == 0
+            ):
+                self.flood_waits += 1
+                raise ApiError(
+                    f"Too Many Requests: retry after {self.retry_after}",
+                    code=429,
+                    parameters={"retry_after": self.retry_after},
+                )
+            handler = getattr(self, f"_api_{method}", None)
+            if handler is None:
+                raise ApiError("Not Found", code=404)
+            result = await handler(params)
+        except ApiError as e:
+            response = {
+                "ok": False,
+                "error_code": e.code,
+                "description": e.description,
+            }
+            if e.parameters:
+                response["parameters"] = e.parameters
+            return web.json_response(response, status=e.code)
+        return web.json_response({"ok": True, "result": result})
+
+    def _get_chat(self, chat_id: Union[str, int, None]) -> FakeChat:
+        chat_id = str(chat_id)
+        if chat_id.startswith("@"):
+            chat = self.chats.get(self.usernames.get(chat_id, 0))
+        else:
+            try:
+                chat = self.chats.get(int(chat_id))
+            except ValueError:
+                chat = None
+        if chat is None:
+            raise ApiError("Bad Request: chat not found")
+        return chat
+
+    def _add_message(self, chat: FakeChat, **fields: Any) -> dict:
+        message = {
+            "message_id": next(chat.message_ids),
+            "date": int(time.time()),
+            "chat": chat.short_info(),
+            **fields,
+        }
+        chat.messages[message["message_id"]] = message
+        return message
+
+    def _add_update(self, message: dict) -> None:
+        self._updates.append({
+            "update_id": next(self._update_ids),
+            "message": message,
+        })
+        self._new_update.set()
+
+    async def _forward_post(self, channel: FakeChat, post: dict) -> None:
+        await asyncio.sleep(self.forward_delay)
+        group = self.chats[channel.linked_chat_id]
+        message = self._add_message(
+            group,
+            text=post["text"],
+            is_automatic_forward=True,
+            forward_origin={
+                "type": "channel",
+                "chat": channel.short_info(),
+                "message_id": post["message_id"],
+                "date": post["date"],
+            },
+            # used by the post manager, old clients of Bot API get them
+            forward_from_chat=channel.short_info(),
+            forward_from_message_id=post["message_id"],
+            forward_date=post["date"],
+        )
+        if post.get("entities"):
+            message["entities"] = post["entities"]
+        group.pinned_message = message
+        self._add_update(message)
+
+    async def _api_getme(self, params: dict) -> dict:
+        return {
+            "id": BOT_ID,
+            "is_bot": True,
+            "first_name": "Fake bot",
+            "username": "fake_bot",
+        }
+
+    async def _api_getchat(self, params: dict) -> dict:
+        return self._get_chat(params.get("chat_id")).full_info()
+
+    async def _api_sendmessage(self, params: dict) -> dict:
+        chat = self._get_chat(params.get("chat_id"))
+        text = params.get("text", "")
+        if not text:
+            raise ApiError("Bad Request: message text is empty")
+        fields: Dict[str, Any] = {"text": text}
+        if entities := params.get("entities"):
+            fields["entities"] = json.loads(entities)
+        reply_to = params.get("reply_to_message_id")
+        if reply_parameters := params.get("reply_parameters"):
+            reply_to = json.loads(reply_parameters)["message_id"]
+        if reply_to:
+            replied = chat.messages.get(int(reply_to))
+            if replied is None:
+                raise ApiError("Bad Request: message to be replied not found")
+            fields["reply_to_message"] = replied
+        message = self._add_message(chat, **fields)
+        if chat.type == "channel" and chat.linked_chat_id:
+            task = asyncio.create_task(self._forward_post(chat, message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return message
+
+    async def _api_editmessagetext(self, params: dict) -> dict:
+        chat = self._get_chat(params.get("chat_id"))
+        message = chat.messages.get(int(params.get("message_id", 0)))
+        if message is None:
+            raise ApiError("Bad Request: message to edit not found")
+        text = params.get("text", "")
+        entities = json.loads(params.get("entities") or "[]")
+        if message["text"] == text and message.get("entities", []) == entities:
+            raise ApiError(
+                "Bad Request: message is not modified: specified new message "
+                "content and reply markup are exactly the same as a current "
+                "content and reply markup of the message",
+            )
+        message["text"] = text
+        message["entities"] = entities
+        message["edit_date"] = int(time.time())
+        return message
+
+    async def _api_getupdates(self, params: dict) -> List[dict]:
+        offset = int(params.get("offset", 0))
+        if offset:
+            self._updates = [
+                update for update in self._updates
+                if update["update_id"] >= offset
+            ]
+        timeout = float(params.get("timeout", 0))
+        deadline = time.monotonic() + timeout
+        while not self._updates and not self._closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self._updates[:int(params.get("limit", 100))]
+
+
+async def start_fake_api(
+    api: FakeBotApi, host: str = "127.0.0.1", port: int = 0,
+) -> Tuple[web.AppRunner, str]:
+    """
+    Start server in the current event loop. Returns its runner and URL.
+    """
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+class RetryAfterMiddleware(BaseRequestMiddleware):
+    """
+    Repeat requests rejected by flood control after the requested pause.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES):
+        self.max_retries = max_retries
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        for _ in range(self.max_retries):
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                logger.warning(
+                    "Flood control on %s, retrying in %s s",
+                    type(method).__name__, e.retry_after,
+                )
+                await asyncio.sleep(e.retry_after)
+        return await make_request(bot, method)
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import GetChat
+from aiogram.types import AcceptedGiftTypes, ChatFullInfo
+
+from sulguk.post_manager.chat_info import (
+    ChatCache,
+    get_chat,
+    with_chat,
+)
+from sulguk.post_manager.exceptions import ChatNotFoundError
+
+
+def make_chat(chat_id: int, linked_chat_id: int) -> ChatFullInfo:
+    return ChatFullInfo.model_validate({
+        "id": chat_id,
+        "type": "channel",
+        "username": "channel",
+        "linked_chat_id": linked_chat_id,
+        "accent_color_id": 0,
+        "max_reaction_count": 11,
+        "accepted_gift_types": dict.fromkeys(
+            AcceptedGiftTypes.model_fields, True,
+        ),
+        "pinned_message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "channel"},
+        },
+    })
+
+
+def not_found() -> TelegramBadRequest:
+    return TelegramBadRequest(
+        method=GetChat(chat_id=1), message="Bad Request: chat not found",
+    )
+
+
+class FakeBot:
+    id = 42
+
+    def __init__(self, chat):
+        self.chat = chat
+        self.calls = 0
+
+    async def get_chat(self, chat_id):
+        self.calls += 1
+        if self.chat is None:
+            raise not_found()
+        return self.chat
+
+
+def test_cached(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json")
+    asyncio.run(get_chat(bot, "@channel", cache))
+
+    cache = ChatCache(tmp_path / "chats.json")
+    chat = cache.get(bot.id, "@channel")
+    assert chat.id == -100
+    assert chat.linked_chat_id == -200
+    assert chat.pinned_message is None
+    assert cache.get(bot.id, "@other") is None
+    assert cache.get(1, "@channel") is None
+
+
+def test_ttl(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json", ttl=-1)
+    asyncio.run(get_chat(bot, "@channel", cache))
+    assert cache.get(bot.id, "@channel") is None
+
+
+def test_invalidate(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json")
+    asyncio.run(get_chat(bot, "@channel", cache))
+    asyncio.run(get_chat(bot, "@other", cache))
+    cache.invalidate(bot.id, "@channel")
+    assert cache.get(bot.id, "@channel") is None
+    assert cache.get(bot.id, "@other") is not None
+    cache.invalidate(bot.id)
+    assert ChatCache(tmp_path / "chats.json").get(bot.id, "@other") is None
+
+
+def test_not_found(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json")
+    asyncio.run(get_chat(bot, "@channel", cache))
+    bot.chat = None
+    with pytest.raises(ChatNotFoundError):
+        asyncio.run(get_chat(bot, "@channel", cache))
+    assert cache.get(bot.id, "@channel") is None
+
+
+def test_broken_file(tmp_path):
+    path = tmp_path / "chats.json"
+    path.write_text("{")
+    assert ChatCache(path).get(42, "@channel") is None
+
+
+def test_with_chat(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json")
+    used = []
+
+    async def action(chat):
+        used.append(chat.id)
+        return chat.id
+
+    assert asyncio.run(with_chat(bot, "@channel", cache, action)) == -100
+    assert asyncio.run(with_chat(bot, "@channel", cache, action)) == -100
+    assert bot.calls == 1
+    assert used == [-100, -100]
+
+
+def test_with_outdated_chat(tmp_path):
+    bot = FakeBot(make_chat(-100, -200))
+    cache = ChatCache(tmp_path / "chats.json")
+    asyncio.run(get_chat(bot, "@channel", cache))
+    bot.chat = make_chat(-300, -400)
+
+    async def action(chat):
+        if chat.id == -100:
+            raise not_found()
+        return chat.id
+
+    assert asyncio.run(with_chat(bot, "@channel", cache, action)) == -300
+    assert bot.calls == 2
+    assert cache.get(bot.id, "@channel").id == -300
+
+
+def test_without_cache():
+    bot = FakeBot(make_chat(-100, -200))
+
+    async def action(chat):
+        return chat.pinned_message.message_id
+
+    assert asyncio.run(with_chat(bot, "@channel", None, action)) == 1
+    assert asyncio.run(with_chat(bot, "@channel", None, action)) == 1
+    assert bot.calls == 2
+
+
+def test_incompatible_entry(tmp_path):
+    path = tmp_path / "chats.json"
+    path.write_text('{"42:@channel": {"time": 1e20, "chat": {"id": 1}}}')
+    assert ChatCache(path).get(42, "@channel") is None
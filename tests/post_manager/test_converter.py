@@ -0,0 +1,50 @@
+import io
+import json
+
+from sulguk import transform_html
+from sulguk.post_manager.converter import convert_files, expand_files
+
+
+def test_convert_in_order(tmp_path):
+    filenames = []
+    for i in range(50):
+        filename = tmp_path / f"{i}.html"
+        filename.write_text(f"<b>Post</b> number <i>{i}</i>")
+        filenames.append(str(filename))
+    missing = str(tmp_path / "missing.html")
+    filenames_all = [*filenames, missing]
+    output = io.StringIO()
+
+    stats = convert_files(
+        filenames_all, output, workers=2, chunk_size=3,
+    )
+
+    assert stats.files == 51
+    assert stats.errors == 1
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["file"] for line in lines] == filenames_all
+    for filename, line in zip(filenames, lines[:-1], strict=True):
+        with open(filename) as f:
+            expected = transform_html(f.read())
+        assert line["text"] == expected.text
+        assert line["entities"] == expected.entities
+    assert "error" in lines[-1]
+
+
+def test_expand_files(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "2.html").write_text("")
+    (tmp_path / "1.html").write_text("")
+    files_list = tmp_path / "list.txt"
+    files_list.write_text("x.html\n\ny.html\n")
+
+    files = expand_files(
+        [str(tmp_path / "**" / "*.html"), "z.html"], str(files_list),
+    )
+    assert list(files) == [
+        str(tmp_path / "1.html"),
+        str(tmp_path / "a" / "2.html"),
+        "z.html",
+        "x.html",
+        "y.html",
+    ]
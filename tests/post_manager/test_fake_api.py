@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from sulguk import transform_html
+from sulguk.post_manager.editor import edit
+from sulguk.post_manager.exceptions import ChatNotFoundError
+from sulguk.post_manager.links import Link, parse_link
+from sulguk.post_manager.sender import send
+from sulguk.post_manager.session import create_bot
+from .fake_api import (
+    FAKE_TOKEN,
+    FakeBotApi,
+    RetryAfterMiddleware,
+    start_fake_api,
+)
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.html"
+        path.write_text(f"<b>Message {i}</b>")
+        paths.append(str(path))
+    return paths
+
+
+def run_with_api(api_kwargs, scenario, retry_flood_wait=False):
+    async def main():
+        api = FakeBotApi(**api_kwargs)
+        api.add_channel("channel")
+        runner, url = await start_fake_api(api)
+        bot = create_bot(FAKE_TOKEN, api_url=url)
+        if retry_flood_wait:
+            bot.session.middleware(RetryAfterMiddleware())
+        try:
+            await scenario(api, bot)
+        finally:
+            await bot.session.close()
+            await runner.cleanup()
+        return api
+
+    return asyncio.run(main())
+
+
+def send_args(files, destination="@channel"):
+    return SimpleNamespace(
+        destination=Link(destination),
+        file=files,
+        base_url=None,
+        mode="poll",
+    )
+
+
+def test_send_with_comments(files):
+    async def scenario(api, bot):
+        await send(bot, send_args(files))
+
+    api = run_with_api({"forward_delay": 0.01}, scenario)
+    channel_id = api.usernames["@channel"]
+    channel = api.chats[channel_id]
+    group = api.chats[channel.linked_chat_id]
+
+    assert [m["text"] for m in channel.messages.values()] == ["Message 0"]
+    forward, *comments = group.messages.values()
+    assert forward["forward_origin"]["message_id"] == 1
+    assert group.pinned_message is forward
+    expected = [transform_html(f"<b>Message {i}</b>") for i in (1, 2)]
+    assert [
+        (c["text"], c["entities"], c["reply_to_message"]["message_id"])
+        for c in comments
+    ] == [
+        (e.text, e.entities, forward["message_id"]) for e in expected
+    ]
+
+
+def test_edit(files):
+    async def scenario(api, bot):
+        await send(bot, send_args(files[:1]))
+        args = SimpleNamespace(
+            destination=parse_link("https://t.me/channel/1"),
+            file=files[1],
+            base_url=None,
+        )
+        await edit(bot, args)
+        await edit(bot, args)  # not modified, ignored
+
+    api = run_with_api({}, scenario)
+    channel = api.chats[api.usernames["@channel"]]
+    assert channel.messages[1]["text"] == "Message 1"
+    assert "edit_date" in channel.messages[1]
+    assert api.requests["editmessagetext"] == 2
+
+
+def test_chat_not_found(files):
+    async def scenario(api, bot):
+        with pytest.raises(ChatNotFoundError):
+            await send(bot, send_args(files, "@unknown"))
+
+    api = run_with_api({}, scenario)
+    assert api.requests == {"getchat": 1}
+
+
+def test_flood_wait(files):
+    async def scenario(api, bot):
+        await send(bot, send_args(files[:1]))
+
+    api = run_with_api(
+        {"flood_every": 2, "retry_after": 1}, scenario, retry_flood_wait=True,
+    )
+    assert api.flood_waits == 1
+    channel = api.chats[api.usernames["@channel"]]
+    assert [m["text"] for m in channel.messages.values()] == ["Message 0"]
+
+
+def test_flood_wait_not_retried(files):
+    async def scenario(api, bot):
+        with pytest.raises(TelegramRetryAfter):
+            await send(bot, send_args(files[:1]))
+
+    api = run_with_api({"flood_every": 2, "retry_after": 1}, scenario)
+    assert api.flood_waits == 1
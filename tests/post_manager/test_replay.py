@@ -0,0 +1,62 @@
+import pstats
+from types import SimpleNamespace
+
+import pytest
+
+from sulguk import Limits, SlowRenderCapture, transform_html
+from sulguk.capture import iter_captures
+from sulguk.limits import LimitExceededError
+from sulguk.post_manager.exceptions import ManagerError
+from sulguk.post_manager.replay import _renderer, replay
+
+
+def test_replay(tmp_path, capsys):
+    capture = SlowRenderCapture(tmp_path / "captures", threshold=0)
+    transform_html("<b>first</b>", capture=capture)
+    transform_html(b"<i>second</i>", capture=capture)
+    profile = tmp_path / "profile"
+
+    replay(SimpleNamespace(
+        capture=[str(tmp_path / "captures")],
+        sort="cumulative",
+        limit=10,
+        repeat=2,
+        output=str(profile),
+    ))
+
+    assert capsys.readouterr().out.count("function calls") == 2
+    stats = pstats.Stats(str(profile))
+    assert any(
+        func[2] == "render" and calls == 4
+        for func, (calls, *_) in stats.stats.items()
+    )
+
+
+def test_replay_failed(tmp_path, capsys):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    with pytest.raises(LimitExceededError):
+        transform_html(
+            "<b>x</b>" * 20, limits=Limits(max_entities=10), capture=capture,
+        )
+
+    replay(SimpleNamespace(
+        capture=[str(tmp_path)],
+        sort="cumulative",
+        limit=10,
+        repeat=1,
+        output=None,
+    ))
+    assert "function calls" in capsys.readouterr().out
+    [(path, saved)] = iter_captures([str(tmp_path)])
+    assert _renderer(path, saved).limits == Limits(max_entities=10)
+
+
+def test_no_captures(tmp_path):
+    with pytest.raises(ManagerError):
+        replay(SimpleNamespace(
+            capture=[str(tmp_path)],
+            sort="cumulative",
+            limit=10,
+            repeat=1,
+            output=None,
+        ))
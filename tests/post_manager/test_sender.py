@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from sulguk import transform_html
+from sulguk.post_manager import file, sender
+from sulguk.post_manager.links import Link
+
+
+class FakeBot:
+    id = 42
+
+    def __init__(self):
+        self.sent = []
+
+    async def get_chat(self, chat_id):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(
+            id=-100, username="channel", linked_chat_id=-200,
+        )
+
+    async def send_message(self, chat_id, text, entities, **kwargs):
+        self.sent.append((chat_id, text, entities))
+        return SimpleNamespace(message_id=len(self.sent))
+
+
+async def find_linked_message(bot, chat, message):
+    return SimpleNamespace(message_id=1000)
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.html"
+        path.write_text(f"<b>Message {i}</b>")
+        paths.append(str(path))
+    return paths
+
+
+def make_args(files):
+    return SimpleNamespace(
+        destination=Link("@channel"),
+        file=files,
+        base_url=None,
+        mode="fake",
+    )
+
+
+@pytest.mark.parametrize("parallel", [2, 100])
+def test_send(files, monkeypatch, parallel):
+    monkeypatch.setitem(sender.get_linked_message, "fake", find_linked_message)
+    monkeypatch.setattr(file, "PARALLEL_FILES", parallel)
+    monkeypatch.setattr(file.os, "cpu_count", lambda: 2)
+    bot = FakeBot()
+    asyncio.run(sender.send(bot, make_args(files)))
+
+    expected = [transform_html(f"<b>Message {i}</b>") for i in range(5)]
+    assert bot.sent == [
+        (-100 if i == 0 else -200, result.text, result.entities)
+        for i, result in enumerate(expected)
+    ]
+
+
+def test_error_before_publishing(files, monkeypatch):
+    monkeypatch.setitem(sender.get_linked_message, "fake", find_linked_message)
+    with open(files[3], "w") as f:
+        f.write("<unknown-tag>text</unknown-tag>")
+    bot = FakeBot()
+    with pytest.raises(ValueError):
+        asyncio.run(sender.send(bot, make_args(files)))
+    assert bot.sent == []
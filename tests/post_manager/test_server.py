@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from sulguk import transform_html
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from sulguk.post_manager import server  # noqa: E402
+from sulguk.post_manager.server import (  # noqa: E402
+    init_worker,
+    render_batch,
+    start_server,
+)
+
+
+def test_render_batch():
+    results = render_batch([
+        {"html": "<b>x</b>"},
+        {"html": "<unknown>x</unknown>"},
+        {"html": "<a href='/x'>x</a>", "base_url": "https://example.com"},
+    ])
+    assert results[0] == {
+        "text": "x",
+        "entities": [{"type": "bold", "offset": 0, "length": 1}],
+    }
+    assert "error" in results[1]
+    assert results[2]["entities"][0]["url"] == "https://example.com/x"
+
+
+async def _request_all(socket, payloads):
+    connector = aiohttp.UnixConnector(path=socket)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def post(payload):
+            async with session.post(
+                "http://localhost/render", json=payload,
+            ) as response:
+                return response.status, await response.json()
+
+        return await asyncio.gather(*(post(p) for p in payloads))
+
+
+async def _serve_and_request(socket, payloads):
+    with ProcessPoolExecutor(2, initializer=init_worker) as executor:
+        runner = await start_server(executor, 2, max_pending=1, socket=socket)
+        try:
+            return await _request_all(socket, payloads)
+        finally:
+            await runner.cleanup()
+
+
+def test_server(tmp_path):
+    htmls = [f"<b>{i}</b> <i>item</i>" for i in range(20)]
+    payloads = [
+        {"html": htmls[0]},
+        [{"html": html} for html in htmls],
+        {"html": "<unknown>"},
+        {"text": "no html"},
+        [],
+    ]
+    responses = asyncio.run(
+        _serve_and_request(str(tmp_path / "sulguk.sock"), payloads),
+    )
+    expected = [transform_html(html) for html in htmls]
+
+    status, single = responses[0]
+    assert status == 200
+    assert single["text"] == expected[0].text
+
+    status, batch = responses[1]
+    assert status == 200
+    assert [r["text"] for r in batch] == [r.text for r in expected]
+    assert [r["entities"] for r in batch] == [r.entities for r in expected]
+
+    assert responses[2][0] == 422
+    assert responses[3][0] == 400
+    assert responses[4] == (200, [])
+
+
+async def _serve_busy(socket, started, release):
+    with ThreadPoolExecutor(2) as executor:
+        runner = await start_server(
+            executor, 2, max_pending=1, socket=socket, max_requests=1,
+        )
+        try:
+            first = asyncio.create_task(
+                _request_all(socket, [{"html": "<b>1</b>"}]),
+            )
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, started.wait)
+            busy = await _request_all(socket, [{"html": "<b>2</b>"}])
+            release.set()
+            return await first + busy
+        finally:
+            release.set()
+            await runner.cleanup()
+
+
+def test_server_busy(tmp_path, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_render_batch(items):
+        started.set()
+        release.wait()
+        return render_batch(items)
+
+    monkeypatch.setattr(server, "render_batch", slow_render_batch)
+    first, busy = asyncio.run(
+        _serve_busy(str(tmp_path / "sulguk.sock"), started, release),
+    )
+    assert first == (200, {
+        "text": "1",
+        "entities": [{"type": "bold", "offset": 0, "length": 1}],
+    })
+    assert busy == (503, {"error": "Server is busy"})
+
+
+def test_render_batch_shared_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "_cache", None)  # restored after the test
+    init_worker(str(tmp_path / "cache.sqlite"))
+    items = [{"html": "<b>x</b>"}, {"html": "<unknown>"}]
+    first = render_batch(items)
+    assert render_batch(items) == first
+    assert "error" in first[1]
+    assert server._cache.size() > 0
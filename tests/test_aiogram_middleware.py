@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram import Bot
+from aiogram.methods import SendMessage, SendPoll
+
+from sulguk import (
+    SULGUK_PARSE_MODE,
+    AiogramSulgukMiddleware,
+    SlowRenderCapture,
+    transform_html,
+)
+from sulguk.capture import iter_captures
+
+HTML = "<b>Hello</b>, <a href='/world'>world</a>"
+
+
+async def make_request(bot, method):
+    return method
+
+
+@pytest.mark.parametrize("cooperative", [False, True])
+def test_send_message(cooperative):
+    middleware = AiogramSulgukMiddleware(
+        base_url="https://example.com", cooperative=cooperative,
+    )
+    bot = Bot("42:TOKEN")
+    method = SendMessage(chat_id=1, text=HTML, parse_mode=SULGUK_PARSE_MODE)
+    asyncio.run(middleware(make_request, bot, method))
+
+    expected = transform_html(HTML, base_url="https://example.com")
+    assert method.text == expected.text
+    assert method.entities == expected.entities
+    assert method.parse_mode is None
+
+
+@pytest.mark.parametrize("cooperative", [False, True])
+def test_poll(cooperative):
+    middleware = AiogramSulgukMiddleware(cooperative=cooperative)
+    bot = Bot("42:TOKEN")
+    method = SendPoll(
+        chat_id=1,
+        question=HTML,
+        options=["a", "b"],
+        explanation="<i>because</i>",
+        question_parse_mode=SULGUK_PARSE_MODE,
+        explanation_parse_mode=SULGUK_PARSE_MODE,
+    )
+    asyncio.run(middleware(make_request, bot, method))
+    assert method.question == "Hello, world"
+    assert method.explanation == "because"
+
+
+def test_other_parse_mode():
+    middleware = AiogramSulgukMiddleware(cooperative=True)
+    method = SendMessage(chat_id=1, text=HTML, parse_mode="HTML")
+    asyncio.run(middleware(make_request, Bot("42:TOKEN"), method))
+    assert method.text == HTML
+
+
+@pytest.mark.parametrize("cooperative", [False, True])
+def test_capture(tmp_path, cooperative):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    middleware = AiogramSulgukMiddleware(
+        base_url="https://example.com",
+        cooperative=cooperative,
+        capture=capture,
+    )
+    method = SendMessage(chat_id=1, text=HTML, parse_mode=SULGUK_PARSE_MODE)
+    asyncio.run(middleware(make_request, Bot("42:TOKEN"), method))
+
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.html == HTML
+    assert saved.base_url == "https://example.com"
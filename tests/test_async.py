@@ -0,0 +1,139 @@
+import asyncio
+import gc
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from sulguk import (
+    LimitExceededError,
+    Limits,
+    Renderer,
+    transform_html,
+    transform_html_async,
+)
+from sulguk.entities import Group
+from sulguk.render import State
+from .test_incremental import random_document
+
+FIXTURES = Path("tests/fixtures")
+PARAGRAPH = (
+    "<p>Paragraph {i} with <b>bold</b>, <i>italic</i> and "
+    "<a href='https://example.com/{i}'>a link</a>.</p>\n"
+)
+HUGE = "".join(PARAGRAPH.format(i=i) for i in range(3000))
+# the whole document is a single block
+HUGE_DIV = f"<div>{HUGE}</div>"
+HUGE_LIST = (
+    "<ul>" + "".join(f"<li>item <b>{i}</b></li>" for i in range(20000))
+    + "</ul>"
+)
+
+
+@pytest.mark.parametrize("html", [
+    (FIXTURES / "supported_tags.html").read_text(),
+    HUGE,
+    HUGE_DIV,
+    HUGE_LIST,
+    "plain text",
+    "",
+    None,
+])
+def test_same_as_sync(html):
+    expected = transform_html(html, base_url="http://example.com/")
+    result = asyncio.run(
+        transform_html_async(html, base_url="http://example.com/"),
+    )
+    assert result == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random(seed):
+    html = random_document(random.Random(seed))
+    renderer = Renderer(merge=True)
+    try:
+        expected = renderer.render(html)
+    except ValueError:
+        with pytest.raises(ValueError):
+            asyncio.run(renderer.render_async(html, slice_time=0))
+    else:
+        assert asyncio.run(renderer.render_async(html, slice_time=0)) == (
+            expected
+        )
+
+
+def test_limits():
+    renderer = Renderer(limits=Limits(max_elements=100))
+    with pytest.raises(LimitExceededError):
+        asyncio.run(renderer.render_async(HUGE))
+
+
+
+class Reversed(Group):
+    # custom entity without `iter_render`, rendered at once
+    def render(self, state: State) -> None:
+        for entity in reversed(self.entities):
+            entity.render(state)
+
+
+def test_custom_render():
+    tags = {"reversed": lambda attrs: (None, Reversed())}
+    renderer = Renderer(tags=tags)
+    html = "<p><reversed><b>1</b><i>2</i>3</reversed></p>"
+    expected = renderer.render(html)
+    assert expected.text == "321\n\n"
+    assert asyncio.run(renderer.render_async(html, slice_time=0)) == expected
+
+
+async def render_with_ticker(renderer: Renderer, html: str) -> float:
+    """
+    Render a document and return the longest time the loop was blocked.
+
+    Pauses of the garbage collector are not counted: they happen in any
+    code creating many objects and grow with the size of the heap.
+    """
+    max_delay = 0
+    done = False
+    gc_time = 0
+    gc_start = 0
+
+    def on_gc(phase, info):
+        nonlocal gc_time, gc_start
+        if phase == "start":
+            gc_start = time.perf_counter()
+        else:
+            gc_time += time.perf_counter() - gc_start
+
+    async def ticker():
+        nonlocal max_delay
+        while not done:
+            start = time.perf_counter()
+            gc_before = gc_time
+            await asyncio.sleep(0)
+            delay = time.perf_counter() - start - (gc_time - gc_before)
+            max_delay = max(max_delay, delay)
+
+    gc.callbacks.append(on_gc)
+    try:
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        await renderer.render_async(html, slice_time=0.005)
+        done = True
+        await task
+    finally:
+        gc.callbacks.remove(on_gc)
+    return max_delay
+
+
+@pytest.mark.parametrize("html", [HUGE, HUGE_DIV, HUGE_LIST], ids=[
+    "paragraphs", "div", "list",
+])
+def test_loop_latency(html):
+    renderer = Renderer()
+    start = time.perf_counter()
+    renderer.render(html)
+    blocking = time.perf_counter() - start
+
+    max_delay = asyncio.run(render_with_ticker(renderer, html))
+    assert max_delay < blocking / 10
@@ -0,0 +1,76 @@
+import codecs
+import mmap
+from pathlib import Path
+
+import pytest
+
+from sulguk import LimitExceededError, Limits, Renderer, transform_html
+from sulguk.post_manager import file
+from sulguk.post_manager.file import load_file
+
+FIXTURES = Path("tests/fixtures")
+HTML = "<p>Привет, <b>мир</b> 🙂</p><ul><li>один</li><li>два</li></ul>"
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_utf8(wrap):
+    expected = transform_html(HTML)
+    assert transform_html(wrap(HTML.encode("utf-8"))) == expected
+
+
+def test_fixture():
+    data = (FIXTURES / "supported_tags.html").read_bytes()
+    expected = transform_html(data.decode("utf-8"))
+    assert Renderer(fused=True).render(data) == expected
+    assert Renderer().render(data) == expected
+
+
+@pytest.mark.parametrize("bom, encoding", [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+])
+def test_bom(bom, encoding):
+    expected = transform_html(HTML)
+    assert transform_html(bom + HTML.encode(encoding)) == expected
+
+
+@pytest.mark.parametrize("meta", [
+    '<meta charset="windows-1251">',
+    '<meta http-equiv="Content-Type" content="text/html; charset=cp1251">',
+])
+def test_meta_charset(meta):
+    html = "Привет <b>мир</b>"
+    expected = transform_html(html)
+    assert transform_html((meta + html).encode("cp1251")) == expected
+
+
+def test_empty():
+    assert transform_html(b"").text == ""
+    assert transform_html(b" \n ").text == ""
+
+
+def test_limits():
+    renderer = Renderer(limits=Limits(max_input_bytes=10))
+    assert renderer.render(b"<b>12</b>").text == "12"
+    with pytest.raises(LimitExceededError):
+        renderer.render(b"<b>123456</b>")
+
+
+def test_mmap(tmp_path):
+    path = tmp_path / "doc.html"
+    path.write_bytes(HTML.encode("utf-8"))
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ,
+    ) as data:
+        assert transform_html(data) == transform_html(HTML)
+        # the buffer is released after rendering
+        data.close()
+
+
+@pytest.mark.parametrize("threshold", [0, file.MMAP_THRESHOLD])
+def test_load_file(tmp_path, monkeypatch, threshold):
+    monkeypatch.setattr(file, "MMAP_THRESHOLD", threshold)
+    path = tmp_path / "doc.html"
+    path.write_bytes(HTML.encode("utf-8"))
+    assert load_file(path, None) == transform_html(HTML)
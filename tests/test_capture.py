@@ -0,0 +1,123 @@
+import asyncio
+import os
+
+import pytest
+
+from sulguk import Limits, Renderer, SlowRenderCapture, transform_html
+from sulguk.capture import iter_captures
+from sulguk.limits import LimitExceededError
+
+HTML = "<b>Slow</b> <a href='/x'>render</a>"
+
+
+def test_capture(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    result = transform_html(HTML, base_url="https://a.b/", capture=capture)
+    assert result == transform_html(HTML, base_url="https://a.b/")
+
+    [(path, saved)] = iter_captures([str(tmp_path)])
+    assert saved.html == HTML
+    assert saved.base_url == "https://a.b/"
+    assert set(saved.timings) == {"parse", "walk", "render"}
+    assert saved.counts["elements"] > 2
+    assert saved.counts["input_chars"] == len(HTML)
+    assert saved.counts["text_length"] == len(result.text)
+    assert saved.counts["entities"] == 2
+    assert saved.version
+    assert saved.error is None
+
+
+def test_settings(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    transform_html(
+        HTML,
+        limits=Limits(max_length=100),
+        custom_emoji={"Slow": "1"},
+        tags={"foo": lambda attrs: (None, None)},
+        url_rewriter=lambda url: url,
+        capture=capture,
+    )
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert Limits(**saved.limits) == Limits(max_length=100)
+    assert saved.custom_emoji == {"Slow": "1"}
+    assert saved.custom_tags == ["foo"]
+    assert saved.url_rewriter
+
+
+def test_plain_text(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    assert transform_html("plain", capture=capture).text == "plain"
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.html == "plain"
+    assert set(saved.timings) == {"plain"}
+
+
+@pytest.mark.parametrize("html, stages", [
+    ("<b>x</b>" * 20, {"parse", "walk"}),
+    ("<b>x</b>" * 5 + "<b>" + "y" * 100, {"parse", "walk", "render"}),
+])
+def test_failed(tmp_path, html, stages):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    limits = Limits(max_elements=10, max_length=50)
+    with pytest.raises(LimitExceededError):
+        transform_html(html, limits=limits, capture=capture)
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.error.startswith("LimitExceededError")
+    assert set(saved.timings) == stages
+    assert "text_length" not in saved.counts
+
+
+def test_failed_async(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    renderer = Renderer(limits=Limits(max_length=10), capture=capture)
+    with pytest.raises(LimitExceededError):
+        asyncio.run(renderer.render_async("<p>block</p>" * 10))
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.error.startswith("LimitExceededError")
+
+
+def test_bytes(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    transform_html(memoryview(HTML.encode()), capture=capture)
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.html == HTML.encode()
+    assert saved.counts["input_bytes"] == len(HTML.encode())
+
+
+def test_fast_render_not_captured(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=10)
+    transform_html(HTML, capture=capture)
+    capture = SlowRenderCapture(tmp_path, threshold=0, sample_rate=0)
+    transform_html(HTML, capture=capture)
+    assert not list(tmp_path.iterdir())
+
+
+def test_async(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0)
+    renderer = Renderer(capture=capture)
+    html = "<p>block</p>" * 10
+    result = asyncio.run(renderer.render_async(html))
+    assert result == transform_html(html)
+    [(_, saved)] = iter_captures([str(tmp_path)])
+    assert saved.html == html
+    assert set(saved.timings) == {"parse", "walk", "render"}
+    assert saved.counts["elements"] == 13
+
+
+def test_rotate_files(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0, max_files=3)
+    for i in range(5):
+        transform_html(f"<b>{i}</b>", capture=capture)
+    captures = iter_captures([str(tmp_path)])
+    assert [saved.html for _, saved in captures] == [
+        "<b>2</b>", "<b>3</b>", "<b>4</b>",
+    ]
+
+
+def test_rotate_size(tmp_path):
+    capture = SlowRenderCapture(tmp_path, threshold=0, max_bytes=2000)
+    for i in range(5):
+        transform_html(f"<b>{i}</b>" + "x" * 500, capture=capture)
+    sizes = [entry.stat().st_size for entry in os.scandir(tmp_path)]
+    assert sum(sizes) <= 2000
+    assert 0 < len(sizes) < 5
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from sulguk import Catalog, build_catalog, transform_html
+from sulguk import catalog as catalog_module
+
+
+@pytest.fixture
+def messages(tmp_path):
+    directory = tmp_path / "messages"
+    (directory / "help").mkdir(parents=True)
+    (directory / "start.html").write_text("<b>Hello</b>, <i>user</i>")
+    (directory / "help" / "faq.html").write_text("<ul><li>one<li>two</ul>")
+    return directory
+
+
+def test_build_and_load(messages, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    assert build_catalog(str(messages), path) == (2, 0)
+
+    with Catalog(path) as catalog:
+        assert sorted(catalog.names()) == ["help/faq", "start"]
+        assert "start" in catalog
+        result = catalog["start"]
+        expected = transform_html("<b>Hello</b>, <i>user</i>")
+        assert result.text == expected.text
+        assert result.entities == expected.entities
+        assert catalog["help/faq"].text == "• one\n• two\n"
+        assert catalog.get("missing") is None
+
+    # unchanged files are reused
+    assert build_catalog(str(messages), path) == (0, 2)
+
+
+def test_stale_entry(messages, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    build_catalog(str(messages), path)
+    source = messages / "start.html"
+
+    with Catalog(path) as catalog:
+        assert catalog["start"].text == "Hello, user"
+        source.write_text("<b>Bye</b>")
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert catalog["start"].text == "Bye"
+        catalog.save()
+
+    with Catalog(path) as catalog:
+        assert catalog["start"].text == "Bye"
+        assert catalog["help/faq"].text == "• one\n• two\n"
+
+
+def test_touched_entry(messages, tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    build_catalog(str(messages), path)
+    source = messages / "start.html"
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    with Catalog(path) as catalog:
+        assert catalog["start"].text == "Hello, user"
+        catalog.save()
+
+    with Catalog(path) as catalog:
+        assert catalog.entries["start"].mtime_ns == source.stat().st_mtime_ns
+
+
+def test_render_version(messages, tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.bin")
+    build_catalog(str(messages), path)
+    monkeypatch.setattr(catalog_module, "RENDER_VERSION", -1)
+
+    with Catalog(path) as outdated:
+        assert outdated.outdated()
+        assert outdated["start"].text == "Hello, user"
+        assert outdated._rebuilt.keys() == {"start"}
+        outdated.save()
+        assert not outdated.outdated()
+
+    # nothing is reused from a catalog of other render version
+    monkeypatch.setattr(catalog_module, "RENDER_VERSION", -2)
+    assert build_catalog(str(messages), path) == (2, 0)
+
+
+def test_not_catalog(tmp_path):
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(b"something else")
+    with pytest.raises(ValueError):
+        Catalog(str(path))
@@ -0,0 +1,115 @@
+import asyncio
+import random
+import re
+
+import pytest
+
+from sulguk import Renderer, transform_html
+from sulguk.render import EmojiMatcher
+
+CUSTOM_EMOJI = {
+    "🙂": "1",
+    "👍": "2",
+    "👍🏻": "3",
+    ":fire:": "4",
+    ":fire_engine:": "5",
+}
+
+
+def wrap_emoji(html: str) -> str:
+    # the same done by preprocessing HTML
+    pattern = "|".join(
+        re.escape(key) for key in sorted(CUSTOM_EMOJI, key=len, reverse=True)
+    )
+    return re.sub(
+        pattern,
+        lambda m: (
+            f'<tg-emoji emoji-id="{CUSTOM_EMOJI[m[0]]}">{m[0]}</tg-emoji>'
+        ),
+        html,
+    )
+
+
+@pytest.mark.parametrize("html", [
+    "Hello 🙂",
+    "🙂🙂 :fire::fire_engine: :fir",
+    "<b>Nice 👍🏻 and 👍</b>",
+    "<p>  👍  </p><p>:fire:</p>",
+    "<h1>big :fire:</h1>",
+    '<a href="https://example.com">🙂 link</a>',
+    "<ul><li>👍</li><li>🙂</li></ul>",
+])
+def test_same_as_tags(html):
+    expected = transform_html(wrap_emoji(html))
+    assert transform_html(html, custom_emoji=CUSTOM_EMOJI) == expected
+
+
+def test_entity():
+    result = transform_html("👍🏻 :fire:", custom_emoji=CUSTOM_EMOJI)
+    assert result.text == "👍🏻 :fire:"
+    assert result.entities == [
+        {"type": "custom_emoji", "offset": 0, "length": 4,
+         "custom_emoji_id": "3"},
+        {"type": "custom_emoji", "offset": 5, "length": 6,
+         "custom_emoji_id": "4"},
+    ]
+
+
+@pytest.mark.parametrize("html", [
+    "<code>🙂</code>",
+    "<pre>🙂\n :fire:</pre>",
+    '<pre class="language-python"><b>🙂</b></pre>',
+    '<tg-emoji emoji-id="9">🙂</tg-emoji>',
+])
+def test_not_replaced(html):
+    assert transform_html(html, custom_emoji=CUSTOM_EMOJI) == (
+        transform_html(html)
+    )
+
+
+def test_all_render_paths():
+    html = "<p>a 🙂</p><div>:fire_engine: <i>👍</i></div>" * 5
+    renderer = Renderer(custom_emoji=CUSTOM_EMOJI)
+    expected = renderer.render(html)
+    assert len(expected.entities) == 20
+    assert Renderer(custom_emoji=CUSTOM_EMOJI, fused=True).render(html) == (
+        expected
+    )
+    assert renderer.render_program(renderer.compile(html)) == expected
+    assert renderer.render_incremental(html).text == expected.text
+    assert renderer.render_incremental(html).entities == expected.entities
+    assert asyncio.run(renderer.render_async(html)) == expected
+
+
+def test_empty_pattern():
+    with pytest.raises(ValueError):
+        Renderer(custom_emoji={"": "1"})
+
+
+def leftmost_longest(patterns, text):
+    result = []
+    pos = 0
+    while pos < len(text):
+        for start in range(pos, len(text)):
+            found = [p for p in patterns if text.startswith(p, start)]
+            if found:
+                pattern = max(found, key=len)
+                result.append((start, start + len(pattern), patterns[pattern]))
+                pos = start + len(pattern)
+                break
+        else:
+            break
+    return result
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matcher(seed):
+    rnd = random.Random(seed)
+    patterns = {
+        "".join(rnd.choices("abc", k=rnd.randint(1, 4))): str(i)
+        for i in range(rnd.randint(1, 8))
+    }
+    text = "".join(rnd.choices("abcx", k=rnd.randint(0, 40)))
+    assert EmojiMatcher(patterns).find(text) == (
+        leftmost_longest(patterns, text)
+    )
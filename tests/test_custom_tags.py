@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+import pytest
+
+from sulguk import Renderer, transform_html
+from sulguk.data import MessageEntity, User
+from sulguk.entities import Bold, DecoratedEntity, Group, Style, Text
+from sulguk.mapper import Attrs, EntityPair
+
+
+@dataclass
+class Mention(DecoratedEntity):
+    user_id: int = 0
+
+    def _get_entity(self, offset: int, length: int) -> MessageEntity:
+        return MessageEntity(
+            type="text_mention",
+            user=User(id=self.user_id),
+            offset=offset,
+            length=length,
+        )
+
+
+def get_mention(attrs: Attrs) -> EntityPair:
+    return None, Mention(user_id=int(dict(attrs)["id"]))
+
+
+def get_price(attrs: Attrs) -> EntityPair:
+    inner = Group()
+    entity = Bold(entities=[inner, Text(text=" $")])
+    return inner, entity
+
+
+TAGS = {
+    "user-mention": get_mention,
+    "price": get_price,
+    "b": lambda attrs: (None, Style(types=("bold", "italic"))),
+}
+
+HTML = '<user-mention id="42">Bob</user-mention> pays <price>10</price>'
+PLAIN = "Bob pays 10 $"
+ENTITIES = [
+    MessageEntity(type="text_mention", user=User(id=42), offset=0, length=3),
+    MessageEntity(type="bold", offset=9, length=4),
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_custom_tags(fused):
+    result = Renderer(tags=TAGS, fused=fused).render(HTML)
+    assert result.text == PLAIN
+    assert result.entities == ENTITIES
+
+
+def test_override():
+    result = transform_html("<b>1</b>", tags=TAGS)
+    assert result.entities == [
+        MessageEntity(type="italic", offset=0, length=1),
+        MessageEntity(type="bold", offset=0, length=1),
+    ]
+
+
+def test_unknown():
+    with pytest.raises(ValueError, match="Unsupported tag"):
+        transform_html(HTML)
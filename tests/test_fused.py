@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from sulguk import transform_html
+from sulguk.entities import Group, Text
+
+FIXTURES = Path("tests/fixtures")
+
+CASES = [
+    "<ol reversed>\n  <li>1</li>\n  <li>2</li>\n  <li>3</li>\n</ol>",
+    "<ol start=5><li>1</li><li value=10>2</li>text<li>3</li></ol>",
+    "<ul><li>1<ul><li>1.1</li></ul></li><li>2</li></ul>",
+    '<pre><code class="language-python">x = 1</code></pre>',
+    '<pre class="language-go">\n  x := 1\n</pre>',
+    "<pre>1<code>2</code></pre>",
+    "<h1>Header <b>bold</b></h1><p>text <mark>marked</mark></p>",
+    '<a href="/a">link <img src="/i.png" alt="img"></a>',
+    "<blockquote>1<br>2</blockquote><details><summary>s</summary>d</details>",
+    "<b>1<i>2</b>3</i>",
+]
+
+
+def test_fixture():
+    html = (FIXTURES / "supported_tags.html").read_text()
+    assert transform_html(html, fused=True) == transform_html(html)
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_same_as_tree(html):
+    expected = transform_html(html, base_url="http://example.com/")
+    result = transform_html(html, base_url="http://example.com/", fused=True)
+    assert result == expected
+
+
+class Counted(Group):
+    def render(self, state):
+        self.add(Text(text=f" ({len(self.entities)})"))
+        first = self.entities[0]
+        super().render(state)
+        first.render(state)
+
+
+def test_unrendered_children():
+    html = "<progress value=3 max=5><i><table>"
+    with pytest.raises(ValueError, match="Unsupported tag: table"):
+        transform_html(html)
+    with pytest.raises(ValueError, match="Unsupported tag: table"):
+        transform_html(html, fused=True)
+
+
+def test_children_as_list():
+    tags = {"counted": lambda attrs: (None, Counted())}
+    html = "<counted><b>1</b>2<i>3</i></counted>"
+    expected = transform_html(html, tags=tags)
+    assert expected.text == "123 (3)1"
+    assert transform_html(html, tags=tags, fused=True) == expected
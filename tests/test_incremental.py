@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from sulguk import LimitExceededError, Limits, Renderer
+
+PIECES = [
+    "<p>Paragraph with <b>bold</b> and <i>italic</i></p>",
+    "<p>Unclosed paragraph ",
+    "<p>",
+    "</p>",
+    "<div>block</div>",
+    "<div><p>nested</p><p>paragraphs</p></div>",
+    "<div>",
+    "</div>",
+    "<ul><li>one<li>two</ul>",
+    "<ol reversed><li>a</li><li>b</li></ol>",
+    "<h1>Header</h1>",
+    "<h3>small <u>header</u></h3>",
+    "<pre>\n  code\n  block</pre>",
+    "<pre class='language-python'><code>x = 1</code></pre>",
+    "<blockquote>quote <s>text</s></blockquote>",
+    "<b>unclosed bold ",
+    "</b>",
+    "<a href='https://example.com'>link</a>",
+    "<!-- comment <p> inside -->",
+    "<script>document.write('<div>')</script>",
+    "<table><tr><td>cell</td></tr></table>",
+    "<hr>",
+    "<br/>",
+    "text",
+    " spaced   text ",
+    "\n",
+    "  ",
+    "&amp; &lt;p&gt;",
+    "<tg-spoiler>spoiler</tg-spoiler>",
+    "<span class='tg-spoiler'>span</span>",
+    "<progress value='0.3'></progress>",
+    "<p title='<p>'>attribute</p>",
+    "<details><summary>more</summary>hidden</details>",
+    "<body>",
+    "</body>",
+    "</td>",
+    "<frameset>",
+]
+
+
+def random_document(rnd: random.Random) -> str:
+    pieces = [rnd.choice(PIECES) for _ in range(rnd.randint(0, 30))]
+    if rnd.random() < 0.3:
+        pieces.insert(0, "<!DOCTYPE html>")
+    return "".join(pieces)
+
+
+def random_edit(rnd: random.Random, html: str) -> str:
+    pos = rnd.randint(0, len(html))
+    action = rnd.randrange(3)
+    if action == 0:
+        return html[:pos] + rnd.choice(PIECES) + html[pos:]
+    elif action == 1:
+        return html[:pos] + html[pos + rnd.randint(1, 20):]
+    return html[:pos] + rnd.choice("<>/p& \nab") + html[pos:]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_fuzz(seed):
+    rnd = random.Random(seed)
+    renderer = Renderer()
+    html = random_document(rnd)
+    previous = None
+    for _ in range(30):
+        try:
+            expected = renderer.render(html)
+        except ValueError:
+            with pytest.raises(ValueError):
+                renderer.render_incremental(html, previous)
+        else:
+            result = renderer.render_incremental(html, previous)
+            assert (result.text, result.entities) == (
+                expected.text, expected.entities,
+            ), html
+            previous = result
+        html = random_edit(rnd, html)
+
+
+def test_frameset():
+    renderer = Renderer()
+    html = "</td><div><frameset>"
+    with pytest.raises(ValueError, match="Unsupported tag: frameset"):
+        renderer.render(html)
+    with pytest.raises(ValueError, match="Unsupported tag: frameset"):
+        renderer.render_incremental(html)
+    # ignored after text
+    html = "<p>a</p><div><frameset>"
+    result = renderer.render_incremental(html)
+    assert result.text == renderer.render(html).text
+
+
+def test_reuse():
+    renderer = Renderer()
+    paragraphs = [f"<p>Paragraph <b>{i}</b></p>\n" for i in range(100)]
+    previous = renderer.render_incremental("".join(paragraphs))
+    paragraphs[50] = "<p>Changed <i>paragraph</i></p>\n"
+    html = "".join(paragraphs)
+
+    result = renderer.render_incremental(html, previous)
+
+    expected = renderer.render(html)
+    assert result.text == expected.text
+    assert result.entities == expected.entities
+    reused = [
+        chunk for key, chunk in result.chunks.items()
+        if previous.chunks.get(key) is chunk
+    ]
+    assert len(reused) == 99
+
+
+def test_limits():
+    renderer = Renderer(limits=Limits(max_length=100))
+    previous = renderer.render_incremental("<p>short</p>" * 10)
+    with pytest.raises(LimitExceededError):
+        renderer.render_incremental("<p>short</p>" * 20, previous)
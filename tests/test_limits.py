@@ -0,0 +1,44 @@
+import pytest
+
+from sulguk import LimitExceededError, Limits, Renderer, transform_html
+
+
+def test_within_limits():
+    limits = Limits(
+        max_input_bytes=100,
+        max_elements=10,
+        max_depth=10,
+        max_length=100,
+        max_entities=10,
+    )
+    result = transform_html("<b>hello</b> <i>world</i>", limits=limits)
+    assert result.text == "hello world"
+    assert len(result.entities) == 2
+
+
+@pytest.mark.parametrize("html, limits, limit", [
+    ("a" * 101, Limits(max_input_bytes=100), "max_input_bytes"),
+    ("ы" * 51, Limits(max_input_bytes=100), "max_input_bytes"),
+    ("<b>x</b>" * 10, Limits(max_elements=10), "max_elements"),
+    ("<b>" * 20 + "x", Limits(max_depth=10), "max_depth"),
+    ("x" * 101, Limits(max_length=100), "max_length"),
+    ("🟩" * 51, Limits(max_length=100), "max_length"),
+    ("<b>x</b> " * 11, Limits(max_entities=10), "max_entities"),
+])
+@pytest.mark.parametrize("fused", [False, True])
+def test_exceeded(html, limits, limit, fused):
+    renderer = Renderer(limits=limits, fused=fused)
+    with pytest.raises(LimitExceededError) as e:
+        renderer.render(html)
+    assert e.value.limit == limit
+
+
+def test_renderer_reused():
+    renderer = Renderer(limits=Limits(max_elements=10))
+    for _ in range(5):
+        assert renderer.render("<b>x</b>" * 5).text == "xxxxx"
+
+
+def test_deep_nesting_fails_fast():
+    with pytest.raises(LimitExceededError):
+        transform_html("<div>" * 2000, limits=Limits(max_depth=100))
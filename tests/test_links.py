@@ -0,0 +1,88 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sulguk import Renderer, transform_html
+from sulguk.mapper import URL_CACHE_SIZE, _urljoin
+
+
+def strip_utm(url: str) -> str:
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.startswith("utm_")
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def test_rewriter():
+    html = (
+        '<a href="/post?id=1&utm_source=tg">post</a> '
+        '<img src="img.png?utm_medium=x" alt="pic">'
+    )
+    result = transform_html(
+        html, base_url="https://example.com/blog/", url_rewriter=strip_utm,
+    )
+    assert [e["url"] for e in result.entities] == [
+        "https://example.com/post?id=1",
+        "https://example.com/blog/img.png",
+    ]
+
+
+def test_rewriter_drops_link():
+    html = '<a href="https://ads.example.com">ad</a> <img src="x.png">'
+    result = transform_html(html, url_rewriter=lambda url: None)
+    assert result.text == "ad 🖼️x.png"
+    assert result.entities == []
+
+
+def test_empty_href():
+    calls = []
+
+    def rewriter(url):
+        calls.append(url)
+        return url
+
+    result = transform_html(
+        '<a href="">text</a>', base_url="https://example.com/",
+        url_rewriter=rewriter,
+    )
+    assert result.entities == []
+    assert calls == []
+
+
+def test_cached():
+    calls = []
+
+    def rewriter(url):
+        calls.append(url)
+        return url + "#x"
+
+    renderer = Renderer(base_url="https://example.com/", url_rewriter=rewriter)
+    html = '<a href="/a">a</a><a href="/b">b</a>' * 50
+    first = renderer.render(html)
+    second = renderer.render(html)
+    assert first == second
+    assert first.entities[0]["url"] == "https://example.com/a#x"
+    assert calls == ["https://example.com/a", "https://example.com/b"]
+
+
+def test_cache_bounded():
+    renderer = Renderer(
+        base_url="https://example.com/", url_rewriter=lambda url: url,
+    )
+    html = "".join(
+        f'<a href="/{i}">{i}</a>' for i in range(URL_CACHE_SIZE * 2)
+    )
+    result = renderer.render(html)
+    assert result.entities[-1]["url"] == (
+        f"https://example.com/{URL_CACHE_SIZE * 2 - 1}"
+    )
+    assert _urljoin.cache_info().currsize == URL_CACHE_SIZE
+    assert len(renderer._mapper._rewritten) <= URL_CACHE_SIZE
+
+
+def test_cache_shared():
+    _urljoin.cache_clear()
+    html = '<a href="/a">a</a>'
+    transform_html(html, base_url="https://example.com/")
+    transform_html(html, base_url="https://example.com/")
+    assert _urljoin.cache_info().hits == 1
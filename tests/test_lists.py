@@ -0,0 +1,49 @@
+import pytest
+
+from sulguk import transform_html
+from sulguk.data import NumberFormat
+from sulguk.render import int_to_number
+
+REVERSED_HTML = """
+<ol reversed>
+    <li>a</li>
+    <li>b</li>
+    <li>c</li>
+</ol>
+"""
+REVERSED_PLAIN = "3. a\n2. b\n1. c\n"
+REVERSED_START_HTML = "<ol reversed start=10><li>a</li><li>b</li></ol>"
+REVERSED_START_PLAIN = "10. a\n9. b\n"
+START_HTML = "<ol start=10><li>a</li><li value=20>b</li><li>c</li></ol>"
+START_PLAIN = "10. a\n20. b\n21. c\n"
+LETTERS_HTML = "<ol type=a start=25><li>a</li><li>b</li><li>c</li></ol>"
+LETTERS_PLAIN = "y. a\nz. b\naa. c\n"
+UNORDERED_HTML = "<ul><li>a</li><li>b</li></ul>"
+UNORDERED_PLAIN = "• a\n• b\n"
+
+
+@pytest.mark.parametrize("html, plain", [
+    (REVERSED_HTML, REVERSED_PLAIN),
+    (REVERSED_START_HTML, REVERSED_START_PLAIN),
+    (START_HTML, START_PLAIN),
+    (LETTERS_HTML, LETTERS_PLAIN),
+    (UNORDERED_HTML, UNORDERED_PLAIN),
+])
+@pytest.mark.parametrize("fused", [False, True])
+def test_list(html, plain, fused):
+    assert transform_html(html, fused=fused).text == plain
+
+
+@pytest.mark.parametrize("value, format, result", [
+    (1, NumberFormat.DECIMAL, "1"),
+    (26, NumberFormat.LETTERS_UPPER, "Z"),
+    (27, NumberFormat.LETTERS_LOWER, "aa"),
+    (702, NumberFormat.LETTERS_UPPER, "ZZ"),
+    (703, NumberFormat.LETTERS_UPPER, "AAA"),
+    (1994, NumberFormat.ROMAN_UPPER, "MCMXCIV"),
+    (3999, NumberFormat.ROMAN_LOWER, "mmmcmxcix"),
+    (0, NumberFormat.ROMAN_UPPER, "0"),
+    (-1, NumberFormat.LETTERS_LOWER, "-1"),
+])
+def test_numbers(value, format, result):
+    assert int_to_number(value, format) == result
@@ -0,0 +1,62 @@
+import pytest
+
+from sulguk import transform_html
+from sulguk.data import MessageEntity
+from sulguk.render import merge_entities
+
+ADJACENT_HTML = "<b>1</b><b>2</b>3"
+ADJACENT_ENTITIES = [
+    MessageEntity(type="bold", offset=0, length=2),
+]
+NESTED_HTML = "<h3>1<b>2</b></h3>"
+NESTED_ENTITIES = [
+    MessageEntity(type="bold", offset=0, length=2),
+]
+ORDER_HTML = "<i>1<u>2</u></i>"
+ORDER_ENTITIES = [
+    MessageEntity(type="italic", offset=0, length=2),
+    MessageEntity(type="underline", offset=1, length=1),
+]
+LINKS_HTML = '<a href="http://a">1</a><a href="http://b">2</a>'
+LINKS_ENTITIES = [
+    MessageEntity(type="text_link", url="http://a", offset=0, length=1),
+    MessageEntity(type="text_link", url="http://b", offset=1, length=1),
+]
+EMOJI_HTML = (
+    '<tg-emoji emoji-id="1">🙂</tg-emoji><tg-emoji emoji-id="1">🙂</tg-emoji>'
+)
+EMOJI_ENTITIES = [
+    MessageEntity(
+        type="custom_emoji", offset=0, length=2, custom_emoji_id="1",
+    ),
+    MessageEntity(
+        type="custom_emoji", offset=2, length=2, custom_emoji_id="1",
+    ),
+]
+
+
+@pytest.mark.parametrize("html, entities", [
+    (ADJACENT_HTML, ADJACENT_ENTITIES),
+    (NESTED_HTML, NESTED_ENTITIES),
+    (ORDER_HTML, ORDER_ENTITIES),
+    (LINKS_HTML, LINKS_ENTITIES),
+    (EMOJI_HTML, EMOJI_ENTITIES),
+])
+def test_merge(html, entities):
+    result = transform_html(html, merge=True)
+    assert result.entities == entities
+
+
+def test_merge_keeps_text():
+    html = "<h1>title</h1><p>some <b>bold</b><b>text</b></p>"
+    merged = transform_html(html, merge=True)
+    assert merged.text == transform_html(html).text
+
+
+def test_merge_does_not_modify_input():
+    entities = [
+        MessageEntity(type="bold", offset=0, length=1),
+        MessageEntity(type="bold", offset=1, length=1),
+    ]
+    merge_entities(entities)
+    assert entities[0]["length"] == 1
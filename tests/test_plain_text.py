@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from sulguk import Renderer
+
+CORPUS = [
+    "Hello, world!",
+    "  leading and trailing spaces  ",
+    "multiple   spaces\tand\ttabs",
+    "line\nbreaks\r\nand\rcarriage returns",
+    "\n\n\nempty lines before",
+    "\x0c form feed at start",
+    " \x0c\t mixed whitespace at start",
+    "form\x0cfeed inside",
+    "NUL\x00inside",
+    "\x00NUL at start",
+    "\x00 \x0cNUL and whitespace",
+    "vertical\x0btab",
+    "non-breaking\xa0space",
+    "em space",
+    "Привет, мир",
+    "emoji 🟩🟦 and ZWJ 👨‍👩‍👧",
+    "control \x01\x02\x1f\x7f\x80\x9f characters",
+    "noncharacters ﷐￾￿",
+    "quotes \" ' and > sign",
+    "url https://example.com/?a=1",
+]
+ALPHABET = "ab ы🟩\t\n\r\x0c\x0b\x00\xa0 >\"'\x01"
+
+
+def full_render(renderer, raw_html):
+    if raw_html.strip() == "":
+        return renderer.render(raw_html)
+    doc = renderer._parse(raw_html)
+    return renderer._render(renderer._walker().walk_element(doc))
+
+
+def random_texts():
+    rnd = random.Random(0)
+    for _ in range(500):
+        yield "".join(
+            rnd.choice(ALPHABET) for _ in range(rnd.randint(1, 20))
+        )
+
+
+@pytest.mark.parametrize("text", CORPUS + list(random_texts()))
+def test_same_as_full(text):
+    renderer = Renderer()
+    result = renderer.render(text)
+    expected = full_render(renderer, text)
+    assert result.text == expected.text
+    assert result.entities == expected.entities == []
+
+
+def test_markup_is_parsed():
+    renderer = Renderer()
+    assert renderer.render("a &amp; b").text == "a & b"
+    assert renderer.render("a <b>b</b>").entities
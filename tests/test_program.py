@@ -0,0 +1,37 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from sulguk import compile_html, render_program, transform_html
+
+FIXTURES = Path("tests/fixtures")
+
+CASES = [
+    "",
+    "<h1>Header</h1><p>text <mark>marked</mark></p>",
+    "<ol reversed type=i><li>1</li><li>2<ul><li>2.1</li></ul></li></ol>",
+    '<pre><code class="language-python">x = 1</code></pre>',
+    '<a href="/a">link <img src="/i.png"></a> '
+    '<tg-emoji emoji-id="1">🙂</tg-emoji>',
+    "1 <span> 2 </span> 3<br><br>4<hr>5",
+]
+
+
+def test_fixture():
+    html = (FIXTURES / "supported_tags.html").read_text()
+    assert render_program(compile_html(html)) == transform_html(html)
+
+
+@pytest.mark.parametrize("html", CASES)
+def test_same_as_tree(html):
+    base_url = "http://example.com/"
+    program = compile_html(html, base_url=base_url)
+    expected = transform_html(html, base_url=base_url)
+    assert render_program(program) == expected
+
+
+def test_pickle():
+    html = (FIXTURES / "supported_tags.html").read_text()
+    program = pickle.loads(pickle.dumps(compile_html(html)))
+    assert render_program(program) == transform_html(html)
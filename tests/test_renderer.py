@@ -0,0 +1,65 @@
+import gc
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from html5lib.html5parser import ParseError
+
+from sulguk import Renderer, transform_html
+
+FIXTURES = Path("tests/fixtures")
+
+DOCUMENTS = [
+    (FIXTURES / "supported_tags.html").read_text(),
+    '<h1>Header</h1><a href="/link">link</a>',
+    "<ol reversed><li>1</li><li>2</li></ol><pre>code</pre>",
+    "<b><i>hello</b>world</i>",
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_same_as_transform(fused):
+    renderer = Renderer(base_url="http://example.com/", fused=fused)
+    for html in DOCUMENTS:
+        expected = transform_html(html, base_url="http://example.com/")
+        assert renderer.render(html) == expected
+
+
+def test_strict():
+    renderer = Renderer(strict=True)
+    with pytest.raises(ParseError):
+        renderer.render(DOCUMENTS[3])
+
+
+def test_threads():
+    renderer = Renderer(base_url="http://example.com/")
+    expected = [renderer.render(html) for html in DOCUMENTS]
+    jobs = DOCUMENTS * 50
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(renderer.render, jobs))
+    assert results == expected * 50
+
+
+BIG = "<p>" + "<b>text</b> " * 10000 + "</p>"
+
+
+@pytest.mark.parametrize(("strict", "html", "method"), [
+    (False, BIG, "render"),
+    (True, BIG + "<i>", "render"),
+    (False, BIG * 2, "render_incremental"),
+], ids=["render", "failed", "incremental"])
+def test_document_released(strict, html, method):
+    # parsers are kept for the next render, but not the last document
+    renderer = Renderer(strict=strict)
+    tracemalloc.start()
+    try:
+        try:
+            getattr(renderer, method)(html)
+        except ParseError:
+            pass
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert retained < peak / 20
@@ -0,0 +1,138 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from sulguk import Limits, Renderer, SharedRenderCache, transform_html, wrapper
+from sulguk import shared_cache as shared_cache_module
+
+HTML = "<b>Broadcast</b> <a href='/news'>message</a>"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SharedRenderCache(tmp_path / "cache.sqlite")
+    yield cache
+    cache.close()
+
+
+class CountingRenderer(Renderer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def render(self, raw_html):
+        self.calls += 1
+        return super().render(raw_html)
+
+
+def test_hit(cache):
+    renderer = CountingRenderer(base_url="https://example.com")
+    expected = transform_html(HTML, base_url="https://example.com")
+    assert cache.render(renderer, HTML) == expected
+    assert cache.render(renderer, HTML) == expected
+    assert cache.render(renderer, HTML.encode()) == expected
+    assert renderer.calls == 2  # str and bytes are cached separately
+
+    other = CountingRenderer(base_url="https://example.com")
+    assert cache.render(other, HTML) == expected
+    assert other.calls == 0
+
+
+@pytest.mark.parametrize("settings", [
+    {"base_url": "https://other.com"},
+    {"strict": True},
+    {"merge": True},
+    {"limits": Limits(max_length=1000)},
+])
+def test_settings_in_key(cache, settings):
+    html = "<!DOCTYPE html>" + HTML  # valid in strict mode
+    cache.render(Renderer(), html)
+    renderer = CountingRenderer(**settings)
+    cache.render(renderer, html)
+    assert renderer.calls == 1
+
+
+def test_version_in_key(cache, monkeypatch):
+    cache.render(Renderer(), HTML)
+    monkeypatch.setattr(wrapper, "sulguk_version", lambda: "0.0.0")
+    renderer = CountingRenderer()
+    cache.render(renderer, HTML)
+    assert renderer.calls == 1
+
+
+def test_render_version_in_key(cache, monkeypatch):
+    cache.render(Renderer(), HTML)
+    monkeypatch.setattr(wrapper, "RENDER_VERSION", -1)
+    renderer = CountingRenderer()
+    cache.render(renderer, HTML)
+    assert renderer.calls == 1
+
+
+def test_not_comparable(cache):
+    renderer = Renderer(url_rewriter=lambda url: url)
+    assert renderer.fingerprint is None
+    with pytest.raises(ValueError):
+        cache.render(renderer, HTML)
+
+
+def test_errors_not_cached(cache):
+    with pytest.raises(ValueError):
+        cache.render(Renderer(), "<unknown>")
+    assert cache.size() == 0
+
+
+def test_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache_module, "EVICT_BATCH", 1)
+    cache = SharedRenderCache(tmp_path / "cache.sqlite", max_bytes=2000)
+    renderer = CountingRenderer()
+    for i in range(100):
+        cache.render(renderer, f"<b>{i}</b>" + "x" * 100)
+    assert 1000 < cache.size() <= 2000
+    # the latest ones are kept
+    cache.render(renderer, "<b>99</b>" + "x" * 100)
+    assert renderer.calls == 100
+
+
+def test_threads(cache):
+    renderer = Renderer()
+    expected = [transform_html(f"<i>{i}</i>") for i in range(20)]
+    errors = []
+
+    def work():
+        try:
+            for i in range(20):
+                assert cache.render(renderer, f"<i>{i}</i>") == expected[i]
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def _render_in_worker(path):
+    cache = SharedRenderCache(path)
+    return cache.render(Renderer(), HTML).text
+
+
+def test_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with ProcessPoolExecutor(2) as executor:
+        texts = list(executor.map(_render_in_worker, [path] * 4))
+    assert texts == [transform_html(HTML).text] * 4
+
+    renderer = CountingRenderer()
+    SharedRenderCache(path).render(renderer, HTML)
+    assert renderer.calls == 0
+
+
+def test_broken_file(tmp_path, caplog):
+    path = tmp_path / "cache.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    cache = SharedRenderCache(path)
+    assert cache.render(Renderer(), HTML) == transform_html(HTML)
+    assert "not available" in caplog.text
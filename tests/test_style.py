@@ -0,0 +1,46 @@
+import pytest
+
+from sulguk import transform_html
+from sulguk.data import MessageEntity
+from sulguk.entities import Bold, Style, Text, Underline, Uppercase
+from sulguk.render import State
+
+H1_HTML = "<h1>Title <i>x</i></h1>"
+H1_PLAIN = "TITLE X\n"
+H1_ENTITIES = [
+    MessageEntity(type="italic", offset=6, length=1),
+    MessageEntity(type="underline", offset=0, length=7),
+    MessageEntity(type="bold", offset=0, length=7),
+]
+MARK_HTML = "1<mark>2</mark>"
+MARK_ENTITIES = [
+    MessageEntity(type="bold", offset=1, length=1),
+    MessageEntity(type="italic", offset=1, length=1),
+]
+
+
+@pytest.mark.parametrize("html, plain, entities", [
+    (H1_HTML, H1_PLAIN, H1_ENTITIES),
+    (MARK_HTML, "12", MARK_ENTITIES),
+])
+def test_styled_tags(html, plain, entities):
+    result = transform_html(html)
+    assert result.text == plain
+    assert result.entities == entities
+
+
+def test_same_as_nested():
+    nested = Bold(entities=[
+        Underline(entities=[Uppercase(entities=[Text(text="text")])]),
+    ])
+    style = Style(
+        entities=[Text(text="text")],
+        types=("bold", "underline"),
+        uppercase=True,
+    )
+    expected = State()
+    nested.render(expected)
+    state = State()
+    style.render(state)
+    assert state.canvas.text == expected.canvas.text
+    assert state.entities == expected.entities
@@ -0,0 +1,87 @@
+import weakref
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import html5lib
+import lxml.html
+import pytest
+
+from sulguk import transform_html, transform_tree
+from sulguk.data import MessageEntity
+from sulguk.parsing import release_parser
+from sulguk.render import State
+from sulguk.walker import Walker
+
+FIXTURES = Path("tests/fixtures")
+
+FRAGMENT_HTML = '1<b>2</b><!-- comment --><a href="/3">3</a>4'
+FRAGMENT_PLAIN = "1234"
+FRAGMENT_ENTITIES = [
+    MessageEntity(type="bold", offset=1, length=1),
+    MessageEntity(
+        type="text_link", url="http://example.com/3", offset=2, length=1,
+    ),
+]
+
+
+@pytest.mark.parametrize("treebuilder", ["lxml", "etree"])
+def test_same_as_html(treebuilder):
+    html = (FIXTURES / "supported_tags.html").read_text()
+    doc = html5lib.parse(
+        html, treebuilder=treebuilder, namespaceHTMLElements=False,
+    )
+    assert transform_tree(doc) == transform_html(html)
+
+
+def test_lxml_element():
+    elem = lxml.html.fromstring("<div><p>1 <b>2</b></p>tail</div>")[0]
+    result = transform_tree(elem)
+    assert result.text == "1 2\n\n"
+    assert result.entities == [MessageEntity(type="bold", offset=2, length=1)]
+
+
+def test_etree_element():
+    elem = ET.fromstring("<p>1 <b>2</b></p>")
+    result = transform_tree(ET.ElementTree(elem))
+    assert result == transform_tree(elem)
+    assert result.text == "1 2\n\n"
+
+
+def test_lxml_fragment():
+    fragment = lxml.html.fragments_fromstring(FRAGMENT_HTML)
+    result = transform_tree(fragment, base_url="http://example.com/")
+    assert result.text == FRAGMENT_PLAIN
+    assert result.entities == FRAGMENT_ENTITIES
+
+
+def test_etree_fragment():
+    root = ET.fromstring(f"<root>{FRAGMENT_HTML}</root>")
+    fragment = [root.text, *root]
+    result = transform_tree(fragment, base_url="http://example.com/")
+    assert result.text == FRAGMENT_PLAIN
+    assert result.entities == FRAGMENT_ENTITIES
+
+
+def test_consume():
+    html = (FIXTURES / "supported_tags.html").read_text()
+    doc = html5lib.parse(
+        html, treebuilder="etree", namespaceHTMLElements=False,
+    )
+    expected = transform_tree(doc)
+    root = Walker(consume=True).walk_element(doc)
+    state = State()
+    root.render(state)
+    assert state.canvas.text == expected.text
+    assert state.entities == expected.entities
+    assert len(doc) == 0
+
+
+def test_consume_frees_elements():
+    parser = html5lib.HTMLParser(
+        html5lib.getTreeBuilder("etree"), namespaceHTMLElements=False,
+    )
+    doc = parser.parse("<p><b>1</b></p><p>2</p>")
+    release_parser(parser)
+    bold = weakref.ref(doc.find("body/p/b"))
+    Walker(consume=True).walk_element(doc)
+    assert bold() is None
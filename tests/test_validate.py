@@ -0,0 +1,127 @@
+import pytest
+
+from sulguk import Limits, Renderer, transform_html, validate_html
+from sulguk.entities import Bold
+from sulguk.limits import MESSAGE_LIMITS, NO_LIMITS, LimitExceededError
+
+
+def problems(html, **kwargs):
+    return [
+        (problem.kind, problem.line, problem.column)
+        for problem in validate_html(html, **kwargs)
+    ]
+
+
+@pytest.mark.parametrize("html", [
+    "",
+    "plain text",
+    "<b>Bold</b> <a href='/x'>link</a>",
+    "<ol type='a' start='3' reversed><li value='5'>x</li><li value=''></ol>",
+    "<progress value='0.5'></progress><meter min='0' max='2' value='1'>",
+    "<head><title><foo></title></head><script>if (a<b) {}</script>x",
+    "<image src='https://example.com/x.png'>",
+    b"<i>\xd1\x8b</i>",
+    # dropped by the parser outside of tables
+    "<td>x</td>",
+    "<p>a<tr>b</tr></p>",
+    "<caption>c</caption>ok",
+    "<frame>x",
+    "x<frameset>",
+])
+def test_valid(html):
+    assert validate_html(html) == []
+    transform_html(html)
+
+
+@pytest.mark.parametrize("html, kind, column", [
+    ("text <table>x</table>", "unsupported_tag", 6),
+    ("<ol type='x'><li>x</li></ol>", "invalid_attribute", 1),
+    ("<ol start='one'><li>x</li></ol>", "invalid_attribute", 1),
+    ("<ul><li value='v'>x</li></ul>", "invalid_attribute", 5),
+    ("<progress value=''></progress>", "invalid_attribute", 1),
+    ("<meter min='low'></meter>", "invalid_attribute", 1),
+    ("</td><div><frameset>", "unsupported_tag", 11),
+])
+def test_invalid(html, kind, column):
+    assert problems(html) == [(kind, 1, column)]
+    with pytest.raises((ValueError, KeyError)):
+        transform_html(html)
+
+
+def test_all_problems_with_positions():
+    html = (
+        "<p>\n"
+        "  <foo>x</foo>\n"
+        "  <ol type='z'><li value='q'>y</li></ol>\n"
+        "<bar/>"
+    )
+    assert problems(html) == [
+        ("unsupported_tag", 2, 3),
+        ("invalid_attribute", 3, 3),
+        ("invalid_attribute", 3, 16),
+        ("unsupported_tag", 4, 1),
+    ]
+
+
+def test_custom_tags():
+    tags = dict.fromkeys(["foo", "ol"], lambda attrs: (None, Bold()))
+    html = "<foo>x</foo><ol type='x'></ol>"
+    assert validate_html(html, tags=tags) == []
+    assert Renderer(tags=tags).validate(html) == []
+
+
+def test_length():
+    assert problems("x" * 4096) == []
+    assert problems("xx   " * 2000) == [("max_length", None, None)]
+    assert problems("<b>🟩</b>" * 51, limits=Limits(max_length=100)) == [
+        ("max_length", None, None),
+    ]
+    assert problems("<style>" + "x" * 5000 + "</style>") == []
+    assert problems("x" * 5000, limits=NO_LIMITS) == []
+
+
+@pytest.mark.parametrize("html, count", [
+    ("<b>x</b>", 1),
+    ("<b></b>", 1),
+    ("<h1>x</h1><h3>y</h3><mark>z</mark>", 5),
+    ("<a>x</a><a href='/x'>y</a><img alt='x'><image src='x.png'>", 2),
+    ("<span>x</span><span class='tg-spoiler'>y</span><tg-emoji>z", 1),
+    ("<input type='checkbox'><input><input value='x'>", 1),
+    ("<head><title><b>x</b></title></head>x", 0),
+])
+def test_entities(html, count):
+    renderer = Renderer(limits=Limits(max_entities=count))
+    assert renderer.validate(html) == []
+    assert len(renderer.render(html).entities) == count
+    if count:
+        renderer = Renderer(limits=Limits(max_entities=count - 1))
+        assert problems(html, limits=renderer.limits) == [
+            ("max_entities", None, None),
+        ]
+        with pytest.raises(LimitExceededError):
+            renderer.render(html)
+
+
+def test_entities_default_limit():
+    assert problems("<b>x</b>" * 100) == []
+    html = "<b>x</b>" * 2000
+    assert problems(html) == [("max_entities", None, None)]
+    # entities are counted before merging
+    with pytest.raises(LimitExceededError):
+        Renderer(limits=MESSAGE_LIMITS, merge=True).render(html)
+
+
+def test_input_size():
+    assert problems("x" * 101, limits=Limits(max_input_bytes=100)) == [
+        ("max_input_bytes", None, None),
+    ]
+
+
+def test_strict():
+    assert problems("<!DOCTYPE html><b>x</b>", strict=True) == []
+    assert problems("<b>x</b>", strict=True) == [("parse_error", 1, 4)]
+    assert problems("<!DOCTYPE html><b>x<foo>", strict=True) == [
+        ("unsupported_tag", 1, 20),
+        ("parse_error", 1, 25),
+    ]
+    assert problems("<b>x</i>") == []